@@ -17,13 +17,17 @@
 #
 import re
 import json
+import threading
+import time
 from collections import namedtuple
 
 from fsc_sensor import (
+    FscSensorSourcePal,
     FscSensorSourceSysfs,
     FscSensorSourceUtil,
     FscSensorSourceKv,
     FscSensorSourceJson,
+    symbolize_sensorname,
 )
 from fsc_util import Logger
 
@@ -42,6 +46,48 @@ SensorValue = namedtuple(
 )
 
 
+# Number of reads in a row the last readings of a late FRU are reused for,
+# after that its sensors are reported as failed
+STALE_READS_MAX = 3
+
+
+class FruSensorRead(object):
+    """
+    Sensor read of a single FRU, running in its own thread so that a slow
+    FRU does not hold up the others. Daemon threads are used so that a read
+    stuck on a sensor bus never keeps fscd from exiting.
+    """
+
+    def __init__(self, fru, func, *args):
+        self.fru = fru
+        self.result = None
+        self.error = None
+        self.start_time = time.time()
+        self.end_time = None
+        self.thread = threading.Thread(target=self.run, args=(func,) + args)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def run(self, func, *args):
+        try:
+            self.result = func(*args)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.end_time = time.time()
+
+    def wait(self, deadline):
+        """
+        Wait for the read to finish until deadline (time.time() based, or
+        None to wait forever). Returns True if the read is done.
+        """
+        timeout = None
+        if deadline is not None:
+            timeout = max(0, deadline - time.time())
+        self.thread.join(timeout)
+        return not self.thread.is_alive()
+
+
 class BMCMachine(object):
     """
     A container class that can perform sensor read and write.
@@ -52,6 +98,83 @@ class BMCMachine(object):
         self.nums = {}
         self.extra_sensors = {}
         self.last_fan_speed = 0
+        # Deadline in seconds for the FRU reads of a read_sensors() call,
+        # None waits for all of them
+        self.read_timeout = None
+        self.pending_reads = {}
+        self.last_readings = {}
+        self.stale_reads = {}
+        self.stale_frus = set()
+
+    def read_fru_sensors(self, sensor_sources, inf):
+        """
+        Method to read the sensors of all FRUs concurrently. FRUs that are
+        not read within read_timeout are left reading in the background and
+        marked stale, their last readings are used instead.
+
+        Arguments:
+            sensor_sources: Set of all sensor souces from fsc config
+            inf: zone info to filter sensors with, or None
+
+        Returns:
+            SensorValue tuples
+        """
+        start_time = time.time()
+        deadline = None
+        if self.read_timeout is not None:
+            deadline = start_time + self.read_timeout
+
+        for fru in self.frus:
+            # A read still running since an earlier call is waited for
+            # again, rather than piling up reads of the same FRU
+            if fru not in self.pending_reads:
+                self.pending_reads[fru] = FruSensorRead(
+                    fru, get_sensor_tuples, fru, self.nums[fru], sensor_sources, inf
+                )
+
+        sensors = {}
+        for fru in self.frus:
+            read = self.pending_reads[fru]
+            if read.wait(deadline):
+                del self.pending_reads[fru]
+                if read.error is not None:
+                    raise read.error
+                Logger.debug(
+                    "FRU %s sensor read took %.3fs"
+                    % (fru, read.end_time - read.start_time)
+                )
+                self.stale_frus.discard(fru)
+                self.stale_reads[fru] = 0
+                self.last_readings[fru] = read.result
+                # Offsets are applied on a copy, keep the readings as read
+                sensors[fru] = dict(read.result)
+            else:
+                sensors[fru] = self.get_stale_readings(fru, read)
+
+        Logger.info(
+            "Read sensors of %d FRUs in %.3fs"
+            % (len(self.frus), time.time() - start_time)
+        )
+        return sensors
+
+    def get_stale_readings(self, fru, read):
+        """
+        Readings to use for a FRU whose read missed the deadline: the last
+        readings for up to STALE_READS_MAX reads, then the same sensors as
+        failed reads so that sensor fail handling kicks in.
+        """
+        self.stale_frus.add(fru)
+        self.stale_reads[fru] = self.stale_reads.get(fru, 0) + 1
+        Logger.warn(
+            "FRU %s sensor read still running after %.3fs, marked stale (%d)"
+            % (fru, time.time() - read.start_time, self.stale_reads[fru])
+        )
+        last = self.last_readings.get(fru, {})
+        if self.stale_reads[fru] <= STALE_READS_MAX:
+            return dict(last)
+        return {
+            key: value._replace(value=None, status="na") for key, value in last.items()
+        }
 
     def read_sensors(self, sensor_sources, inf):
         """
@@ -63,9 +186,7 @@ class BMCMachine(object):
         Returns:
             SensorValue tuples
         """
-        sensors = {}
-        for fru in self.frus:
-            sensors[fru] = get_sensor_tuples(fru, self.nums[fru], sensor_sources, inf)
+        sensors = self.read_fru_sensors(sensor_sources, inf)
 
         # read specific sensors
         if self.extra_sensors != {}:
@@ -188,7 +309,10 @@ def get_sensor_tuples(fru_name, sensor_num, sensor_sources, inf):
     """
     result = {}
     for key, value in list(sensor_sources.items()):
-        if isinstance(value.source, FscSensorSourceUtil):
+        if isinstance(value.source, FscSensorSourcePal):
+            result = get_sensor_tuples_pal(value.source, fru_name, sensor_num, inf)
+            break  # Hack: util reads all sensors
+        elif isinstance(value.source, FscSensorSourceUtil):
             result = parse_all_sensors_util(
                 sensor_sources[key].source.read(fru=fru_name, num=sensor_num, inf=inf)
             )
@@ -214,6 +338,43 @@ def get_sensor_tuples(fru_name, sensor_num, sensor_sources, inf):
     return result
 
 
+def get_sensor_tuples_pal(source, fru_name, sensor_num, inf):
+    """
+    Build SensorValue tuples from sensors read in-process through libpal.
+    FRUs libpal has no sensors for, and FRUs that failed to read, are read
+    with the util instead.
+
+    Arguments:
+        source: FscSensorSourcePal to read from
+        fru_name: fru where the sensors should be read from
+        sensor_num: sensor numbers to read, all sensors if empty
+        inf: zone info to filter sensors with, or None
+
+    Returns:
+        SensorValue tuples
+    """
+    if fru_name not in source.UTIL_ONLY_FRUS:
+        try:
+            readings = source.read_sensors(fru=fru_name, num=sensor_num, inf=inf)
+        except SystemExit:
+            Logger.debug("SystemExit from sensor read")
+            raise
+        except Exception as e:
+            Logger.crit(
+                "Exception while reading {fru} through libpal: {e}".format(
+                    fru=fru_name, e=repr(e)
+                )
+            )
+        else:
+            result = {}
+            for sid, name, value, unit, status in readings:
+                result[symbolize_sensorname(name)] = SensorValue(
+                    sid, name, value, unit, status, 0, 0
+                )
+            return result
+    return parse_all_sensors_util(source.read(fru=fru_name, num=sensor_num, inf=inf))
+
+
 def get_sensor_tuple_sysfs(key, sensor_data, read_fail_counter=0, wrong_read_counter=0):
     """
     Build a sensor tuple from sensor key and data read
@@ -316,14 +477,6 @@ def parse_sensor_json(raw_data, source):
     return result
 
 
-def symbolize_sensorname(name):
-    """
-    Helper method to normalize the sensor name
-    Eg : SOC Therm Margin -> soc_therm_margin
-    """
-    return name.lower().replace(" ", "_")
-
-
 def parse_fan_sysfs(sensor_data):
     """
     Parse the data read from sysfs and return the PWM
@@ -11,6 +11,24 @@ class InfixNode:
     def eval(self, ctx):
         return self.op.apply(self.lhs.eval(ctx), self.rhs.eval(ctx))
 
+    def compile(self, compiler, scope):
+        lhs = self.lhs.compile(compiler, scope)
+        rhs = self.rhs.compile(compiler, scope)
+        out = compiler.local()
+        symbol = INLINE_OPERATORS.get(type(self.op))
+        if symbol is None:
+            op = compiler.const(self.op)
+            compiler.emit("{} = {}.apply({}, {})".format(out, op, lhs, rhs))
+            return out
+        # Inlined apply(): a missing operand yields the other one
+        compiler.emit("if {} is None:".format(lhs))
+        compiler.emit("    {} = {}".format(out, rhs))
+        compiler.emit("elif {} is None:".format(rhs))
+        compiler.emit("    {} = {}".format(out, lhs))
+        compiler.emit("else:")
+        compiler.emit("    {} = {} {} {}".format(out, lhs, symbol, rhs))
+        return out
+
     def dbgeval(self, ctx):
         (lhv, lht) = self.lhs.dbgeval(ctx)
         (rhv, rht) = self.rhs.dbgeval(ctx)
@@ -28,6 +46,12 @@ class ListNode:
     def eval(self, ctx):
         return [i.eval(ctx) for i in self.inners]
 
+    def compile(self, compiler, scope):
+        inners = [i.compile(compiler, scope) for i in self.inners]
+        out = compiler.local()
+        compiler.emit("{} = [{}]".format(out, ", ".join(inners)))
+        return out
+
     def dbgeval(self, ctx):
         evals = [i.dbgeval(ctx) for i in self.inners]
         fvs = [fv for (fv, dt) in evals]
@@ -54,6 +78,18 @@ class BindNode:
         innerctx[self.name] = self.bindnode.eval(ctx)
         return self.innernode.eval(innerctx)
 
+    def compile(self, compiler, scope):
+        # The bound value is a local of the compiled function, instead of
+        # an entry of a copy of ctx
+        innerscope = dict(scope)
+        innerscope[self.name] = self.bindnode.compile(compiler, scope)
+        return self.innernode.compile(compiler, innerscope)
+
+    def compile_driver(self, compiler, scope):
+        innerscope = dict(scope)
+        innerscope[self.name] = self.bindnode.compile(compiler, scope)
+        return compile_driver(self.innernode, compiler, innerscope)
+
     def dbgeval(self, ctx):
         innerctx = ctx.copy()
         (bfv, bdt) = self.bindnode.dbgeval(ctx)
@@ -72,6 +108,11 @@ class IdentNode:
     def eval(self, ctx):
         return ctx.get(self.name, None)
 
+    def compile(self, compiler, scope):
+        if self.name in scope:
+            return scope[self.name]
+        return compiler.read(self.name)
+
     def dbgeval(self, ctx):
         fv = ctx.get(self.name, None)
         return (fv, "{}={}".format(self.name, fv))
@@ -87,6 +128,9 @@ class ConstNode:
     def eval(self, ctx):
         return self.value
 
+    def compile(self, compiler, scope):
+        return compiler.const(self.value)
+
     def dbgeval(self, ctx):
         return self.value
 
@@ -107,19 +151,8 @@ class ApplyNode:
         """
         iv = self.inner.eval(ctx)
         fv = self.op.apply(iv, ctx)
-        it = self.inner.inners[iv.index(fv)]
-        if isinstance(it, InfixNode):
-            res = it.lhs.name + "+" + it.rhs.name
-            it = it.lhs
-        else:
-            res = it.name
-
-        if it.inner.name == "max":
-            mx = it.inner.mxsr
-        else:
-            mx = it.inner
-        res = res + "(" + str(mx) + ")"
-        kv.kv_set("fscd_driver", res)
+        (res, source) = driver_source(self.inner.inners[iv.index(fv)])
+        kv.kv_set("fscd_driver", driver_name(res, source))
         return fv
 
     def eval(self, ctx):
@@ -129,6 +162,62 @@ class ApplyNode:
             self.mxsr = self.inner.inners[iv.index(fv)]
         return fv
 
+    def compile(self, compiler, scope):
+        return self.compile_apply(compiler, self.inner.compile(compiler, scope))
+
+    def compile_apply(self, compiler, inner):
+        out = compiler.local()
+        if isinstance(self.op, ApplyProfile):
+            run = compiler.const(self.op.controller.run)
+            compiler.emit("if {} is not None:".format(inner))
+            compiler.emit("    {} = {}({}, ctx)".format(out, run, inner))
+            compiler.emit("else:")
+            compiler.emit("    {} = None".format(out))
+            return out
+        if isinstance(self.op, Max):
+            # Like Max, the builtin skips None and 0 values and keeps the
+            # first of equal values
+            compiler.emit("{} = max(filter(None, {}), default=None)".format(out, inner))
+        else:
+            op = compiler.const(self.op)
+            compiler.emit("{} = {}.apply({}, ctx)".format(out, op, inner))
+        if self.name == "max":
+            node = compiler.const(self)
+            inners = compiler.const(self.inner.inners)
+            compiler.emit("if {} is not None:".format(out))
+            compiler.emit(
+                "    {}.mxsr = {}[{}.index({})]".format(node, inners, inner, out)
+            )
+        return out
+
+    def compile_driver(self, compiler, scope):
+        """
+        Same as compile(), and the sensor driving the result is saved as
+        "fscd_driver" like eval_driver() does, in the same evaluation
+        """
+        inner = self.inner.compile(compiler, scope)
+        out = self.compile_apply(compiler, inner)
+        # Everything but the input of inner max() profiles is known upfront
+        sources = []
+        for item in self.inner.inners:
+            try:
+                sources.append(driver_source(item))
+            except AttributeError:
+                # Not a profile, fails like eval_driver() if it drives
+                sources.append(None)
+        sources = compiler.const(sources)
+        inners = compiler.const(self.inner.inners)
+        index = compiler.local()
+        source = compiler.local()
+        compiler.emit("{} = {}.index({})".format(index, inner, out))
+        compiler.emit(
+            "{} = {}[{}] or driver_source({}[{}])".format(
+                source, sources, index, inners, index
+            )
+        )
+        compiler.emit('kv.kv_set("fscd_driver", driver_name(*{}))'.format(source))
+        return out
+
     def dbgeval(self, ctx):
         (iv, it) = self.inner.dbgeval(ctx)
         ft = self.name
@@ -142,6 +231,87 @@ class ApplyNode:
         return self.name + "(" + str(self.inner) + ")"
 
 
+def driver_source(item):
+    """
+    Name of the profile(s) of a top level expression item, and the node
+    their input comes from
+    """
+    if isinstance(item, InfixNode):
+        res = item.lhs.name + "+" + item.rhs.name
+        item = item.lhs
+    else:
+        res = item.name
+    return (res, item.inner)
+
+
+def driver_name(res, source):
+    if source.name == "max":
+        source = source.mxsr
+    return res + "(" + str(source) + ")"
+
+
+def compile_driver(node, compiler, scope):
+    if hasattr(node, "compile_driver"):
+        return node.compile_driver(compiler, scope)
+    return node.compile(compiler, scope)
+
+
+class ExprCompiler:
+    """
+    Generates the source of a single python function evaluating an
+    expression tree: every node becomes a few statements on locals, sensor
+    values are looked up in ctx once, and bound names are plain locals.
+    Objects the code needs (profiles, constants, nodes) are passed in as
+    globals of the function.
+    """
+
+    def __init__(self):
+        self.lines = []
+        self.consts = {}
+        self.reads = {}
+        self.count = 0
+
+    def local(self):
+        self.count += 1
+        return "v%d" % self.count
+
+    def const(self, value):
+        name = "c%d" % len(self.consts)
+        self.consts[name] = value
+        return name
+
+    def read(self, name):
+        if name not in self.reads:
+            self.reads[name] = self.local()
+            self.emit("{} = get({!r})".format(self.reads[name], name))
+        return self.reads[name]
+
+    def emit(self, line):
+        self.lines.append(line)
+
+    def build(self, result):
+        source = "def evaluate(ctx):\n    get = ctx.get\n"
+        for line in self.lines:
+            source += "    " + line + "\n"
+        source += "    return " + result + "\n"
+        namespace = dict(self.consts)
+        namespace.update(kv=kv, driver_name=driver_name, driver_source=driver_source)
+        exec(compile(source, "<fsc expr>", "exec"), namespace)
+        evaluate = namespace["evaluate"]
+        evaluate.source = source
+        return evaluate
+
+
+def compile_expr(eval_root):
+    """
+    Compile an expression tree into a single function of ctx, evaluating
+    like eval_driver() without walking the tree
+    """
+    compiler = ExprCompiler()
+    result = compile_driver(eval_root, compiler, {})
+    return compiler.build(result)
+
+
 def make_infix_node(ast_node, info, profiles):
     op = None
     if ast_node["op"] == "+":
@@ -218,7 +388,10 @@ def make_eval_node(ast_node, info, profiles):
 
 
 def make_eval_tree(source, profiles):
-    root_ast_node = fsc_parser.parse_expr(source)
+    return make_eval_tree_from_ast(fsc_parser.parse_expr(source), profiles)
+
+
+def make_eval_tree_from_ast(root_ast_node, profiles):
     info = {"profiles": set(), "ext_vars": set()}
     eval_root = make_eval_node(root_ast_node, info, profiles)
     return (eval_root, info)
@@ -330,3 +503,7 @@ class Div:
 
     def __str__(self):
         return "/"
+
+
+# Operators compiled expressions apply inline, instead of calling apply()
+INLINE_OPERATORS = {Sum: "+", Sub: "-", Mul: "*"}
@@ -1,5 +1,20 @@
-from ply import lex, yacc
-
+import re
+
+
+# Recursive-descent parser for zone expressions. It accepts the grammar
+# fscd used to build with ply at every start:
+#
+#   expression : SYM EQUAL expression SEMICOLON expression
+#              | LIST_OPEN list_elements LIST_END
+#              | SYM PAR_OPEN expression PAR_END
+#              | expression (PLUS | MINUS | MULTIPLY | DIVIDE) expression
+#              | SYM
+#              | NUM
+#   list_elements : list_elements LIST_SEP expression | expression
+#
+# All infix operators share one precedence level and associate left, so
+# "a + b * c" is "(a + b) * c". A binding extends as far right as possible,
+# so it takes the rest of the expression it appears in.
 
 tokens = (
     "SYM",
@@ -17,104 +32,140 @@ tokens = (
     "SEMICOLON",
 )
 
-t_SYM = r"[A-Za-z_][:A-Za-z0-9_]*"
-
-
-def t_NUM(t):
-    r"[0-9]+"
-    t.value = int(t.value)
-    return t
-
-
-t_PLUS = r"\+"
-t_MINUS = r"\-"
-t_MULTIPLY = r"\*"
-t_DIVIDE = r"\/"
-t_PAR_OPEN = r"\("
-t_PAR_END = r"\)"
-t_LIST_OPEN = r"\["
-t_LIST_END = r"\]"
-t_LIST_SEP = r","
-t_EQUAL = r"="
-t_SEMICOLON = r";"
-
-t_ignore = " \t\n"
-
-
-def t_error(t):
-    print(("Illegal character '%s'" % t.value[0]))
-    t.lexer.skip(1)
-
-
-start = "expression"
-precedence = (("left", "MULTIPLY", "DIVIDE", "PLUS", "MINUS"),)
-
-
-def p_list_elements(p):
-    "list_elements : list_elements LIST_SEP expression"
-    p[0] = p[1] + [p[3]]
-
-
-def p_list_elements_tail(p):
-    "list_elements : expression"
-    p[0] = [p[1]]
-
-
-def p_expression_binding(p):
-    "expression : SYM EQUAL expression SEMICOLON expression"
-    p[0] = {"type": "bind", "name": p[1], "bound": p[3], "inner": p[5]}
-
-
-def p_expression_list(p):
-    "expression : LIST_OPEN list_elements LIST_END"
-    p[0] = {"type": "list", "content": p[2]}
-
-
-def p_expression_apply(p):
-    "expression : SYM PAR_OPEN expression PAR_END"
-    p[0] = {"type": "apply", "name": p[1], "inner": p[3]}
-
-
-def p_expression_plus(p):
-    "expression : expression PLUS expression"
-    p[0] = {"type": "infix", "op": p[2], "left": p[1], "right": p[3]}
-
-
-def p_expression_minus(p):
-    "expression : expression MINUS expression"
-    p[0] = {"type": "infix", "op": p[2], "left": p[1], "right": p[3]}
-
-
-def p_expression_multiply(p):
-    "expression : expression MULTIPLY expression"
-    p[0] = {"type": "infix", "op": p[2], "left": p[1], "right": p[3]}
-
-
-def p_expression_divide(p):
-    "expression : expression DIVIDE expression"
-    p[0] = {"type": "infix", "op": p[2], "left": p[1], "right": p[3]}
-
-
-def p_expression_ident(p):
-    "expression : SYM"
-    p[0] = {"type": "ident", "name": p[1]}
-
-
-def p_expression_const(p):
-    "expression : NUM"
-    p[0] = {"type": "const", "value": p[1]}
-
-
-def p_error(p):
-    if p:
-        print(("Unexpected token: {}".format(p)))
-    else:
-        print("Unexpectedly reached end of input")
-
+TOKEN_RE = re.compile(
+    r"""
+    (?P<SYM>[A-Za-z_][:A-Za-z0-9_]*)
+    | (?P<NUM>[0-9]+)
+    | (?P<PLUS>\+)
+    | (?P<MINUS>\-)
+    | (?P<MULTIPLY>\*)
+    | (?P<DIVIDE>\/)
+    | (?P<PAR_OPEN>\()
+    | (?P<PAR_END>\))
+    | (?P<LIST_OPEN>\[)
+    | (?P<LIST_END>\])
+    | (?P<LIST_SEP>,)
+    | (?P<EQUAL>=)
+    | (?P<SEMICOLON>;)
+    | (?P<ignore>[ \t\n]+)
+    """,
+    re.VERBOSE,
+)
 
-lexer = lex.lex(errorlog=yacc.NullLogger())
-parser = yacc.yacc(errorlog=yacc.NullLogger())
+INFIX_OPERATORS = ("PLUS", "MINUS", "MULTIPLY", "DIVIDE")
+
+
+class ExprSyntaxError(Exception):
+    pass
+
+
+class Token:
+    def __init__(self, type, value, pos):
+        self.type = type
+        self.value = value
+        self.pos = pos
+
+    def __str__(self):
+        return "LexToken({},{!r},{})".format(self.type, self.value, self.pos)
+
+
+def tokenize(s):
+    result = []
+    pos = 0
+    while pos < len(s):
+        m = TOKEN_RE.match(s, pos)
+        if m is None:
+            print(("Illegal character '%s'" % s[pos]))
+            pos += 1
+            continue
+        pos = m.end()
+        if m.lastgroup == "ignore":
+            continue
+        value = m.group()
+        if m.lastgroup == "NUM":
+            value = int(value)
+        result.append(Token(m.lastgroup, value, m.start()))
+    return result
+
+
+class Parser:
+    def __init__(self, s):
+        self.tokens = tokenize(s)
+        self.pos = 0
+
+    def peek(self):
+        if self.pos < len(self.tokens):
+            return self.tokens[self.pos]
+        return None
+
+    def take(self, type):
+        token = self.peek()
+        if token is None:
+            raise ExprSyntaxError("Unexpectedly reached end of input")
+        if token.type != type:
+            raise ExprSyntaxError("Unexpected token: {}".format(token))
+        self.pos += 1
+        return token
+
+    def parse(self):
+        result = self.expression()
+        token = self.peek()
+        if token is not None:
+            raise ExprSyntaxError("Unexpected token: {}".format(token))
+        return result
+
+    def expression(self):
+        result = self.operand()
+        while True:
+            token = self.peek()
+            if token is None or token.type not in INFIX_OPERATORS:
+                return result
+            self.pos += 1
+            right = self.operand()
+            result = {
+                "type": "infix",
+                "op": token.value,
+                "left": result,
+                "right": right,
+            }
+
+    def operand(self):
+        token = self.peek()
+        if token is None:
+            raise ExprSyntaxError("Unexpectedly reached end of input")
+        if token.type == "NUM":
+            self.pos += 1
+            return {"type": "const", "value": token.value}
+        if token.type == "LIST_OPEN":
+            self.pos += 1
+            content = [self.expression()]
+            while self.peek() is not None and self.peek().type == "LIST_SEP":
+                self.pos += 1
+                content.append(self.expression())
+            self.take("LIST_END")
+            return {"type": "list", "content": content}
+        if token.type != "SYM":
+            raise ExprSyntaxError("Unexpected token: {}".format(token))
+        self.pos += 1
+        following = self.peek()
+        if following is not None and following.type == "EQUAL":
+            self.pos += 1
+            bound = self.expression()
+            self.take("SEMICOLON")
+            inner = self.expression()
+            return {
+                "type": "bind",
+                "name": token.value,
+                "bound": bound,
+                "inner": inner,
+            }
+        if following is not None and following.type == "PAR_OPEN":
+            self.pos += 1
+            inner = self.expression()
+            self.take("PAR_END")
+            return {"type": "apply", "name": token.value, "inner": inner}
+        return {"type": "ident", "name": token.value}
 
 
 def parse_expr(s):
-    return parser.parse(s)
+    return Parser(s).parse()
@@ -16,7 +16,13 @@
 # Boston, MA 02110-1301 USA
 #
 from fsc_control import PID, TTable, IncrementPID, TTable4Curve
-from fsc_sensor import FscSensorSourceSysfs, FscSensorSourceUtil, FscSensorSourceJson
+from fsc_sensor import (
+    FscSensorSourcePal,
+    FscSensorSourceSysfs,
+    FscSensorSourceUtil,
+    FscSensorSourceJson,
+    has_libpal,
+)
 from fsc_util import Logger
 
 
@@ -36,6 +42,16 @@ class Sensor(object):
                     self.source = FscSensorSourceUtil(
                         name=sensor_name, read_source=pTable["read_source"]["util"]
                     )
+                if "libpal" in pTable["read_source"]:
+                    # Fall back to the util if the libpal bindings are missing
+                    if has_libpal:
+                        source_type = FscSensorSourcePal
+                    else:
+                        Logger.warn("libpal not available, reading sensors with util")
+                        source_type = FscSensorSourceUtil
+                    self.source = source_type(
+                        name=sensor_name, read_source=pTable["read_source"]["libpal"]
+                    )
                 if "json" in pTable["read_source"]:
                     filter = None
                     if "filter" in pTable["read_source"]:
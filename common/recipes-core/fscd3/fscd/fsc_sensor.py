@@ -18,11 +18,21 @@
 import abc
 import os
 import re
+import threading
 from kv import kv_get, kv_set
 from subprocess import PIPE, Popen
 
 from fsc_util import Logger
 
+try:
+    import pal
+    import sdr
+
+    has_libpal = True
+except (ImportError, OSError):
+    # Bindings are not installed, or libpal/libsdr could not be loaded
+    has_libpal = False
+
 
 class FscSensorBase(object):
     """
@@ -55,6 +65,8 @@ class FscSensorBase(object):
             self.filter = None
 
         self.read_source_fail_counter = 0
+        # Sources are shared by the FRU reader threads of BMCMachine
+        self.read_source_fail_lock = threading.Lock()
         self.write_source_fail_counter = 0
         self.read_source_wrong_counter = 0
         self.hwmon_source = None
@@ -68,6 +80,20 @@ class FscSensorBase(object):
         """
         return
 
+    def count_read_failure(self):
+        """
+        Increment read_source_fail_counter
+        """
+        with self.read_source_fail_lock:
+            self.read_source_fail_counter += 1
+
+    def reset_read_failures(self):
+        """
+        Reset read_source_fail_counter after a good read
+        """
+        with self.read_source_fail_lock:
+            self.read_source_fail_counter = 0
+
     def write(self, **kwargs):
         """
         Write value to write_source
@@ -129,7 +155,7 @@ class FscSensorSourceSysfs(FscSensorBase):
                     readsysfs=repr(readsysfs), e=repr(e)
                 )
             )
-            self.read_source_fail_counter += 1
+            self.count_read_failure()
             raise
 
     def write(self, value):
@@ -236,6 +262,82 @@ class FscSensorSourceUtil(FscSensorBase):
             Logger.crit("Exception with cmd=%s response=%s" % (cmd, response))
 
 
+def symbolize_sensorname(name):
+    """
+    Helper method to normalize the sensor name
+    Eg : SOC Therm Margin -> soc_therm_margin
+    """
+    return name.lower().replace(" ", "_")
+
+
+class FscSensorSourcePal(FscSensorSourceUtil):
+    """
+    Class for FSC sensor source reading sensors in-process through libpal.
+    read_source is the sensor util, which is still used by read() for FRUs
+    that have no libpal sensors (all, aggregate) and as a fallback.
+    """
+
+    UTIL_ONLY_FRUS = ("all", "aggregate")
+
+    def read_sensors(self, **kwargs):
+        """
+        Reads sensors of a fru through libpal instead of running the util
+        and parsing its output. Takes the same arguments as read().
+
+        Arguments:
+            kwargs: fru to read, and optionally the sensor numbers (num) or
+                    the zone info (inf) to filter sensors with
+
+        Return:
+            list of (sensor number, name, value, unit, status) tuples, value
+            is None if the sensor could not be read
+        """
+        fru = kwargs["fru"]
+        fru_id = pal.pal_get_fru_id(fru)
+        if not (pal.pal_is_fru_prsnt(fru_id) and pal.pal_is_fru_ready(fru_id)):
+            return []
+
+        snr_nums = pal.pal_get_fru_sensor_list(fru_id)
+        filter_names = None
+        if "inf" in kwargs and kwargs["inf"] is not None:
+            filter_names = set()
+            for name in kwargs["inf"]["ext_vars"]:
+                sdata = name.split(":")
+                if sdata[0] == fru:
+                    filter_names.add(symbolize_sensorname(sdata[1]))
+        elif "num" in kwargs and kwargs["num"]:
+            nums = set(int(num, 0) for num in kwargs["num"])
+            snr_nums = [snr_num for snr_num in snr_nums if snr_num in nums]
+
+        sensors = []
+        for snr_num in snr_nums:
+            try:
+                metadata = sdr.sdr_get_sensor_metadata(fru_id, snr_num)
+            except sdr.LibSdrError:
+                continue
+            name = metadata.name
+            if filter_names is not None:
+                if symbolize_sensorname(fru + "_" + name) not in filter_names:
+                    continue
+                name = fru + " " + name
+            sensors.append((snr_num, name, metadata))
+
+        readings = pal.sensor_read_fru(fru_id, [snr[0] for snr in sensors])
+        result = []
+        for i, (snr_num, name, metadata) in enumerate(sensors):
+            value = readings.value_at(i)
+            if value is None:
+                result.append((snr_num, name, None, None, "na"))
+                continue
+            flag = pal.pal_alter_sensor_thresh_flag(
+                fru_id, snr_num, metadata.thresh.flag
+            )
+            status = sdr.sensor_status(value, metadata.thresh, flag)
+            # sensor-util prints readings with two decimals
+            result.append((snr_num, name, round(value, 2), metadata.units, status))
+        return result
+
+
 class FscSensorSourceKv(FscSensorBase):
     """
     Class for FSC sensor source for kv
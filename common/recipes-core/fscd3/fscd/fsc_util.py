@@ -19,6 +19,9 @@
 import logging
 import logging.config
 import syslog
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
 
 
 LOGGER_CONF = {
@@ -52,6 +55,11 @@ LOG_MAP = {
 }
 
 
+# Number of control loop ticks TickStats keeps
+TICK_STATS_SIZE = 120
+TICK_STATS_PERCENTILES = (50, 90, 99)
+
+
 def clamp(v, minv, maxv):
     if v <= minv:
         return minv
@@ -101,3 +109,65 @@ class Logger(object):
         syslog.openlog(name)
         syslog.setlogmask(syslog.LOG_UPTO(LOG_MAP[log_level]))
         logging.config.dictConfig(LOGGER_CONF)
+
+
+class TickStats(object):
+    """
+    Durations of the phases (sensor reads, zone evaluation, PWM writes...)
+    of the last control loop ticks, kept in a ring buffer of size ticks.
+    """
+
+    def __init__(self, size=TICK_STATS_SIZE):
+        self.ticks = deque(maxlen=size)
+        self.current = None
+        self.tick_start = None
+        self.count = 0
+
+    def start_tick(self):
+        self.current = OrderedDict()
+        self.tick_start = time.time()
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Context manager timing a phase of the current tick, a phase that
+        runs several times in a tick (e.g. once per zone) is summed up
+        """
+        start = time.time()
+        try:
+            yield
+        finally:
+            if self.current is not None:
+                elapsed = time.time() - start
+                self.current[name] = self.current.get(name, 0) + elapsed
+
+    def end_tick(self):
+        """
+        Record the current tick, returns its total duration
+        """
+        total = time.time() - self.tick_start
+        self.current["total"] = total
+        self.ticks.append(self.current)
+        self.current = None
+        self.count += 1
+        return total
+
+    def percentiles(self):
+        """
+        Duration percentiles (nearest-rank) and maximum of every phase, in
+        milliseconds, over the recorded ticks
+        """
+        durations = OrderedDict()
+        for tick in self.ticks:
+            for name, elapsed in tick.items():
+                durations.setdefault(name, []).append(elapsed)
+        result = OrderedDict()
+        for name, values in durations.items():
+            values.sort()
+            stats = OrderedDict()
+            for pct in TICK_STATS_PERCENTILES:
+                rank = max(0, (pct * len(values) + 99) // 100 - 1)
+                stats["p%d" % pct] = round(values[rank] * 1000, 3)
+            stats["max"] = round(values[-1] * 1000, 3)
+            result[name] = stats
+        return {"ticks": len(self.ticks), "phases_ms": result}
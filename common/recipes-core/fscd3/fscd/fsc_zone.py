@@ -20,6 +20,7 @@ import re
 import sys
 
 import fsc_board
+import fsc_expr
 from fsc_sensor import FscSensorSourceSysfs, FscSensorSourceUtil, FscSensorSourceKv
 from fsc_util import Logger, clamp
 
@@ -166,6 +167,7 @@ class Zone:
         self.last_pwm = transitional
         self.transitional = transitional
         self.expr = expr
+        self.eval_expr = fsc_expr.compile_expr(expr)
         self.expr_meta = expr_meta
         self.expr_str = str(expr)
         self.transitional_assert_flag = False
@@ -346,7 +348,7 @@ class Zone:
             (exprout, dxstr) = self.expr.dbgeval(ctx)
             Logger.info(dxstr + " = " + str(exprout))
         else:
-            exprout = self.expr.eval_driver(ctx)
+            exprout = self.eval_expr(ctx)
             Logger.info(self.expr_str + " = " + str(exprout))
         # If *all* sensors in the top level max() report None, the
         # expression will report None
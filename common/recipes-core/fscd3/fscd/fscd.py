@@ -19,6 +19,7 @@
 #
 import ctypes
 import datetime
+import hashlib
 import json
 import os.path
 import signal
@@ -30,11 +31,12 @@ from contextlib import contextmanager
 
 import fsc_board
 import fsc_expr
+import fsc_parser
 from fsc_bmcmachine import BMCMachine
 from fsc_board import board_callout, board_fan_actions, board_host_actions
 from fsc_profile import Sensor, profile_constructor
 from fsc_sensor import FscSensorSourceUtil, FscSensorSourceJson
-from fsc_util import Logger, clamp
+from fsc_util import Logger, TickStats, clamp
 from fsc_zone import Fan, Zone, fan_mode
 
 try:
@@ -53,6 +55,17 @@ CONFIG_DIR = "/etc/fsc"
 # CONFIG_DIR = '/tmp'
 DEFAULT_INIT_BOOST = 100
 DEFAULT_INIT_TRANSITIONAL = 70
+# Without sensor_read_timeout_ms, FRU sensor reads get this share of
+# sample_interval_ms, leaving the rest of the tick for fan control
+DEFAULT_SENSOR_READ_TIMEOUT_RATIO = 0.25
+# Tick duration percentiles are saved as JSON to this file every
+# TICK_STATS_SAVE_TICKS ticks (too large for a kv value)
+TICK_STATS_PATH = RECORD_DIR + "fscd_tick_stats"
+TICK_STATS_SAVE_TICKS = 10
+# Parsed zone expressions, reused by the next start as long as neither the
+# config nor any expr file changed
+ZONE_CACHE_PATH = RECORD_DIR + "fscd_zone_cache.json"
+ZONE_CACHE_VERSION = 1
 
 
 class LibWatchdogError(Exception):
@@ -159,6 +172,7 @@ class Fscd(object):
         self.sensor_fail_ignore = False
         self.pwm_sensor_boost_value = None
         self.output_max_boost_pwm = False
+        self.tick_stats = TickStats()
         if "get_fan_mode" in dir(fsc_board):
             self.get_fan_mode = True
         else:
@@ -226,6 +240,16 @@ class Fscd(object):
             Logger.info("watchdog pinging enabled")
             start_watchdog()
         self.interval = self.fsc_config["sample_interval_ms"] / 1000.0
+        # FRUs are read concurrently, the ones not done by this deadline are
+        # marked stale instead of delaying fan control
+        self.machine.read_timeout = (
+            self.fsc_config.get(
+                "sensor_read_timeout_ms",
+                self.fsc_config["sample_interval_ms"]
+                * DEFAULT_SENSOR_READ_TIMEOUT_RATIO,
+            )
+            / 1000.0
+        )
         if "fan_recovery_time" in self.fsc_config:
             self.fan_recovery_time = self.fsc_config["fan_recovery_time"]
 
@@ -245,42 +269,96 @@ class Fscd(object):
         for name, pdata in list(self.fsc_config["fans"].items()):
             self.fans[name] = Fan(name, pdata)
 
+    def read_zone_sources(self):
+        sources = {}
+        for data in self.fsc_config["zones"].values():
+            filename = data["expr_file"]
+            if filename not in sources:
+                with open(os.path.join(self.zone_config, filename), "r") as exf:
+                    sources[filename] = exf.read()
+        return sources
+
+    def zone_cache_key(self, sources):
+        digest = hashlib.sha256()
+        digest.update(str(ZONE_CACHE_VERSION).encode())
+        digest.update(json.dumps(self.fsc_config, sort_keys=True).encode())
+        for filename in sorted(sources):
+            digest.update(b"\0" + filename.encode() + b"\0")
+            digest.update(sources[filename].encode())
+        return digest.hexdigest()
+
+    def load_zone_cache(self, key):
+        try:
+            with open(ZONE_CACHE_PATH, "r") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(cache, dict) or cache.get("key") != key:
+            return {}
+        return cache.get("zones", {})
+
+    def save_zone_cache(self, key, zones):
+        try:
+            if not os.path.isdir(RECORD_DIR):
+                os.mkdir(RECORD_DIR)
+            tmp_path = ZONE_CACHE_PATH + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"key": key, "zones": zones}, f)
+            os.rename(tmp_path, ZONE_CACHE_PATH)
+        except OSError as e:
+            Logger.warn("Failed to save zone cache: %s" % str(e))
+
     def build_zones(self):
         self.zones = []
+        # Sensors of all zones, so that sensor_filter_all reads them once
+        # per update instead of once per zone
+        self.zones_expr_meta = {"ext_vars": []}
         counter = 0
+        sources = self.read_zone_sources()
+        cache_key = self.zone_cache_key(sources)
+        cached = self.load_zone_cache(cache_key)
+        parsed = {}
         for name, data in list(self.fsc_config["zones"].items()):
             filename = data["expr_file"]
-            with open(os.path.join(self.zone_config, filename), "r") as exf:
-                source = exf.read()
-                Logger.info("Compiling FSC expression for zone:")
-                Logger.info(source)
-                (expr, inf) = fsc_expr.make_eval_tree(source, self.profiles)
-                for name in inf["ext_vars"]:
-                    sdata = name.split(":")
-                    board = sdata[0]
-                    # sname never used. so comment out (avoid lint error)
-                    # sname = sdata[1]
-                    if board not in self.machine.frus:
-                        self.machine.nums[board] = []
-                    self.machine.frus.add(board)
-                    if len(sdata) == 3:
-                        self.machine.nums[board].append(sdata[2])
-
-                zone = Zone(
-                    data["pwm_output"],
-                    expr,
-                    inf,
-                    self.transitional,
-                    counter,
-                    self.boost,
-                    self.sensor_fail,
-                    self.sensor_valid_check,
-                    self.fail_sensor_type,
-                    self.ssd_progressive_algorithm,
-                    self.sensor_fail_ignore,
-                )
-                counter += 1
-                self.zones.append(zone)
+            source = sources[filename]
+            Logger.info("Compiling FSC expression for zone:")
+            Logger.info(source)
+            if filename not in parsed:
+                parsed[filename] = cached.get(filename)
+                if parsed[filename] is None:
+                    parsed[filename] = fsc_parser.parse_expr(source)
+            (expr, inf) = fsc_expr.make_eval_tree_from_ast(
+                parsed[filename], self.profiles
+            )
+            self.zones_expr_meta["ext_vars"].extend(inf["ext_vars"])
+            for name in inf["ext_vars"]:
+                sdata = name.split(":")
+                board = sdata[0]
+                # sname never used. so comment out (avoid lint error)
+                # sname = sdata[1]
+                if board not in self.machine.frus:
+                    self.machine.nums[board] = []
+                self.machine.frus.add(board)
+                if len(sdata) == 3:
+                    self.machine.nums[board].append(sdata[2])
+
+            zone = Zone(
+                data["pwm_output"],
+                expr,
+                inf,
+                self.transitional,
+                counter,
+                self.boost,
+                self.sensor_fail,
+                self.sensor_valid_check,
+                self.fail_sensor_type,
+                self.ssd_progressive_algorithm,
+                self.sensor_fail_ignore,
+            )
+            counter += 1
+            self.zones.append(zone)
+        if parsed != cached:
+            self.save_zone_cache(cache_key, parsed)
 
     def build_machine(self):
         self.machine = BMCMachine()
@@ -334,11 +412,11 @@ class Fscd(object):
                                 if tuple.value == None:
                                     self.sensors[
                                         tuple.name
-                                    ].source.read_source_fail_counter += 1
+                                    ].source.count_read_failure()
                                 else:
                                     self.sensors[
                                         tuple.name
-                                    ].source.read_source_fail_counter = 0
+                                    ].source.reset_read_failures()
                                     if tuple.value > valid_read_limit:
                                         reason = (
                                             sensor
@@ -618,13 +696,16 @@ class Fscd(object):
 
         """
         ctx = {}
-        if not self.sensor_filter_all:
-            sensors_tuples = self.machine.read_sensors(self.sensors, None)
+        with self.tick_stats.phase("sensors"):
+            if self.sensor_filter_all:
+                sensors_tuples = self.machine.read_sensors(
+                    self.sensors, self.zones_expr_meta
+                )
+            else:
+                sensors_tuples = self.machine.read_sensors(self.sensors, None)
+        with self.tick_stats.phase("safe_guards"):
             self.fsc_safe_guards(sensors_tuples)
         for zone in self.zones:
-            if self.sensor_filter_all:
-                sensors_tuples = self.machine.read_sensors(self.sensors, zone.expr_meta)
-                self.fsc_safe_guards(sensors_tuples)
             Logger.info("PWM: %s" % (json.dumps(zone.pwm_output)))
             mode = 0
             chassis_intrusion_boost_flag = 0
@@ -647,9 +728,10 @@ class Fscd(object):
                 ignore_fan_mode = False
                 if self.non_fanfail_limited_boost and dead_fans:
                     ignore_fan_mode = True
-                pwmval = zone.run(
-                    sensors=sensors_tuples, ctx=ctx, ignore_mode=ignore_fan_mode
-                )
+                with self.tick_stats.phase("zones"):
+                    pwmval = zone.run(
+                        sensors=sensors_tuples, ctx=ctx, ignore_mode=ignore_fan_mode
+                    )
                 mode = zone.get_set_fan_mode(mode, action="read")
                 # if we set pwm_sensor_boost_value option, assign it to pwmval
                 if self.pwm_sensor_boost_value != None and \
@@ -701,10 +783,11 @@ class Fscd(object):
                             if int(pwmval) == int(set_fan_pwm):
                                 mode = set_fan_mode
                             else:
-                                pwmval = zone.run(
-                                    sensors=sensors_tuples,
-                                    ctx=ctx, ignore_mode=False
-                                )
+                                with self.tick_stats.phase("zones"):
+                                    pwmval = zone.run(
+                                        sensors=sensors_tuples,
+                                        ctx=ctx, ignore_mode=False
+                                    )
                                 mode = zone.get_set_fan_mode(
                                     mode, action="read"
                                 )
@@ -767,11 +850,12 @@ class Fscd(object):
                     pwmval = zone.last_pwm + self.ramp_rate
             zone.last_pwm = pwmval
 
-            if hasattr(zone.pwm_output, "__iter__"):
-                for output in zone.pwm_output:
-                    self.machine.set_pwm(self.fans.get(str(output)), pwmval)
-            else:
-                self.machine.set_pwm(self.fans[zone.pwm_output], pwmval)
+            with self.tick_stats.phase("pwm"):
+                if hasattr(zone.pwm_output, "__iter__"):
+                    for output in zone.pwm_output:
+                        self.machine.set_pwm(self.fans.get(str(output)), pwmval)
+                else:
+                    self.machine.set_pwm(self.fans[zone.pwm_output], pwmval)
 
             zone.get_set_fan_mode(mode, action="write")
 
@@ -838,8 +922,11 @@ class Fscd(object):
         while True:
             time.sleep(self.interval)
 
+            self.tick_stats.start_tick()
             if self.fanpower:
-                if not self.get_fan_power_status():
+                with self.tick_stats.phase("fan_power"):
+                    fan_power = self.get_fan_power_status()
+                if not fan_power:
                     self.fan_recovery_pending = True
                     continue
             if self.fan_fail:
@@ -847,8 +934,11 @@ class Fscd(object):
                     # Accelerating, wait for a while
                     time.sleep(self.fan_recovery_time)
                     self.fan_recovery_pending = False
+                    # Not part of the work of this tick
+                    self.tick_stats.start_tick()
                 # Get dead fans for determining speed
-                dead_fans = self.update_dead_fans(dead_fans)
+                with self.tick_stats.phase("dead_fans"):
+                    dead_fans = self.update_dead_fans(dead_fans)
 
             now = time.time()
             time_difference = now - last
@@ -857,6 +947,43 @@ class Fscd(object):
 
             # Check sensors and update zones
             self.update_zones(dead_fans, time_difference)
+            self.end_tick()
+
+    def end_tick(self):
+        """
+        Record the durations of this tick, warn when the tick took longer
+        than the interval and periodically save the percentiles
+        """
+        tick = self.tick_stats.current
+        total = self.tick_stats.end_tick()
+        if total > self.interval:
+            Logger.warn(
+                "Tick took %.3fs, longer than the %.3fs interval (%s)"
+                % (
+                    total,
+                    self.interval,
+                    ", ".join(
+                        "%s %.3fs" % (name, elapsed)
+                        for name, elapsed in tick.items()
+                        if name != "total"
+                    ),
+                )
+            )
+        if self.tick_stats.count % TICK_STATS_SAVE_TICKS == 0:
+            self.save_tick_stats()
+
+    def save_tick_stats(self):
+        # Written to a temporary file and renamed, readers never see a
+        # partial file
+        try:
+            if not os.path.isdir(RECORD_DIR):
+                os.mkdir(RECORD_DIR)
+            tmp_path = TICK_STATS_PATH + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.tick_stats.percentiles(), f)
+            os.rename(tmp_path, TICK_STATS_PATH)
+        except OSError as e:
+            Logger.warn("Failed to save tick stats: %s" % str(e))
 
 
 def handle_term(signum, frame):
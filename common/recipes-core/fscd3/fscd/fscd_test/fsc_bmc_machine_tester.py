@@ -1,10 +1,33 @@
 # Copyright 2004-present Facebook. All Rights Reserved.
 
 import logging
+import os
+import sys
+import threading
+import time
+import unittest
 from subprocess import PIPE, Popen
+from types import SimpleNamespace
+from unittest import mock
 
+import fsc_bmcmachine
+import fsc_sensor
 from fsc_base_tester import BaseFscdUnitTest
 
+SDR_SOURCE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "../../../../recipes-lib/sdr/files"
+)
+if SDR_SOURCE_DIR not in sys.path:
+    sys.path.append(SDR_SOURCE_DIR)
+
+try:
+    from sdr_testing import load_sdr
+
+    sdr_helpers = load_sdr()
+except ImportError:
+    # Not run from the source tree
+    sdr_helpers = None
+
 
 class FscdBmcMachineUnitTest(BaseFscdUnitTest):
     # Tests data parsing from util works as expected for sensors and fans
@@ -118,3 +141,180 @@ class FscdBmcMachineUnitTest2(FscdBmcMachineUnitTest):
                          (returned=%d)"
             % int(data),
         )
+
+
+@unittest.skipIf(sdr_helpers is None, "sdr.py not found")
+class FscdBmcMachineLibpalTest(unittest.TestCase):
+    # Tests sensor tuples read in-process through libpal match what
+    # parse_all_sensors_util() builds out of sensor-util output
+
+    SENSORS = {
+        0x1: ("SOC Temp", "C", 0x4, 45.099998),
+        0x2: ("SOC Therm Margin", "C", 0x40, -25.0),
+        0x3: ("HSC Pwr", "W", 0x0, None),
+    }
+
+    def setUp(self):
+        self.pal = mock.Mock()
+        self.pal.pal_get_fru_id.return_value = 1
+        self.pal.pal_get_fru_sensor_list.return_value = tuple(self.SENSORS)
+        self.pal.pal_alter_sensor_thresh_flag.side_effect = lambda f, s, flag: flag
+        self.pal.sensor_read_fru.side_effect = self.sensor_read_fru
+        self.sdr = mock.Mock()
+        self.sdr.LibSdrError = Exception
+        self.sdr.sdr_get_sensor_metadata.side_effect = self.sensor_metadata
+        self.sdr.sensor_status = sdr_helpers.sensor_status
+        for name, module in (("pal", self.pal), ("sdr", self.sdr)):
+            patcher = mock.patch.object(fsc_sensor, name, module, create=True)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.source = fsc_sensor.FscSensorSourcePal(
+            name="linear_cpu_margin", read_source="/usr/local/bin/sensor-util"
+        )
+
+    def sensor_metadata(self, fru_id, snr_num):
+        name, units, flag, _value = self.SENSORS[snr_num]
+        thresh = SimpleNamespace(
+            flag=flag,
+            ucr_thresh=50.0,
+            unc_thresh=45.1,
+            unr_thresh=55.0,
+            lcr_thresh=-20.0,
+            lnc_thresh=-15.0,
+            lnr_thresh=-30.0,
+        )
+        return SimpleNamespace(name=name, units=units, thresh=thresh)
+
+    def sensor_read_fru(self, fru_id, snr_nums):
+        readings = mock.Mock()
+        values = [self.SENSORS[snr_num][3] for snr_num in snr_nums]
+        readings.value_at.side_effect = lambda i: values[i]
+        return readings
+
+    def test_sensor_read(self):
+        tuples = fsc_bmcmachine.get_sensor_tuples_pal(self.source, "mb", [], None)
+        self.assertEqual(
+            tuples,
+            {
+                "soc_temp": fsc_bmcmachine.SensorValue(
+                    0x1, "SOC Temp", 45.1, "C", "unc", 0, 0
+                ),
+                "soc_therm_margin": fsc_bmcmachine.SensorValue(
+                    0x2, "SOC Therm Margin", -25.0, "C", "ok", 0, 0
+                ),
+                "hsc_pwr": fsc_bmcmachine.SensorValue(
+                    0x3, "HSC Pwr", None, None, "na", 0, 0
+                ),
+            },
+        )
+
+    def test_sensor_read_num(self):
+        tuples = fsc_bmcmachine.get_sensor_tuples_pal(self.source, "mb", ["0x2"], None)
+        self.assertEqual(list(tuples), ["soc_therm_margin"])
+
+    def test_sensor_read_filter(self):
+        inf = {"ext_vars": ["mb:mb_soc_temp", "nic:nic_temp"]}
+        tuples = fsc_bmcmachine.get_sensor_tuples_pal(self.source, "mb", [], inf)
+        self.assertEqual(list(tuples), ["mb_soc_temp"])
+        self.assertEqual(tuples["mb_soc_temp"].name, "mb SOC Temp")
+
+    def test_fru_not_ready(self):
+        self.pal.pal_is_fru_ready.return_value = False
+        tuples = fsc_bmcmachine.get_sensor_tuples_pal(self.source, "mb", [], None)
+        self.assertEqual(tuples, {})
+        self.pal.sensor_read_fru.assert_not_called()
+
+    def test_util_fallback(self):
+        self.pal.pal_get_fru_id.side_effect = ValueError("Invalid FRU name")
+        util_output = "SOC Temp                     (0x1) :   45.10 C     | (ok)\n"
+        with mock.patch.object(
+            fsc_sensor.FscSensorSourceUtil, "read", return_value=util_output
+        ) as read:
+            tuples = fsc_bmcmachine.get_sensor_tuples_pal(self.source, "mb", [], None)
+        read.assert_called_once_with(fru="mb", num=[], inf=None)
+        self.assertEqual(tuples["soc_temp"].value, 45.1)
+
+
+class FscdBmcMachineConcurrentReadTest(unittest.TestCase):
+    # Tests FRUs are read concurrently and a FRU missing the read deadline
+    # does not hold up the others
+
+    def setUp(self):
+        self.machine = fsc_bmcmachine.BMCMachine()
+        self.machine.frus = {"slot1", "slot2"}
+        self.machine.nums = {"slot1": [], "slot2": []}
+        self.machine.read_timeout = 0.2
+        self.slot2_done = threading.Event()
+        self.addCleanup(self.slot2_done.set)
+        self.value = 40.0
+        patcher = mock.patch.object(
+            fsc_bmcmachine, "get_sensor_tuples", side_effect=self.get_sensor_tuples
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_sensor_tuples(self, fru, nums, sensor_sources, inf):
+        if fru == "slot2":
+            self.slot2_done.wait()
+        return {
+            "soc_temp": fsc_bmcmachine.SensorValue(
+                1, "SOC Temp", self.value, "C", "ok", 0, 0
+            )
+        }
+
+    def test_reads_are_concurrent(self):
+        self.machine.read_timeout = None
+        threading.Timer(0.1, self.slot2_done.set).start()
+        start = time.time()
+        sensors = self.machine.read_sensors({}, None)
+        self.assertLess(time.time() - start, 1)
+        self.assertEqual(sensors["slot2"]["soc_temp"].value, 40.0)
+
+    def test_late_fru_is_stale(self):
+        self.slot2_done.set()
+        self.machine.read_sensors({}, None)
+        self.slot2_done.clear()
+        self.value = 50.0
+
+        start = time.time()
+        sensors = self.machine.read_sensors({}, None)
+        self.assertLess(time.time() - start, 1)
+        self.assertEqual(self.machine.stale_frus, {"slot2"})
+        self.assertEqual(sensors["slot1"]["soc_temp"].value, 50.0)
+        self.assertEqual(sensors["slot2"]["soc_temp"].value, 40.0)
+
+        # Still the same read running, and failed after STALE_READS_MAX reads
+        for _ in range(fsc_bmcmachine.STALE_READS_MAX):
+            sensors = self.machine.read_sensors({}, None)
+        self.assertEqual(
+            fsc_bmcmachine.get_sensor_tuples.call_count,
+            2 + 2 + fsc_bmcmachine.STALE_READS_MAX,
+        )
+        self.assertIsNone(sensors["slot2"]["soc_temp"].value)
+        self.assertEqual(sensors["slot2"]["soc_temp"].status, "na")
+
+        self.slot2_done.set()
+        sensors = self.machine.read_sensors({}, None)
+        self.assertEqual(self.machine.stale_frus, set())
+        self.assertEqual(sensors["slot2"]["soc_temp"].value, 50.0)
+
+    def test_shared_source_failures_are_counted(self):
+        # Every FRU reader thread reads the sysfs sources
+        source = fsc_sensor.FscSensorSourceSysfs(
+            name="inlet_temp", read_source="/nonexistent/temp1_input"
+        )
+
+        def read():
+            for _ in range(100):
+                with self.assertRaises(OSError):
+                    source.read()
+
+        with mock.patch.object(fsc_sensor, "Logger"):
+            threads = [threading.Thread(target=read) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(source.read_source_fail_counter, 800)
+        source.reset_read_failures()
+        self.assertEqual(source.read_source_fail_counter, 0)
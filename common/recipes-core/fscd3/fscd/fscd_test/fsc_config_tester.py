@@ -1,5 +1,13 @@
 # Copyright 2004-present Facebook. All Rights Reserved.
 
+import json
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+import fsc_parser
+import fscd
 from fsc_base_tester import BaseFscdUnitTest
 
 
@@ -119,3 +127,66 @@ class FscdConfigUnitTest(BaseFscdUnitTest):
             DEFAULT_SENSOR_UTIL,
             "Incorrect sensor read source",
         )
+
+
+class FscdZoneCacheTest(BaseFscdUnitTest):
+    # Tests parsed zone expressions are cached across fscd restarts
+
+    def setUp(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        record_dir = os.path.join(tmpdir, "cache_store/")
+        self.path = record_dir + "fscd_zone_cache.json"
+        for name, value in (
+            ("RECORD_DIR", record_dir),
+            ("ZONE_CACHE_PATH", self.path),
+        ):
+            patcher = mock.patch.object(fscd, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        super().setUp()
+
+    def read_cache(self):
+        with open(self.path) as f:
+            return json.load(f)
+
+    def cache_key(self):
+        return self.fscd_tester.zone_cache_key(self.fscd_tester.read_zone_sources())
+
+    def test_save(self):
+        cache = self.read_cache()
+        self.assertEqual(cache["key"], self.cache_key())
+        expr_files = {
+            data["expr_file"]
+            for data in self.fscd_tester.fsc_config["zones"].values()
+        }
+        self.assertEqual(set(cache["zones"]), expr_files)
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+
+    def test_hit(self):
+        mtime = os.stat(self.path).st_mtime_ns
+        with mock.patch.object(fsc_parser, "parse_expr") as parse_expr:
+            self.fscd_tester.build_zones()
+        parse_expr.assert_not_called()
+        self.assertEqual(len(self.fscd_tester.zones), 1)
+        # Nothing changed, the cache is not rewritten
+        self.assertEqual(os.stat(self.path).st_mtime_ns, mtime)
+
+    def test_key_mismatch(self):
+        cache = self.read_cache()
+        with open(self.path, "w") as f:
+            json.dump({"key": "stale", "zones": {}}, f)
+        with mock.patch.object(
+            fsc_parser, "parse_expr", wraps=fsc_parser.parse_expr
+        ) as parse_expr:
+            self.fscd_tester.build_zones()
+        self.assertEqual(parse_expr.call_count, len(cache["zones"]))
+        self.assertEqual(self.read_cache(), cache)
+
+    def test_key_covers_sources(self):
+        sources = self.fscd_tester.read_zone_sources()
+        changed = {name: source + " " for name, source in sources.items()}
+        self.assertNotEqual(
+            self.fscd_tester.zone_cache_key(sources),
+            self.fscd_tester.zone_cache_key(changed),
+        )
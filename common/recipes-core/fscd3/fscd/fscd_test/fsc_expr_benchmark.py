@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# Copyright 2004-present Facebook. All Rights Reserved.
+#
+# Micro-benchmark of zone expression evaluation: the expression tree
+# (eval_driver) against the compiled expression fscd uses.
+#
+# Usage: PYTHONPATH=/usr/bin python3 ./fsc_expr_benchmark.py [evaluations]
+
+import sys
+import time
+from unittest import mock
+
+import fsc_expr
+from fsc_expr_tester import BIND_ZONE, TEST_ZONE, make_contexts, make_expr
+
+
+def bench(name, evaluate, contexts, repeat=5):
+    """
+    Best of repeat runs over contexts, in seconds per evaluation
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for ctx in contexts:
+            evaluate(ctx)
+        elapsed = (time.perf_counter() - start) / len(contexts)
+        if best is None or elapsed < best:
+            best = elapsed
+    print("  %-12s %8.1f us/eval" % (name, best * 1000000))
+    return best
+
+
+def main(count):
+    with open(TEST_ZONE, "r") as f:
+        zones = {"zone1": f.read(), "bind": BIND_ZONE}
+    # Leave out the kv write both evaluations do
+    with mock.patch.object(fsc_expr.kv, "kv_set", lambda key, value: None):
+        for zone, source in zones.items():
+            expr, info = make_expr(source)
+            compiled_tree, _ = make_expr(source)
+            compiled = fsc_expr.compile_expr(compiled_tree)
+            contexts = make_contexts(info["ext_vars"], count)
+            print("%s (%d evaluations):" % (zone, count))
+            tree = bench("tree", expr.eval_driver, contexts)
+            comp = bench("compiled", compiled, contexts)
+            print("  speedup      %8.2fx" % (tree / comp))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
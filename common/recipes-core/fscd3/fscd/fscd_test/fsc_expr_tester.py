@@ -0,0 +1,167 @@
+# Copyright 2004-present Facebook. All Rights Reserved.
+
+import json
+import random
+import unittest
+from unittest import mock
+
+import fsc_expr
+import fsc_parser
+from fsc_profile import profile_constructor
+
+TEST_CONFIG = "./test-data/config-example-test.json"
+TEST_ZONE = "./test-data/zone1-example-test.fsc"
+BIND_ZONE = """
+dimm = max([slot1:soc_dimma0_temp, slot1:soc_dimma1_temp]);
+max([linear_dimm(dimm),
+     linear_cpu_margin(slot1:soc_therm_margin) + pid_cpu_margin(slot1:soc_therm_margin)])
+"""
+
+MAX_ZONE = """
+max([linear_dimm(max([slot1:soc_dimma0_temp, slot1:soc_dimma1_temp])),
+     linear_cpu_margin(slot1:soc_therm_margin) + pid_cpu_margin(slot1:soc_therm_margin)])
+"""
+
+
+def make_expr(source, config=TEST_CONFIG):
+    """
+    Build an expression tree with its own profile controllers, as the
+    controllers keep state between evaluations
+    """
+    with open(config, "r") as f:
+        profiles_config = json.load(f)["profiles"]
+    profiles = {
+        name: profile_constructor(pdata) for name, pdata in profiles_config.items()
+    }
+    return fsc_expr.make_eval_tree(source, profiles)
+
+
+def make_contexts(ext_vars, count, seed=0):
+    """
+    Sensor readings for count evaluations, with some failed reads
+    """
+    rand = random.Random(seed)
+    contexts = []
+    for _ in range(count):
+        ctx = {"dt": 3.0, "dead_fans": set(), "last_pwm": 40}
+        for name in ext_vars:
+            if "margin" in name:
+                value = rand.uniform(-40, -5)
+            else:
+                value = rand.uniform(20, 80)
+            ctx[name] = None if rand.random() < 0.05 else value
+        contexts.append(ctx)
+    return contexts
+
+
+class FscdExprTest(unittest.TestCase):
+    # Tests compiled expressions evaluate like the expression tree does
+
+    def setUp(self):
+        patcher = mock.patch.object(fsc_expr.kv, "kv_set")
+        self.kv_set = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def assert_same_evaluation(self, source, count=200):
+        expr, info = make_expr(source)
+        compiled_tree, _ = make_expr(source)
+        compiled = fsc_expr.compile_expr(compiled_tree)
+        for ctx in make_contexts(info["ext_vars"], count):
+            expected = expr.eval_driver(dict(ctx))
+            expected_driver = self.kv_set.call_args
+            self.assertEqual(compiled(dict(ctx)), expected)
+            self.assertEqual(self.kv_set.call_args, expected_driver)
+
+    def test_zone_expr(self):
+        with open(TEST_ZONE, "r") as f:
+            self.assert_same_evaluation(f.read())
+
+    def test_bind_expr(self):
+        self.assert_same_evaluation(BIND_ZONE)
+
+    def test_max_expr(self):
+        self.assert_same_evaluation(MAX_ZONE)
+
+    def test_compiled_max_driver(self):
+        expr, _ = make_expr(MAX_ZONE)
+        compiled = fsc_expr.compile_expr(expr)
+        ctx = make_contexts([], 1)[0]
+        ctx.update(
+            {
+                "slot1:soc_dimma0_temp": 60,
+                "slot1:soc_dimma1_temp": 90,
+                "slot1:soc_therm_margin": -40,
+            }
+        )
+        compiled(ctx)
+        self.kv_set.assert_called_with(
+            "fscd_driver", "linear_dimm(slot1:soc_dimma1_temp)"
+        )
+
+
+class FscdParserTest(unittest.TestCase):
+    # Tests the zone expression parser builds the trees fscd expects
+
+    def ident(self, name):
+        return {"type": "ident", "name": name}
+
+    def infix(self, op, left, right):
+        return {"type": "infix", "op": op, "left": left, "right": right}
+
+    def test_infix_is_left_associative_without_precedence(self):
+        a, b, c = self.ident("a"), self.ident("b"), self.ident("c")
+        self.assertEqual(
+            fsc_parser.parse_expr("a + b * c"),
+            self.infix("*", self.infix("+", a, b), c),
+        )
+        self.assertEqual(
+            fsc_parser.parse_expr("a - b - c"),
+            self.infix("-", self.infix("-", a, b), c),
+        )
+
+    def test_binding_takes_rest_of_expression(self):
+        self.assertEqual(
+            fsc_parser.parse_expr("a + x = 1; x + b"),
+            self.infix(
+                "+",
+                self.ident("a"),
+                {
+                    "type": "bind",
+                    "name": "x",
+                    "bound": {"type": "const", "value": 1},
+                    "inner": self.infix("+", self.ident("x"), self.ident("b")),
+                },
+            ),
+        )
+
+    def test_apply_and_list(self):
+        self.assertEqual(
+            fsc_parser.parse_expr("max([slot1:a, 2])"),
+            {
+                "type": "apply",
+                "name": "max",
+                "inner": {
+                    "type": "list",
+                    "content": [self.ident("slot1:a"), {"type": "const", "value": 2}],
+                },
+            },
+        )
+
+    def test_syntax_errors(self):
+        for source in ["", "max([a, b)", "a +", "a b", "x = 1 x"]:
+            with self.assertRaises(fsc_parser.ExprSyntaxError):
+                fsc_parser.parse_expr(source)
+
+    def test_tree_from_cached_ast(self):
+        with open(TEST_ZONE, "r") as f:
+            source = f.read()
+        ast = json.loads(json.dumps(fsc_parser.parse_expr(source)))
+        expr, info = make_expr(source)
+        with open(TEST_CONFIG, "r") as f:
+            profiles_config = json.load(f)["profiles"]
+        profiles = {
+            name: profile_constructor(pdata) for name, pdata in profiles_config.items()
+        }
+        cached_expr, cached_info = fsc_expr.make_eval_tree_from_ast(ast, profiles)
+        self.assertEqual(cached_info, info)
+        self.assertEqual(str(cached_expr), str(expr))
@@ -3,10 +3,17 @@
 import unittest
 
 from fsc_base_tester import Result
-from fsc_bmc_machine_tester import FscdBmcMachineUnitTest, FscdBmcMachineUnitTest2
-from fsc_config_tester import FscdConfigUnitTest
+from fsc_bmc_machine_tester import (
+    FscdBmcMachineConcurrentReadTest,
+    FscdBmcMachineLibpalTest,
+    FscdBmcMachineUnitTest,
+    FscdBmcMachineUnitTest2,
+)
+from fsc_config_tester import FscdConfigUnitTest, FscdZoneCacheTest
+from fsc_expr_tester import FscdExprTest, FscdParserTest
 from fsc_operational_tester import FscdOperationalTest
 from fsc_sysfs_tester import FscdSysfsOperationalTester, FscdSysfsTester
+from fsc_util_tester import FscdTickStatsSaveTest, FscdTickStatsTest
 
 
 def config_suite():
@@ -19,6 +26,31 @@ def config_suite():
     test_suite.addTest(FscdConfigUnitTest("test_fan_config"))
     test_suite.addTest(FscdConfigUnitTest("test_fan_zone_config"))
     test_suite.addTest(FscdConfigUnitTest("test_profile_config"))
+    test_suite.addTests(
+        unittest.defaultTestLoader.loadTestsFromTestCase(FscdZoneCacheTest)
+    )
+    return test_suite
+
+
+def expr_suite():
+    """
+    Gather all the tests from zone expression related tests in a test suite.
+    """
+    test_suite = unittest.TestSuite()
+    test_suite.addTests(unittest.defaultTestLoader.loadTestsFromTestCase(FscdExprTest))
+    test_suite.addTests(
+        unittest.defaultTestLoader.loadTestsFromTestCase(FscdParserTest)
+    )
+    return test_suite
+
+
+def tick_stats_suite():
+    """
+    Gather all the tests from tick instrumentation related tests in a test suite.
+    """
+    test_suite = unittest.TestSuite()
+    for test_case in (FscdTickStatsTest, FscdTickStatsSaveTest):
+        test_suite.addTests(unittest.defaultTestLoader.loadTestsFromTestCase(test_case))
     return test_suite
 
 
@@ -35,6 +67,23 @@ def bmc_machine_util_suite():
     return test_suite
 
 
+def bmc_machine_libpal_suite():
+    """
+    Gather all the tests from BMC Machine related tests in a test suite.(libpal)
+    """
+    return unittest.defaultTestLoader.loadTestsFromTestCase(FscdBmcMachineLibpalTest)
+
+
+def bmc_machine_concurrent_read_suite():
+    """
+    Gather all the tests from BMC Machine related tests in a test suite.
+    (concurrent FRU reads)
+    """
+    return unittest.defaultTestLoader.loadTestsFromTestCase(
+        FscdBmcMachineConcurrentReadTest
+    )
+
+
 def bmc_machine_sysfs_suite():
     """
     Gather all the tests from BMC Machine related tests in a test suite.(sysfs)
@@ -106,7 +155,21 @@ if __name__ == "__main__":
     # operational sysfs tests
     suite5 = operational_sysfs_suite()
 
-    alltests = unittest.TestSuite([suite1, suite2, suite3, suite4, suite5])
+    # bmc_machine libpal reads tests
+    suite6 = bmc_machine_libpal_suite()
+
+    # bmc_machine concurrent reads tests
+    suite7 = bmc_machine_concurrent_read_suite()
+
+    # zone expression tests
+    suite8 = expr_suite()
+
+    # tick instrumentation tests
+    suite9 = tick_stats_suite()
+
+    alltests = unittest.TestSuite(
+        [suite1, suite2, suite3, suite4, suite5, suite6, suite7, suite8, suite9]
+    )
     alltests.run(testResult)
 
     print_result(testResult)
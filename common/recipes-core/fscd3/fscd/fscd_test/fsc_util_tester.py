@@ -0,0 +1,107 @@
+# Copyright 2004-present Facebook. All Rights Reserved.
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import fsc_util
+import fscd
+
+
+class FscdTickStatsTest(unittest.TestCase):
+    # Tests tick phase durations are recorded and summarized
+
+    def setUp(self):
+        self.now = 100.0
+        patcher = mock.patch.object(fsc_util.time, "time", side_effect=self.time)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def time(self):
+        return self.now
+
+    def run_tick(self, stats, sensors, zones):
+        stats.start_tick()
+        with stats.phase("sensors"):
+            self.now += sensors
+        for zone in zones:
+            with stats.phase("zones"):
+                self.now += zone
+        return stats.end_tick()
+
+    def test_phases(self):
+        stats = fsc_util.TickStats()
+        total = self.run_tick(stats, 0.5, [0.25, 0.25])
+        self.assertAlmostEqual(total, 1.0)
+        tick = stats.ticks[-1]
+        self.assertEqual(list(tick), ["sensors", "zones", "total"])
+        self.assertAlmostEqual(tick["zones"], 0.5)
+
+    def test_ring_buffer(self):
+        stats = fsc_util.TickStats(size=10)
+        for i in range(25):
+            self.run_tick(stats, i, [])
+        self.assertEqual(len(stats.ticks), 10)
+        self.assertEqual(stats.count, 25)
+        self.assertEqual(stats.ticks[0]["sensors"], 15)
+
+    def test_percentiles(self):
+        stats = fsc_util.TickStats()
+        for i in range(1, 101):
+            self.run_tick(stats, i / 1000.0, [])
+        result = stats.percentiles()
+        self.assertEqual(result["ticks"], 100)
+        self.assertEqual(
+            result["phases_ms"]["sensors"],
+            {"p50": 50.0, "p90": 90.0, "p99": 99.0, "max": 100.0},
+        )
+
+
+class FscdTickStatsSaveTest(unittest.TestCase):
+    # Tests fscd saves the tick percentiles every TICK_STATS_SAVE_TICKS ticks
+
+    def setUp(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        record_dir = os.path.join(tmpdir, "cache_store/")
+        self.path = record_dir + "fscd_tick_stats"
+        for name, value in (
+            ("RECORD_DIR", record_dir),
+            ("TICK_STATS_PATH", self.path),
+        ):
+            patcher = mock.patch.object(fscd, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.fscd = fscd.Fscd.__new__(fscd.Fscd)
+        self.fscd.tick_stats = fsc_util.TickStats()
+        self.fscd.interval = 5
+
+    def run_ticks(self, count):
+        for _ in range(count):
+            self.fscd.tick_stats.start_tick()
+            with self.fscd.tick_stats.phase("sensors"):
+                pass
+            self.fscd.end_tick()
+
+    def test_end_tick_saves_percentiles(self):
+        self.run_ticks(fscd.TICK_STATS_SAVE_TICKS - 1)
+        self.assertFalse(os.path.exists(self.path))
+        self.run_ticks(1)
+        with open(self.path) as f:
+            saved = json.load(f)
+        self.assertEqual(saved["ticks"], fscd.TICK_STATS_SAVE_TICKS)
+        self.assertEqual(list(saved["phases_ms"]), ["sensors", "total"])
+        self.assertEqual(
+            list(saved["phases_ms"]["total"]), ["p50", "p90", "p99", "max"]
+        )
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["fscd_tick_stats"])
+
+    def test_save_failure_is_logged(self):
+        with mock.patch.object(fscd, "TICK_STATS_PATH", "/nonexistent/stats"):
+            with mock.patch.object(fscd.Logger, "warn") as warn:
+                self.run_ticks(fscd.TICK_STATS_SAVE_TICKS)
+        warn.assert_called_once()
+        self.assertIn("Failed to save tick stats", warn.call_args[0][0])
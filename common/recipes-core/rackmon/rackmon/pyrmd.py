@@ -3,22 +3,18 @@
 Modbus/rackmond library + Standalone tool to view current power/current
 readings
 """
+import ast
 import asyncio
 import contextlib
 import struct
 import time
 
-
-class ModbusException(Exception):
-    ...
-
-
-class ModbusTimeout(ModbusException):
-    ...
-
-
-class ModbusCRCError(ModbusException):
-    ...
+from rackmond_client import (  # noqa: F401
+    ModbusCRCError,
+    ModbusException,
+    ModbusTimeout,
+    RackmondClient,
+)
 
 
 modbuslog = None
@@ -45,41 +41,29 @@ def transcript():
         modbuslog = None
 
 
-# This many modbus requests can be in flight at once
-MAX_QUEUED = 15
-MODBUS_SEM = asyncio.Semaphore(MAX_QUEUED)
-
-
 async def modbuscmd(raw_cmd, expected=0, timeout=0):
-    async with MODBUS_SEM:
-        reader, writer = await asyncio.open_unix_connection("/var/run/rackmond.sock")
-        cmd_header = struct.pack("@HxxHHL", 1, len(raw_cmd), expected, timeout)
-        log("-> {}".format(" ".join("{:02x}".format(b) for b in raw_cmd)))
-        cmd = cmd_header + raw_cmd
-        req_header = struct.pack("@H", len(cmd))
-        writer.write(req_header + cmd)
-        response = await reader.read()
-        writer.close()
-        rlen, = struct.unpack("@H", response[:2])
-        if rlen == 0:
-            error, = struct.unpack("@H", response[2:4])
-            if error == 4:
-                log("<- timeout")
-                log("")
-                raise ModbusTimeout()
-            if error == 5:
-                log("<- [CRC ERROR]")
-                log("")
-                raise ModbusCRCError()
-            raise ModbusException(error)
-        log("<- {}".format(" ".join("{:02x}".format(b) for b in response[2:rlen])))
+    log("-> {}".format(" ".join("{:02x}".format(b) for b in raw_cmd)))
+    try:
+        response = await RackmondClient.instance().modbus(raw_cmd, expected, timeout)
+    except ModbusTimeout:
+        log("<- timeout")
         log("")
-        return response[2:rlen]
+        raise
+    except ModbusCRCError:
+        log("<- [CRC ERROR]")
+        log("")
+        raise
+    log("<- {}".format(" ".join("{:02x}".format(b) for b in response)))
+    log("")
+    return response
 
 
 async def read_register(addr, register, length=1, timeout=0):
     cmd = struct.pack(">BBHH", addr, 0x3, register, length)
     data = await modbuscmd(cmd, expected=5 + (2 * length), timeout=timeout)
+    if len(data) >= 3 and data[1] & 0x80:
+        # Exception response, e.g. 0x02 (illegal data address)
+        raise ModbusException(data[2])
     return data[3:]
 
 
@@ -113,40 +97,137 @@ REGISTERS = [
 ]
 
 
+# Most registers a single Read Holding Registers (0x03) request may ask for
+MAX_READ_REGISTERS = 125
+# Registers that are at most this many registers apart are read together,
+# reading the gap is cheaper than another transaction on the shared bus
+MAX_READ_GAP = 16
+
+
+class RegisterRead:
+    """
+    A single 0x03 read covering one or more registers.
+    """
+
+    __slots__ = ["start", "length", "regs"]
+
+    def __init__(self, reg):
+        self.start = reg.start
+        self.length = reg.length
+        self.regs = [reg]
+
+    def add(self, reg):
+        self.length = max(self.length, reg.start + reg.length - self.start)
+        self.regs.append(reg)
+
+    def slice(self, bs, reg):
+        offset = 2 * (reg.start - self.start)
+        return bs[offset : offset + 2 * reg.length]
+
+
+def plan_reads(regs, max_gap=MAX_READ_GAP, max_length=MAX_READ_REGISTERS):
+    """
+    Merge registers into the fewest reads of at most max_length registers,
+    joining registers that are at most max_gap registers apart.
+    """
+    reads = []
+    for reg in sorted(regs, key=lambda r: r.start):
+        if reads:
+            last = reads[-1]
+            end = max(last.start + last.length, reg.start + reg.length)
+            if (
+                reg.start - (last.start + last.length) <= max_gap
+                and end - last.start <= max_length
+            ):
+                last.add(reg)
+                continue
+        reads.append(RegisterRead(reg))
+    return reads
+
+
+RACKMON_CONFIG = "/etc/rackmon-config.py"
+DEFAULT_PSU_ADDRESSES = [0xA4, 0xA5, 0xA6, 0xB4, 0xB5, 0xB6]
+
+
+def load_psu_addresses(path=RACKMON_CONFIG):
+    """
+    PSU addresses to poll, from `psu_addresses` in rackmon-config. The file
+    is parsed rather than imported, as importing it pulls in rackmond.py.
+    """
+    try:
+        with open(path) as f:
+            tree = ast.parse(f.read(), path)
+    except (OSError, SyntaxError):
+        return DEFAULT_PSU_ADDRESSES
+    for node in tree.body:
+        if (
+            isinstance(node, ast.Assign)
+            and len(node.targets) == 1
+            and isinstance(node.targets[0], ast.Name)
+            and node.targets[0].id == "psu_addresses"
+        ):
+            try:
+                # Not a literal (ValueError) or not a sequence (TypeError)
+                return list(ast.literal_eval(node.value))
+            except (ValueError, TypeError):
+                return DEFAULT_PSU_ADDRESSES
+    return DEFAULT_PSU_ADDRESSES
+
+
 class PSU:
-    def __init__(self, addr, rescan=120):
+    def __init__(self, addr, rescan=120, regs=REGISTERS):
         self.addr = addr
         self.readings = {}
-        self.regs = REGISTERS
+        self.regs = regs
         self.uptimes = {}
         self.rescan = rescan
         self.recheck = None
+        # Set to 0 once the PSU rejects a read spanning unmapped registers
+        self.max_gap = MAX_READ_GAP
 
-    async def update_register(self, reg):
-        if reg.interval and time.time() < reg.interval + self.uptimes.get(reg.name, 0):
-            return
+    def due_registers(self, now):
+        return [
+            reg
+            for reg in self.regs
+            if not reg.interval or now >= reg.interval + self.uptimes.get(reg.name, 0)
+        ]
+
+    async def update_registers(self, read):
         try:
-            bs = await read_register(self.addr, reg.start, reg.length)
+            bs = await read_register(self.addr, read.start, read.length)
+        except (ModbusTimeout, ModbusCRCError):
+            for reg in read.regs:
+                self.readings[reg.name] = None
+            return False
+        except ModbusException:
+            if len(read.regs) == 1:
+                self.readings[read.regs[0].name] = None
+                return False
+            # The PSU rejects reads of the registers in between (unmapped
+            # addresses), read these one by one and stop spanning gaps
+            self.max_gap = 0
+            results = []
+            for reg in read.regs:
+                results.append(await self.update_registers(RegisterRead(reg)))
+            return any(results)
+        now = time.time()
+        for reg in read.regs:
+            reg_bs = read.slice(bs, reg)
             if reg.convert:
-                self.readings[reg.name] = reg.convert(bs)
+                self.readings[reg.name] = reg.convert(reg_bs)
             else:
-                self.readings[reg.name] = bs
-            self.uptimes[reg.name] = time.time()
-            return True
-        except ModbusTimeout:
-            self.readings[reg.name] = None
-            return False
+                self.readings[reg.name] = reg_bs
+            self.uptimes[reg.name] = now
+        return True
 
     async def read(self):
         now = time.time()
         if self.recheck and now < self.recheck:
             return
         self.recheck = None
-        if all(
-            not ok
-            for ok in await asyncio.gather(
-                *[self.update_register(reg) for reg in self.regs]
-            )
+        reads = plan_reads(self.due_registers(now), max_gap=self.max_gap)
+        if not any(
+            await asyncio.gather(*[self.update_registers(read) for read in reads])
         ):
             # If all reads failed, wait `rescan` seconds to check this PSU
             # address again
@@ -155,7 +236,7 @@ class PSU:
 
 
 async def modelscan():
-    addrs = [0xA4, 0xA5, 0xA6, 0xB4, 0xB5, 0xB6]
+    addrs = load_psu_addresses()
     psus = [PSU(a) for a in addrs]
     cols = [reg.name for reg in REGISTERS]
     widths = {}
@@ -4,6 +4,9 @@ import sys
 from rackmond import configure_rackmond
 
 
+# PSU addresses polled by pyrmd (see load_psu_addresses())
+psu_addresses = [0xA4, 0xA5, 0xA6, 0xB4, 0xB5, 0xB6]
+
 reglist = [
     {"begin": 0x0, "length": 8, "flags": 0x8000},  # MFR_MODEL     # ascii
     {"begin": 0x10, "length": 8, "flags": 0x8000},  # MFR_DATE      # ascii
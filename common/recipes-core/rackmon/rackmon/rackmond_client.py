@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+#
+# Copyright 2014-present Facebook. All Rights Reserved.
+#
+# This program file is free software; you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the
+# Free Software Foundation; version 2 of the License.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License
+# for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program in a file named COPYING; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor,
+# Boston, MA 02110-1301 USA
+#
+"""
+Shared asyncio client for the rackmond command socket.
+
+rackmond serves one request per connection: it reads a length prefixed
+command, writes the reply and closes the socket (see handle_connection() in
+rackmond.c), so connections cannot be kept open between commands. What the
+client shares instead is the non-blocking I/O path, a bounded queue in front
+of rackmond, per-command latency histograms and typed errors.
+"""
+
+import asyncio
+import bisect
+import struct
+import time
+import typing as t
+
+RACKMOND_SOCKET = "/var/run/rackmond.sock"
+
+# from rackmond.h
+COMMAND_TYPE_RAW_MODBUS = 1
+
+# from modbus.h, reported negated by rackmond in the reply header
+MODBUS_RESPONSE_TIMEOUT = 4
+MODBUS_BAD_CRC = 5
+
+# This many commands can be in flight at once; rackmond handles them one at
+# a time, the rest wait in the socket backlog.
+MAX_INFLIGHT = 15
+# Commands waiting for an in-flight slot beyond this are rejected with
+# RackmondBusy instead of piling up behind a stuck rackmond.
+MAX_QUEUED = 64
+
+# Minimum time to wait for rackmond to reply. This is on top of the modbus
+# timeout of the command itself, which rackmond enforces.
+RACKMOND_MIN_TIMEOUT_MS = 5000
+
+# Upper bounds (ms) of the latency histogram buckets, the last bucket is
+# open ended.
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class RackmondError(Exception):
+    ...
+
+
+class RackmondUnavailable(RackmondError):
+    """rackmond socket could not be connected to"""
+
+
+class RackmondBusy(RackmondError):
+    """Too many commands are already queued"""
+
+
+class RackmondTimeout(RackmondError):
+    """rackmond did not reply in time"""
+
+
+class RackmondProtocolError(RackmondError):
+    """rackmond sent a reply that could not be parsed"""
+
+
+class ModbusException(RackmondError):
+    ...
+
+
+class ModbusTimeout(ModbusException):
+    ...
+
+
+class ModbusCRCError(ModbusException):
+    ...
+
+
+class LatencyHistogram:
+    def __init__(self, buckets: t.Sequence[float] = LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def to_dict(self) -> t.Dict[str, t.Any]:
+        labels = ["le_{}".format(b) for b in self.buckets] + ["inf"]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0,
+            "max_ms": round(self.max_ms, 3),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+def command_name(cmd: bytes) -> str:
+    (cmd_type,) = struct.unpack_from("@H", cmd)
+    return "type_{}".format(cmd_type)
+
+
+def modbus_command_name(data: bytes) -> str:
+    if len(data) < 2:
+        return "raw_modbus"
+    return "raw_modbus:0x{:02x}".format(data[1])
+
+
+def pack_raw_modbus(data: bytes, expected: int = 0, timeout: int = 0) -> bytes:
+    return struct.pack(
+        "@HxxHHL", COMMAND_TYPE_RAW_MODBUS, len(data), expected, timeout
+    ) + bytes(data)
+
+
+def parse_raw_modbus(reply: bytes) -> bytes:
+    """
+    Return the modbus response (without CRC) from a raw modbus reply, or
+    raise the error rackmond reported.
+    """
+    if len(reply) < 2:
+        raise RackmondProtocolError("short reply from rackmond: {!r}".format(reply))
+    (rlen,) = struct.unpack_from("@H", reply)
+    if rlen == 0:
+        if len(reply) < 4:
+            raise RackmondProtocolError(
+                "short error reply from rackmond: {!r}".format(reply)
+            )
+        (error,) = struct.unpack_from("@H", reply, 2)
+        if error == MODBUS_RESPONSE_TIMEOUT:
+            raise ModbusTimeout()
+        if error == MODBUS_BAD_CRC:
+            raise ModbusCRCError()
+        raise ModbusException(error)
+    return reply[2:rlen]
+
+
+class RackmondClient:
+    _instance = None
+
+    def __init__(
+        self,
+        path: str = RACKMOND_SOCKET,
+        max_inflight: int = MAX_INFLIGHT,
+        max_queued: int = MAX_QUEUED,
+    ):
+        self.path = path
+        self.max_inflight = max_inflight
+        self.max_queued = max_queued
+        self.histograms = {}  # type: t.Dict[str, LatencyHistogram]
+        self.errors = {}  # type: t.Dict[str, int]
+        self._sem = None  # type: t.Optional[asyncio.Semaphore]
+        self._waiting = 0
+
+    @classmethod
+    def instance(cls) -> "RackmondClient":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    async def command(
+        self, cmd: bytes, timeout: int = 0, name: t.Optional[str] = None
+    ) -> bytes:
+        """
+        Send a rackmond command (without the length prefix) and return the
+        raw reply. timeout is the modbus timeout of the command in ms, the
+        reply is waited for RACKMOND_MIN_TIMEOUT_MS longer than that. name
+        is the latency histogram the command is accounted to, by default
+        the command type.
+        """
+        if self._sem is None:
+            # Created lazily so that it binds to the loop that runs it
+            self._sem = asyncio.Semaphore(self.max_inflight)
+        if self._sem.locked() and self._waiting >= self.max_queued:
+            self._count_error(RackmondBusy)
+            raise RackmondBusy(
+                "{} rackmond commands already queued".format(self._waiting)
+            )
+        name = name or command_name(cmd)
+        self._waiting += 1
+        try:
+            await self._sem.acquire()
+        finally:
+            self._waiting -= 1
+        try:
+            start = time.monotonic()
+            reply = await asyncio.wait_for(
+                self._exchange(cmd), (RACKMOND_MIN_TIMEOUT_MS + timeout) / 1000
+            )
+            self._observe(name, (time.monotonic() - start) * 1000)
+            return reply
+        except asyncio.TimeoutError:
+            self._count_error(RackmondTimeout)
+            raise RackmondTimeout("no reply from rackmond for {}".format(name))
+        finally:
+            self._sem.release()
+
+    async def raw_modbus(
+        self, data: bytes, expected: int = 0, timeout: int = 0
+    ) -> bytes:
+        """
+        Run a raw modbus command and return rackmond's reply as is, i.e.
+        the length header followed by the response or error code.
+        """
+        return await self.command(
+            pack_raw_modbus(data, expected, timeout),
+            timeout,
+            name=modbus_command_name(data),
+        )
+
+    async def modbus(self, data: bytes, expected: int = 0, timeout: int = 0) -> bytes:
+        """
+        Run a raw modbus command and return the response without CRC.
+        Raises ModbusTimeout, ModbusCRCError or ModbusException on errors
+        reported by rackmond.
+        """
+        reply = await self.raw_modbus(data, expected, timeout)
+        try:
+            return parse_raw_modbus(reply)
+        except RackmondError as e:
+            self._count_error(type(e))
+            raise
+
+    def stats(self) -> t.Dict[str, t.Any]:
+        return {
+            "latency": {k: h.to_dict() for k, h in self.histograms.items()},
+            "errors": dict(self.errors),
+            "queued": self._waiting,
+        }
+
+    async def _exchange(self, cmd: bytes) -> bytes:
+        try:
+            reader, writer = await asyncio.open_unix_connection(self.path)
+        except OSError as e:
+            self._count_error(RackmondUnavailable)
+            raise RackmondUnavailable(
+                "cannot connect to {}: {}".format(self.path, e)
+            ) from e
+        try:
+            writer.write(struct.pack("@H", len(cmd)) + cmd)
+            # rackmond closes the connection once the reply is written
+            return await reader.read()
+        finally:
+            writer.close()
+
+    def _observe(self, name: str, ms: float) -> None:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = LatencyHistogram()
+        histogram.observe(ms)
+
+    def _count_error(self, error: t.Type[Exception]) -> None:
+        self.errors[error.__name__] = self.errors.get(error.__name__, 0) + 1
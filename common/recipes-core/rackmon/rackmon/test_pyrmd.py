@@ -0,0 +1,146 @@
+import asyncio
+import os
+import struct
+import tempfile
+import unittest
+from unittest import mock
+
+import pyrmd
+
+
+def regs(*spans):
+    return [
+        pyrmd.Register("r{:x}".format(start), start, length)
+        for start, length in spans
+    ]
+
+
+def spans(reads):
+    return [(read.start, read.length, [r.name for r in read.regs]) for read in reads]
+
+
+class TestPlanReads(unittest.TestCase):
+    def test_default_registers(self):
+        self.assertEqual(
+            spans(pyrmd.plan_reads(pyrmd.REGISTERS)),
+            [
+                (0x0, 8, ["model"]),
+                (0x38, 4, ["fw"]),
+                (0x8C, 11, ["current", "power"]),
+            ],
+        )
+
+    def test_gap_coalescing(self):
+        self.assertEqual(
+            spans(pyrmd.plan_reads(regs((0x10, 2), (0x0, 4), (0x30, 1)), max_gap=12)),
+            [(0x0, 0x12, ["r0", "r10"]), (0x30, 1, ["r30"])],
+        )
+
+    def test_no_gap(self):
+        self.assertEqual(
+            spans(pyrmd.plan_reads(regs((0x0, 4), (0x4, 2), (0x7, 1)), max_gap=0)),
+            [(0x0, 6, ["r0", "r4"]), (0x7, 1, ["r7"])],
+        )
+
+    def test_overlapping(self):
+        self.assertEqual(
+            spans(pyrmd.plan_reads(regs((0x0, 8), (0x2, 2)))),
+            [(0x0, 8, ["r0", "r2"])],
+        )
+
+    def test_max_span_split(self):
+        reads = pyrmd.plan_reads(
+            regs((0x0, 60), (0x40, 60), (0x80, 4)), max_gap=16, max_length=125
+        )
+        self.assertEqual(
+            spans(reads),
+            [(0x0, 0x40 + 60, ["r0", "r40"]), (0x80, 4, ["r80"])],
+        )
+        for read in reads:
+            self.assertLessEqual(read.length, pyrmd.MAX_READ_REGISTERS)
+
+    def test_slice(self):
+        (read,) = pyrmd.plan_reads(regs((0x0, 2), (0x4, 1)))
+        bs = bytes(range(10))
+        self.assertEqual(read.slice(bs, read.regs[0]), bytes([0, 1, 2, 3]))
+        self.assertEqual(read.slice(bs, read.regs[1]), bytes([8, 9]))
+
+
+class TestLoadPsuAddresses(unittest.TestCase):
+    def load(self, source):
+        with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False) as f:
+            f.write(source)
+        self.addCleanup(os.unlink, f.name)
+        return pyrmd.load_psu_addresses(f.name)
+
+    def test_configured(self):
+        self.assertEqual(
+            self.load("import sys\npsu_addresses = [0xA4, 0xB4]\n"), [0xA4, 0xB4]
+        )
+
+    def test_fallback(self):
+        for source in (
+            "reglist = []\n",
+            "psu_addresses = [0xA4\n",
+            "psu_addresses = get_addresses()\n",
+            "psu_addresses = 0xA4\n",
+        ):
+            with self.subTest(source=source):
+                self.assertEqual(self.load(source), pyrmd.DEFAULT_PSU_ADDRESSES)
+
+    def test_missing_file(self):
+        self.assertEqual(
+            pyrmd.load_psu_addresses("/nonexistent/rackmon-config.py"),
+            pyrmd.DEFAULT_PSU_ADDRESSES,
+        )
+
+
+class FakePSUBus:
+    """
+    Register map of a PSU that answers 0x03 reads, with an exception
+    response (illegal data address) for reads of unmapped registers
+    """
+
+    def __init__(self, mapped):
+        self.mapped = mapped
+        self.reads = []
+
+    async def modbus(self, cmd, expected=0, timeout=0):
+        addr, func, start, length = struct.unpack(">BBHH", cmd)
+        self.reads.append((start, length))
+        if any(r not in self.mapped for r in range(start, start + length)):
+            return bytes([addr, func | 0x80, 0x02])
+        data = b"".join(
+            struct.pack(">H", self.mapped[r]) for r in range(start, start + length)
+        )
+        return bytes([addr, func, len(data)]) + data
+
+
+class TestPSURead(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        self.bus = FakePSUBus({0x0: 1, 0x1: 2, 0x10: 3})
+        patcher = mock.patch.object(
+            pyrmd.RackmondClient, "instance", return_value=self.bus
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.psu = pyrmd.PSU(0xA4, regs=regs((0x0, 2), (0x10, 1)))
+
+    def test_rejected_gap_is_read_separately(self):
+        self.loop.run_until_complete(self.psu.read())
+        self.assertEqual(self.bus.reads, [(0x0, 0x11), (0x0, 2), (0x10, 1)])
+        self.assertEqual(self.psu.readings, {"r0": b"\0\1\0\2", "r10": b"\0\3"})
+        self.assertIsNone(self.psu.recheck)
+
+        # Gaps are no longer read from this PSU
+        self.bus.reads = []
+        self.loop.run_until_complete(self.psu.read())
+        self.assertEqual(self.bus.reads, [(0x0, 2), (0x10, 1)])
+
+    def test_rejected_register(self):
+        self.psu.regs = regs((0x20, 1))
+        self.loop.run_until_complete(self.psu.read())
+        self.assertEqual(self.psu.readings, {"r20": None})
+        self.assertIsNotNone(self.psu.recheck)
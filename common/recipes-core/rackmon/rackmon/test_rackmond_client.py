@@ -0,0 +1,93 @@
+import asyncio
+import os
+import struct
+import tempfile
+import unittest
+from unittest import mock
+
+import rackmond_client
+
+
+EXAMPLE_MODBUS_RESPONSE = bytes([0x7, 0x0, 0xA4, 0x3, 0x2, 0x49, 0x76, 0x42, 0x2B])
+
+
+class TestRackmondClient(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, "rackmond.sock")
+        self.requests = []
+        self.replies = []
+        self.server = self.loop.run_until_complete(
+            asyncio.start_unix_server(self.handle, path=self.path)
+        )
+        self.addCleanup(self.server.close)
+        self.client = rackmond_client.RackmondClient(self.path)
+
+    async def handle(self, reader, writer):
+        # One request per connection, like rackmond
+        (length,) = struct.unpack("@H", await reader.readexactly(2))
+        self.requests.append(await reader.readexactly(length))
+        if self.replies:
+            writer.write(self.replies.pop(0))
+            await writer.drain()
+        else:
+            # Stuck rackmond, keep the connection open without a reply
+            await asyncio.sleep(1)
+        writer.close()
+
+    def run_coro(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    def test_raw_modbus(self):
+        self.replies.append(EXAMPLE_MODBUS_RESPONSE)
+        data = bytes([164, 3, 0, 128, 0, 1])
+        reply = self.run_coro(self.client.raw_modbus(data, 7, 2))
+        self.assertEqual(reply, EXAMPLE_MODBUS_RESPONSE)
+        self.assertEqual(self.requests, [rackmond_client.pack_raw_modbus(data, 7, 2)])
+        stats = self.client.stats()
+        self.assertEqual(stats["latency"]["raw_modbus:0x03"]["count"], 1)
+
+    def test_modbus_strips_header_and_crc(self):
+        self.replies.append(EXAMPLE_MODBUS_RESPONSE)
+        response = self.run_coro(self.client.modbus(bytes([164, 3, 0, 128, 0, 1])))
+        self.assertEqual(response, bytes([0xA4, 0x3, 0x2, 0x49, 0x76]))
+
+    def test_modbus_errors(self):
+        for code, error in [
+            (4, rackmond_client.ModbusTimeout),
+            (5, rackmond_client.ModbusCRCError),
+            (7, rackmond_client.ModbusException),
+        ]:
+            self.replies.append(struct.pack("@HH", 0, code))
+            with self.assertRaises(error):
+                self.run_coro(self.client.modbus(bytes([164, 3])))
+        self.assertEqual(self.client.stats()["errors"]["ModbusTimeout"], 1)
+
+    def test_unavailable(self):
+        client = rackmond_client.RackmondClient(self.path + ".none")
+        with self.assertRaises(rackmond_client.RackmondUnavailable):
+            self.run_coro(client.raw_modbus(bytes([164, 3])))
+
+    def test_timeout(self):
+        # The modbus timeout of the command is added to the minimum wait
+        with mock.patch.object(rackmond_client, "RACKMOND_MIN_TIMEOUT_MS", 0):
+            with self.assertRaises(rackmond_client.RackmondTimeout):
+                self.run_coro(self.client.raw_modbus(bytes([164, 3]), timeout=50))
+        self.assertEqual(self.client.stats()["errors"]["RackmondTimeout"], 1)
+
+    def test_queue_limit(self):
+        client = rackmond_client.RackmondClient(self.path, max_inflight=1, max_queued=1)
+        self.replies.extend([EXAMPLE_MODBUS_RESPONSE] * 2)
+
+        async def run_commands():
+            return await asyncio.gather(
+                *[client.raw_modbus(bytes([164, 3])) for _ in range(3)],
+                return_exceptions=True
+            )
+
+        results = self.run_coro(run_commands())
+        self.assertEqual(results[:2], [EXAMPLE_MODBUS_RESPONSE] * 2)
+        self.assertIsInstance(results[2], rackmond_client.RackmondBusy)
@@ -456,6 +456,23 @@ int gpio_get_value(gpio_desc_t *gdesc, gpio_value_t *value)
 	return GPIO_OPS()->get_pin_value(gdesc, value);
 }
 
+int gpio_get_values(gpio_desc_t **gdescs, size_t num, gpio_value_t *values)
+{
+	size_t i;
+
+	if (gdescs == NULL || values == NULL) {
+		errno = EINVAL;
+		return -1;
+	}
+
+	for (i = 0; i < num; i++) {
+		if (gpio_get_value(gdescs[i], &values[i]) != 0)
+			return -1;
+	}
+
+	return 0;
+}
+
 int gpio_set_value(gpio_desc_t *gdesc, gpio_value_t value)
 {
 	if (!IS_VALID_GPIO_DESC(gdesc) || !IS_VALID_GPIO_VALUE(value)) {
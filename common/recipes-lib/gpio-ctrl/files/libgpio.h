@@ -197,6 +197,14 @@ int gpio_set_direction(gpio_desc_t *gdesc, gpio_direction_t dir);
 int gpio_get_edge(gpio_desc_t *gdesc, gpio_edge_t *edge);
 int gpio_set_edge(gpio_desc_t *gdesc, gpio_edge_t edge);
 
+/*
+ * Read the values of <num> opened gpio pins into <values>, in order.
+ *
+ * Return:
+ *   0 for success, or -1 on failures.
+ */
+int gpio_get_values(gpio_desc_t **gdescs, size_t num, gpio_value_t *values);
+
 /* Get GPIO value given the shadow name of the gpio-pin.
  *
  * Return:
@@ -138,6 +138,29 @@ class GPIO:
             raise GpioOperationFailure(ctypes.get_errno())
         return GPIOValue(value.value)
 
+    @staticmethod
+    def get_values(gpios):
+        """
+        Read the values of a list of opened GPIOs in one library call.
+        """
+        descs = (ctypes.c_void_p * len(gpios))()
+        for i, gpio in enumerate(gpios):
+            if gpio.desc is None:
+                raise GpioOperationFailure(1)
+            descs[i] = gpio.desc
+        values = (ctypes.c_int * len(gpios))()
+        get_values = lgpio_hndl.gpio_get_values
+        get_values.argtypes = (
+            ctypes.POINTER(ctypes.c_void_p),
+            ctypes.c_size_t,
+            ctypes.POINTER(ctypes.c_int),
+        )
+        get_values.restype = ctypes.c_int
+        ret = get_values(descs, len(gpios), values)
+        if ret != 0:
+            raise GpioOperationFailure(ctypes.get_errno())
+        return [GPIOValue(value) for value in values]
+
     def set_value(self, val, init=False):
         if self.desc is None:
             raise GpioOperationFailure(1)
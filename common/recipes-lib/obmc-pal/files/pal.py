@@ -29,7 +29,7 @@ import ctypes
 import re
 from contextlib import suppress
 from functools import lru_cache
-from typing import Dict, Tuple, List, NamedTuple
+from typing import Dict, Iterator, Tuple, List, NamedTuple, Optional, Sequence
 
 libpal = ctypes.CDLL("libpal.so.0")
 
@@ -129,6 +129,17 @@ def pal_is_fru_prsnt(fru_id: int) -> bool:
     return bool(c_status.value)
 
 
+def pal_is_fru_ready(fru_id: int) -> bool:
+    "Returns whether a fru is ready to be accessed"
+    c_status = ctypes.c_uint8()
+
+    ret = libpal.pal_is_fru_ready(fru_id, ctypes.pointer(c_status))
+    if ret != 0:
+        return False
+
+    return bool(c_status.value)
+
+
 def pal_is_slot_server(fru_id: int) -> bool:
     "Return whether a FRU is a server type or not"
     return libpal.pal_is_slot_server(fru_id) != 0
@@ -168,6 +179,21 @@ def pal_get_4byte_postcode(fru: int):
     return ret
 
 
+@lru_cache(maxsize=None)
+def pal_alter_sensor_thresh_flag(fru_id: int, snr_num: int, flag: int) -> int:
+    """
+    Let the platform mask out thresholds it does not want reported. flag
+    comes from the (memoized) SDR, so the result is memoized as well.
+    """
+    c_flag = ctypes.c_uint16(flag)
+
+    libpal.pal_alter_sensor_thresh_flag(
+        fru_id, ctypes.c_uint8(snr_num), ctypes.pointer(c_flag)
+    )
+
+    return c_flag.value
+
+
 ## Sensor reading functions
 def pal_sensor_is_cached(fru_id: int, snr_num: int) -> bool:
     return bool(libpal.pal_sensor_is_cached(fru_id, snr_num))
@@ -230,3 +256,128 @@ def sensor_read_history(fru_id: int, snr_num: int, start_time: int) -> SensorHis
         raise LibPalError("sensor_read_history() returned " + str(ret))
 
     return SensorHistory(min_val.value, max_val.value, avg_val.value)
+
+
+## Batch sensor reading functions
+#
+# Read a set of sensors of a FRU in one call into arrays allocated once per
+# call, instead of allocating ctypes objects (and building python objects)
+# for every sensor.
+
+
+class FruSensorReadings:
+    "Sensor readings of a FRU, backed by ctypes arrays"
+
+    __slots__ = ("fru_id", "snr_nums", "values", "status")
+
+    def __init__(self, fru_id: int, snr_nums: Tuple[int, ...], values, status):
+        self.fru_id = fru_id
+        self.snr_nums = snr_nums
+        self.values = values
+        self.status = status
+
+    def __len__(self) -> int:
+        return len(self.snr_nums)
+
+    def __iter__(self) -> Iterator[Tuple[int, Optional[float]]]:
+        "Yields (snr_num, value) pairs, value is None if the read failed"
+        for i, snr_num in enumerate(self.snr_nums):
+            yield snr_num, self.value_at(i)
+
+    def value_at(self, index: int) -> Optional[float]:
+        if self.status[index] != 0:
+            return None
+        return self.values[index]
+
+
+class FruSensorHistory:
+    "Sensor history of a FRU, backed by ctypes arrays"
+
+    __slots__ = ("fru_id", "snr_nums", "min_vals", "avg_vals", "max_vals", "status")
+
+    def __init__(
+        self,
+        fru_id: int,
+        snr_nums: Tuple[int, ...],
+        min_vals,
+        avg_vals,
+        max_vals,
+        status,
+    ):
+        self.fru_id = fru_id
+        self.snr_nums = snr_nums
+        self.min_vals = min_vals
+        self.avg_vals = avg_vals
+        self.max_vals = max_vals
+        self.status = status
+
+    def __len__(self) -> int:
+        return len(self.snr_nums)
+
+    def __iter__(self) -> Iterator[Tuple[int, Optional[SensorHistory]]]:
+        "Yields (snr_num, history) pairs, history is None if the read failed"
+        for i, snr_num in enumerate(self.snr_nums):
+            yield snr_num, self.history_at(i)
+
+    def history_at(self, index: int) -> Optional[SensorHistory]:
+        if self.status[index] != 0:
+            return None
+        return SensorHistory(
+            self.min_vals[index], self.max_vals[index], self.avg_vals[index]
+        )
+
+
+def sensor_read_fru(
+    fru_id: int, snr_nums: Optional[Sequence[int]] = None
+) -> FruSensorReadings:
+    """
+    Read all (or the given) sensors of a FRU, cache first with a raw read
+    fallback like sensor_read(). Failed reads are flagged in the result
+    instead of raising LibPalError.
+    """
+    if snr_nums is None:
+        snr_nums = pal_get_fru_sensor_list(fru_id)
+    snr_nums = tuple(snr_nums)
+    cnt = len(snr_nums)
+    values = (ctypes.c_float * cnt)()
+    status = (ctypes.c_int * cnt)()
+    stride = ctypes.sizeof(ctypes.c_float)
+    is_cached = libpal.pal_sensor_is_cached
+    cache_read = libpal.sensor_cache_read
+    raw_read = libpal.sensor_raw_read
+
+    for i, snr_num in enumerate(snr_nums):
+        c_val = ctypes.byref(values, i * stride)
+        if is_cached(fru_id, snr_num):
+            status[i] = cache_read(fru_id, snr_num, c_val)
+        else:
+            status[i] = raw_read(fru_id, snr_num, c_val)
+
+    return FruSensorReadings(fru_id, snr_nums, values, status)
+
+
+def sensor_read_history_fru(
+    fru_id: int, snr_nums: Sequence[int], start_time: int
+) -> FruSensorHistory:
+    "Batch version of sensor_read_history(), see sensor_read_fru()"
+    snr_nums = tuple(snr_nums)
+    cnt = len(snr_nums)
+    min_vals = (ctypes.c_float * cnt)()
+    avg_vals = (ctypes.c_float * cnt)()
+    max_vals = (ctypes.c_float * cnt)()
+    status = (ctypes.c_int * cnt)()
+    stride = ctypes.sizeof(ctypes.c_float)
+    read_history = libpal.sensor_read_history
+
+    for i, snr_num in enumerate(snr_nums):
+        offset = i * stride
+        status[i] = read_history(
+            fru_id,
+            snr_num,
+            ctypes.byref(min_vals, offset),
+            ctypes.byref(avg_vals, offset),
+            ctypes.byref(max_vals, offset),
+            start_time,
+        )
+
+    return FruSensorHistory(fru_id, snr_nums, min_vals, avg_vals, max_vals, status)
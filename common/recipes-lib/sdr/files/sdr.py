@@ -25,6 +25,7 @@ make tracing and debugging easier
 """
 import ctypes
 from functools import lru_cache
+from typing import Dict, NamedTuple
 
 libsdr = ctypes.CDLL("libsdr.so")
 
@@ -125,3 +126,72 @@ def sdr_get_sensor_thresh(fru: int, snr_num: int) -> ThreshSensor:
     if ret != 0:
         raise LibSdrError("sdr_get_snr_thresh() returned " + str(ret))
     return c_sensor_thresholds
+
+
+SensorMetadata = NamedTuple(
+    "SensorMetadata",
+    [("name", str), ("units", str), ("thresh", ThreshSensor)],
+)
+
+
+@lru_cache(maxsize=None)
+def sdr_get_sensor_metadata(fru: int, snr_num: int) -> SensorMetadata:
+    """
+    Given a (fru_id, snr_num) pair, return the sensor name, units and
+    thresholds. All of them come from a single SDR lookup and are cached,
+    as SDR records do not change at runtime. Callers must not modify the
+    returned thresh object.
+    """
+    thresh = sdr_get_sensor_thresh(fru, snr_num)
+    return SensorMetadata(
+        thresh.name.decode("utf-8"), thresh.units.decode("utf-8"), thresh
+    )
+
+
+# (name, ThreshSensor field, bit of ThreshSensor.flag) in sensor-util's
+# print order
+THRESHOLDS = (
+    ("UCR", "ucr_thresh", 1),
+    ("UNC", "unc_thresh", 2),
+    ("UNR", "unr_thresh", 3),
+    ("LCR", "lcr_thresh", 4),
+    ("LNC", "lnc_thresh", 5),
+    ("LNR", "lnr_thresh", 6),
+)
+# Evaluated in order, the last crossed threshold wins (as in sensor-util)
+UPPER_THRESHOLDS = ("UNC", "UCR", "UNR")
+LOWER_THRESHOLDS = ("LNC", "LCR", "LNR")
+
+
+def format_conv(value: float) -> float:
+    "Same rounding as sdr.h FORMAT_CONV(), applied before threshold checks"
+    return int(value * 100 + 0.5) * 0.01
+
+
+def sensor_thresholds(thresh: ThreshSensor, flag: int) -> Dict[str, float]:
+    """
+    Given a sensor's thresholds and threshold flag (as adjusted by
+    pal_alter_sensor_thresh_flag()), return the enabled thresholds by name
+    """
+    return {
+        name: getattr(thresh, field)
+        for name, field, bit in THRESHOLDS
+        if flag & (1 << bit)
+    }
+
+
+def sensor_status(value: float, thresh: ThreshSensor, flag: int) -> str:
+    """
+    Status sensor-util reports for a reading: 'ns' if the sensor has no
+    thresholds, 'ok', or the (lower case) name of the crossed threshold
+    """
+    status = "ns" if flag == 0 else "ok"
+    value = format_conv(value)
+    thresholds = sensor_thresholds(thresh, flag)
+    for name in UPPER_THRESHOLDS:
+        if name in thresholds and value >= format_conv(thresholds[name]):
+            status = name.lower()
+    for name in LOWER_THRESHOLDS:
+        if name in thresholds and value <= format_conv(thresholds[name]):
+            status = name.lower()
+    return status
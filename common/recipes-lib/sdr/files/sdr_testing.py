@@ -0,0 +1,38 @@
+# Copyright 2015-present Facebook. All Rights Reserved.
+#
+# This program file is free software; you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the
+# Free Software Foundation; version 2 of the License.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License
+# for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program in a file named COPYING; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor,
+# Boston, MA 02110-1301 USA
+#
+"""
+Unit test support for users of the sdr bindings, used from the source tree
+only (not installed)
+"""
+import importlib.util
+import os
+from unittest import mock
+
+SDR_PY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sdr.py")
+
+
+def load_sdr():
+    """
+    The sdr bindings, loaded under another name without libsdr.so, for
+    their pure python helpers (sensor_status, sensor_thresholds...)
+    """
+    spec = importlib.util.spec_from_file_location("sdr_helpers", SDR_PY)
+    module = importlib.util.module_from_spec(spec)
+    with mock.patch("ctypes.CDLL"):
+        spec.loader.exec_module(module)
+    return module
@@ -41,6 +41,7 @@ def load_acl_cache(cpath: str) -> t.Dict[str, t.List[str]]:
 
 class CachedAclProvider(common_acl_provider_base.AclProviderBase):
     def __init__(self, cachepath: Optional[str] = None):
+        super().__init__()
         self.cachepath = cachepath
         self.aclrules = {}  # type: t.Dict[str, t.List[str]]
         self._load_aclrules()
@@ -72,3 +73,4 @@ class CachedAclProvider(common_acl_provider_base.AclProviderBase):
             return
 
         self.aclrules = load_acl_cache(self.cachepath)
+        self.invalidate_decisions()
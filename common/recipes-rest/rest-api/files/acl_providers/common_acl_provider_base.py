@@ -19,6 +19,7 @@
 #
 
 import abc
+import functools
 import ipaddress
 import re
 import socket
@@ -32,6 +33,10 @@ LINK_LOCAL_IPV6 = ipaddress.IPv6Address("fe80::2")
 # e.g. "a_hostname-oob.example.com" -> prefix="a_hostname"
 RE_OOB_SUFFIX = re.compile(r"(?P<prefix>^[^.]+?)(?P<suffix>-oob)?(?=[.])")
 
+# Authorization decisions cached per provider, the cache is emptied when it
+# grows beyond this
+MAX_CACHED_DECISIONS = 1024
+
 
 class HostRoles:
     # Role that matches any managed host
@@ -41,16 +46,35 @@ class HostRoles:
 class AclProviderBase(metaclass=abc.ABCMeta):
     def __init__(self):
         super().__init__()
+        self._decisions = {}  # type: t.Dict[t.Tuple[Identity, t.Tuple[str, ...]], bool]
+        self._decisions_hostname = None  # type: t.Optional[str]
 
     def is_authorized(self, identity: Identity, permissions: t.List[str]) -> bool:
         """
         Returns True if any user/host role matching the identity are in the given
-        permissions list
+        permissions list. Decisions are cached until invalidate_decisions() is
+        called (e.g. when the ACL rules are reloaded) or the hostname changes.
         """
-        user_authorized = self.is_user_authorized(identity, permissions)
-        host_authorized = self.is_host_authorized(identity, permissions)
-
-        return user_authorized or host_authorized
+        hostname = socket.gethostname()
+        if hostname != self._decisions_hostname:
+            # host roles depend on our own hostname
+            self.invalidate_decisions()
+            self._decisions_hostname = hostname
+
+        key = (identity, tuple(permissions))
+        decision = self._decisions.get(key)
+        if decision is None:
+            user_authorized = self.is_user_authorized(identity, permissions)
+            host_authorized = self.is_host_authorized(identity, permissions)
+            decision = user_authorized or host_authorized
+            if len(self._decisions) >= MAX_CACHED_DECISIONS:
+                self._decisions.clear()
+            self._decisions[key] = decision
+
+        return decision
+
+    def invalidate_decisions(self) -> None:
+        self._decisions.clear()
 
     @abc.abstractmethod
     def is_user_authorized(self, identity: Identity, permissions: t.List[str]) -> bool:
@@ -94,12 +118,15 @@ class AclProviderBase(metaclass=abc.ABCMeta):
     def _get_managed_hostnames() -> t.List[str]:
         # TODO: Replace de-oobifying with a better source of truth for managed
         # hostnames
-        oob_hostname = socket.gethostname()
+        return list(_managed_hostnames(socket.gethostname()))
 
-        # e.g. "blah-oob.example.com" -> "blah.example.com"
-        hostname = RE_OOB_SUFFIX.sub(r"\g<prefix>", oob_hostname)
 
-        if oob_hostname != hostname:
-            return [hostname]
+@functools.lru_cache(maxsize=4)
+def _managed_hostnames(oob_hostname: str) -> t.Tuple[str, ...]:
+    # e.g. "blah-oob.example.com" -> "blah.example.com"
+    hostname = RE_OOB_SUFFIX.sub(r"\g<prefix>", oob_hostname)
 
-        return []
+    if oob_hostname != hostname:
+        return (hostname,)
+
+    return ()
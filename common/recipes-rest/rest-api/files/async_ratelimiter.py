@@ -18,39 +18,142 @@
 # Boston, MA 02110-1301 USA
 #
 
-import asyncio
-import collections
+import time
+import typing as t
+
+
+# Each window is tracked as this many fixed sub-windows, so requests expire
+# with a granularity of slidewindow_size / SUBWINDOWS.
+SUBWINDOWS = 10
+
+
+class WindowCounter:
+    """
+    Number of requests seen in the last SUBWINDOWS sub-windows, kept in a
+    ring of per sub-window counts. Expired sub-windows are cleared lazily
+    when the counter is advanced to the current one.
+    """
+
+    __slots__ = ("counts", "total", "slot")
+
+    def __init__(self, subwindows: int, slot: int):
+        self.counts = [0] * subwindows
+        self.total = 0
+        self.slot = slot
+
+    def advance(self, slot: int) -> None:
+        n = len(self.counts)
+        if slot - self.slot >= n:
+            if self.total:
+                self.counts = [0] * n
+                self.total = 0
+        else:
+            for expired in range(self.slot + 1, slot + 1):
+                self.total -= self.counts[expired % n]
+                self.counts[expired % n] = 0
+        self.slot = slot
+
+    def add(self) -> None:
+        self.counts[self.slot % len(self.counts)] += 1
+        self.total += 1
 
 
 class AsyncRateLimiter:
     """
     Async ratelmiter records successful requests per client,
-    method and endpoint into a counter.
+    method and endpoint in sliding window counters.
     Ratelimits (if enabled) are applied for all endpoints.
-    Ratelimiter is configurable from rest.cfg (slidewindow size and request limit)
+    Ratelimiter is configurable from rest.cfg (slidewindow size and request limits)
     If a client hits limit within the slidewindow, requests will be denied,
     until older request records time out. Then requests are allowed again.
+
+    limit applies per (endpoint, method, user agent), client_limit per user
+    agent across all endpoints and global_limit to all requests. A limit of 0
+    disables it. Counters are only updated when a request is checked, and
+    counters that have been idle for a whole window are evicted once per
+    window, so neither memory nor event loop time grows with the request rate.
     """
 
-    def __init__(self, slidewindow_size: int, limit: int):
-        self._request_counter = collections.Counter()
+    def __init__(
+        self,
+        slidewindow_size: int,
+        limit: int,
+        client_limit: int = 0,
+        global_limit: int = 0,
+        subwindows: int = SUBWINDOWS,
+        clock: t.Callable[[], float] = time.monotonic,
+    ):
+        # The window is irrelevant when ratelimiting is disabled
+        if (limit or client_limit or global_limit) and slidewindow_size <= 0:
+            raise ValueError(
+                "slidewindow_size must be positive, got {}".format(slidewindow_size)
+            )
+        if subwindows <= 0:
+            raise ValueError("subwindows must be positive, got {}".format(subwindows))
         self.slidewindow_size = slidewindow_size
         self.limit = limit
+        self.client_limit = client_limit
+        self.global_limit = global_limit
+        self.subwindows = subwindows
+        self.clock = clock
+        self._request_counters = {}  # type: t.Dict[t.Tuple[str, ...], WindowCounter]
+        self._client_counters = {}  # type: t.Dict[str, WindowCounter]
+        self._global_counter = None  # type: t.Optional[WindowCounter]
+        self._last_eviction = None  # type: t.Optional[int]
+
+    def _slot(self) -> int:
+        return int(self.clock() * self.subwindows / self.slidewindow_size)
+
+    def _counter(self, counters: t.Dict, key: t.Any, slot: int) -> WindowCounter:
+        counter = counters.get(key)
+        if counter is None:
+            counter = counters[key] = WindowCounter(self.subwindows, slot)
+        else:
+            counter.advance(slot)
+        return counter
+
+    def _evict_idle(self, slot: int) -> None:
+        if self._last_eviction is None:
+            self._last_eviction = slot
+        if slot - self._last_eviction < self.subwindows:
+            return
+        self._last_eviction = slot
+        for counters in (self._request_counters, self._client_counters):
+            idle = [
+                key
+                for key, counter in counters.items()
+                if slot - counter.slot >= self.subwindows
+            ]
+            for key in idle:
+                del counters[key]
 
     async def is_limited(self, endpoint: str, method: str, user_agent: str) -> bool:
         """
         Check if request has hit the rate limit for given slidewindow.
         """
-        # If the limit is set to 0, it means that we dont want ratelimiting. Bail early
-        if self.limit == 0:
-            return False
-        if self._request_counter[(endpoint, method, user_agent)] >= self.limit:
-            return True
-        else:
-            self._request_counter[(endpoint, method, user_agent)] += 1
-            asyncio.ensure_future(self._cleanup(endpoint, method, user_agent))
+        # If all limits are set to 0, we dont want ratelimiting. Bail early
+        if not (self.limit or self.client_limit or self.global_limit):
             return False
-
-    async def _cleanup(self, endpoint: str, method: str, user_agent: str):
-        await asyncio.sleep(self.slidewindow_size)
-        self._request_counter[(endpoint, method, user_agent)] -= 1
+        slot = self._slot()
+        self._evict_idle(slot)
+        counters = []
+        if self.limit:
+            counter = self._counter(
+                self._request_counters, (endpoint, method, user_agent), slot
+            )
+            counters.append((counter, self.limit))
+        if self.client_limit:
+            counter = self._counter(self._client_counters, user_agent, slot)
+            counters.append((counter, self.client_limit))
+        if self.global_limit:
+            if self._global_counter is None:
+                self._global_counter = WindowCounter(self.subwindows, slot)
+            else:
+                self._global_counter.advance(slot)
+            counters.append((self._global_counter, self.global_limit))
+        for counter, limit in counters:
+            if counter.total >= limit:
+                return True
+        for counter, _ in counters:
+            counter.add()
+        return False
@@ -19,9 +19,11 @@
 #
 
 import datetime
+import functools
 import ipaddress
 import re
 import typing as t
+import weakref
 from contextlib import suppress
 
 from aiohttp.log import server_logger
@@ -52,6 +54,12 @@ RE_SPECIAL_CERT_COMMON_NAME = re.compile(
 
 RE_IPV6_LINK_LOCAL_SUFFIX = re.compile("%[a-z0-9]+$")
 
+# Identity extracted for each connection, with the time it is valid until
+# (the peer certificate's notAfter) or None. The peer certificate and address
+# of a connection never change, so keep-alive clients are only identified
+# once per connection (or until their certificate expires).
+_identity_cache = weakref.WeakKeyDictionary()  # type: weakref.WeakKeyDictionary
+
 
 def auth_required(request) -> Identity:
     identity = _extract_identity(request)
@@ -82,9 +90,7 @@ def _validate_cert_date(request) -> bool:
             % (request.method, request.path)
         )
         return False
-    cert_valid = (
-        datetime.datetime.strptime(peercert["notAfter"], "%b %d %H:%M:%S %Y %Z") > now()
-    )
+    cert_valid = _parse_cert_date(peercert["notAfter"]) > now()
     if not cert_valid:
         server_logger.info(
             "AUTH:Client sent client certificates for request [%s]%s, but it expired at: %s"
@@ -94,7 +100,35 @@ def _validate_cert_date(request) -> bool:
     return True
 
 
+@functools.lru_cache(maxsize=64)
+def _parse_cert_date(date: str) -> datetime.datetime:
+    return datetime.datetime.strptime(date, "%b %d %H:%M:%S %Y %Z")
+
+
 def _extract_identity(request: Request) -> Identity:
+    transport = request.transport
+    # transport is None once the connection is gone, or may not support
+    # weak references, in which case the identity is not cached
+    with suppress(TypeError):
+        cached = _identity_cache.get(transport)
+        if cached is not None:
+            identity, valid_until = cached
+            if valid_until is None or valid_until > now():
+                return identity
+
+    identity = _extract_identity_uncached(request)
+
+    valid_until = None
+    with suppress(AttributeError, KeyError, TypeError, ValueError):
+        valid_until = _parse_cert_date(
+            transport.get_extra_info("peercert")["notAfter"]
+        )
+    with suppress(TypeError):
+        _identity_cache[transport] = (identity, valid_until)
+    return identity
+
+
+def _extract_identity_uncached(request: Request) -> Identity:
     # Try extracting identity from TLS peer certificate
     with suppress(ValueError):
         return _extract_identity_from_peercert(request)
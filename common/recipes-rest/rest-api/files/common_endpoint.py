@@ -33,12 +33,18 @@ import rest_psu_update
 import rest_sensors
 import rest_server
 from aiohttp import web
+from common_response import cached_response
 from common_utils import (
     common_force_async,
     get_data_from_generator,
     get_endpoints,
     dumps_bytestr,
 )
+from sensor_snapshot import get_sensor_snapshot
+
+# PIMs can be swapped while the BMC is up, so their FRU data is only cached
+# for this many seconds.
+FRUID_PIM_MAX_AGE = 60
 
 
 class commonApp_Handler:
@@ -55,6 +61,7 @@ class commonApp_Handler:
         }
         return web.json_response(result, dumps=dumps_bytestr)
 
+    @cached_response()
     @common_force_async
     def rest_api(self, request):
         return self.helper_rest_api(request)
@@ -68,6 +75,7 @@ class commonApp_Handler:
         }
         return web.json_response(result, dumps=dumps_bytestr)
 
+    @cached_response()
     @common_force_async
     def rest_sys(self, request):
         return self.helper_rest_sys(request)
@@ -81,14 +89,21 @@ class commonApp_Handler:
         }
         return web.json_response(result, dumps=dumps_bytestr)
 
+    @cached_response()
     @common_force_async
     def rest_mb_sys(self, request):
         return self.helper_rest_mb_sys(request)
 
     # Handler for sys/mb/fruid resource endpoint
     def helper_rest_fruid_hdl(self, request):
-        return web.json_response(rest_fruid.get_fruid(), dumps=dumps_bytestr)
-
+        fruid = rest_fruid.get_fruid()
+        headers = None
+        if not fruid["Information"]:
+            # weutil failed or timed out, read it again on the next request
+            headers = {"Cache-Control": "no-store"}
+        return web.json_response(fruid, dumps=dumps_bytestr, headers=headers)
+
+    @cached_response()
     @common_force_async
     def rest_fruid_hdl(self, request):
         return self.helper_rest_fruid_hdl(request)
@@ -97,6 +112,7 @@ class commonApp_Handler:
     def helper_rest_fruid_pim_hdl(self, request):
         return web.json_response(rest_fruid_pim.get_fruid(), dumps=dumps_bytestr)
 
+    @cached_response(max_age=FRUID_PIM_MAX_AGE)
     @common_force_async
     def rest_fruid_pim_hdl(self, request):
         return self.helper_rest_fruid_pim_hdl(request)
@@ -123,12 +139,9 @@ class commonApp_Handler:
         return self.helper_rest_server_act_hdl(request)
 
     # Handler for sensors resource endpoint
-    def helper_rest_sensors_hdl(self, request):
-        return web.json_response(rest_sensors.get_sensors(), dumps=dumps_bytestr)
-
-    @common_force_async
-    def rest_sensors_hdl(self, request):
-        return self.helper_rest_sensors_hdl(request)
+    async def rest_sensors_hdl(self, request):
+        result = await get_sensor_snapshot(request, rest_sensors.get_sensors)
+        return web.json_response(result, dumps=dumps_bytestr)
 
     # Handler for gpios resource endpoint
     def helper_rest_gpios_hdl(self, request):
@@ -20,11 +20,22 @@
 
 import datetime
 import logging
+import logging.handlers
 import os
+import queue
 import sys
-from typing import Any, Dict
+from contextlib import suppress
+from typing import Any, Dict, List, Optional
 
 import json_log_formatter
+from aiohttp.log import access_logger, server_logger
+
+# Access log records wait in a queue of this size for the listener thread,
+# which formats and writes up to ACCESS_LOG_BATCH_SIZE of them at a time.
+# When the log destination stalls for long enough to fill the queue, new
+# records are dropped (and counted) rather than blocking the event loop.
+ACCESS_LOG_QUEUE_SIZE = 1024
+ACCESS_LOG_BATCH_SIZE = 64
 
 
 class OpenBMCJSONFormatter(json_log_formatter.JSONFormatter):
@@ -35,15 +46,20 @@ class OpenBMCJSONFormatter(json_log_formatter.JSONFormatter):
         if record.name != "aiohttp.access":
             extra["message"] = message
         else:
-            # reformat access log request time to isoformat
-            extra["request_time"] = datetime.datetime.strptime(
-                extra["request_time"][1:-1], "%d/%b/%Y:%H:%M:%S %z"
-            ).isoformat()
+            # The request started request_time_micro (%D) before the
+            # record was created, no need to parse the %t timestamp back.
+            extra.pop("request_start_time", None)
+            start = record.created
+            with suppress(KeyError, ValueError):
+                start -= int(extra["request_time_micro"]) / 1000000
+            extra["request_time"] = (
+                datetime.datetime.fromtimestamp(start).astimezone().isoformat()
+            )
         # Include loglevel
         extra["level"] = record.levelname
 
         if "time" not in extra:
-            extra["time"] = datetime.datetime.utcnow()
+            extra["time"] = datetime.datetime.utcfromtimestamp(record.created)
 
         if record.exc_info:
             extra["exc_info"] = self.formatException(record.exc_info)
@@ -61,6 +77,152 @@ class JsonSyslogFormatter(OpenBMCJSONFormatter):
         return "rest-api: %s" % (super(JsonSyslogFormatter, self).format(record),)
 
 
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that never blocks the caller. Records that do not fit in
+    the queue are counted in dropped and discarded.
+    """
+
+    def __init__(self, queue: queue.Queue):
+        super().__init__(queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting is left to the listener thread
+        return record
+
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """
+    QueueListener that takes whatever records are waiting (up to
+    batch_size) and writes them to stream handlers with one write and one
+    flush per batch. Drops counted by queue_handler are reported through
+    server_logger.
+    """
+
+    def __init__(
+        self,
+        queue: queue.Queue,
+        *handlers: logging.Handler,
+        respect_handler_level: bool = True,
+        batch_size: int = ACCESS_LOG_BATCH_SIZE,
+        queue_handler: Optional[DroppingQueueHandler] = None
+    ):
+        super().__init__(queue, *handlers, respect_handler_level=respect_handler_level)
+        self.batch_size = batch_size
+        self.queue_handler = queue_handler
+        self.reported_drops = 0
+
+    def enqueue_sentinel(self) -> None:
+        # The queue may be full, wait for room rather than fail to stop
+        self.queue.put(self._sentinel)
+
+    def _monitor(self) -> None:
+        while True:
+            batch = [self.dequeue(True)]
+            while batch[-1] is not self._sentinel and len(batch) < self.batch_size:
+                try:
+                    batch.append(self.dequeue(False))
+                except queue.Empty:
+                    break
+            stop = batch[-1] is self._sentinel
+            if stop:
+                batch.pop()
+            if batch:
+                self.handle_batch(batch)
+            for _ in range(len(batch) + stop):
+                self.queue.task_done()
+            if stop:
+                return
+
+    def handle_batch(self, records: List[logging.LogRecord]) -> None:
+        for handler in self.handlers:
+            accepted = [
+                record
+                for record in records
+                if not self.respect_handler_level or record.levelno >= handler.level
+            ]
+            if not accepted:
+                continue
+            if isinstance(handler, logging.StreamHandler):
+                self._write_batch(handler, accepted)
+            else:
+                for record in accepted:
+                    handler.handle(record)
+        self.report_drops()
+
+    @staticmethod
+    def _write_batch(
+        handler: logging.StreamHandler, records: List[logging.LogRecord]
+    ) -> None:
+        lines = []
+        last = None
+        for record in records:
+            if not handler.filter(record):
+                continue
+            try:
+                lines.append(handler.format(record) + handler.terminator)
+            except Exception:
+                handler.handleError(record)
+            else:
+                last = record
+        if not lines:
+            return
+        text = "".join(lines)
+        handler.acquire()
+        try:
+            if isinstance(handler, logging.handlers.RotatingFileHandler):
+                # Checked once per batch, with its last record, so a file may
+                # overshoot maxBytes by up to one batch. shouldRollover() also
+                # opens the stream if the handler was created with delay.
+                if handler.shouldRollover(last):
+                    handler.doRollover()
+                    # doRollover() leaves the stream closed with delay
+                    handler.shouldRollover(last)
+            handler.stream.write(text)
+            handler.flush()
+        except Exception:
+            handler.handleError(records[-1])
+        finally:
+            handler.release()
+
+    def report_drops(self) -> None:
+        if self.queue_handler is None:
+            return
+        dropped = self.queue_handler.dropped
+        if dropped != self.reported_drops:
+            server_logger.warning(
+                "Dropped %d access log records", dropped - self.reported_drops
+            )
+            self.reported_drops = dropped
+
+
+def start_access_log_listener(
+    maxsize: int = ACCESS_LOG_QUEUE_SIZE,
+) -> BatchingQueueListener:
+    """
+    Move the access log off the event loop: records go through a bounded
+    queue to a listener thread writing to the handlers configured on the
+    root logger. Call after get_logger_config() has been applied, and stop
+    the returned listener on exit to flush what is left.
+    """
+    log_queue = queue.Queue(maxsize)
+    queue_handler = DroppingQueueHandler(log_queue)
+    listener = BatchingQueueListener(
+        log_queue, *logging.getLogger().handlers, queue_handler=queue_handler
+    )
+    access_logger.addHandler(queue_handler)
+    access_logger.propagate = False
+    listener.start()
+    return listener
+
+
 ACCESS_LOG_FORMAT = (
     '%a %l %u %t "%r" %s %b %Dus "%{identity}i" "%{Referrer}i" "%{User-Agent}i"'
 )
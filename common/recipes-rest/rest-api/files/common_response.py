@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+#
+# Copyright 2014-present Facebook. All Rights Reserved.
+#
+# This program file is free software; you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the
+# Free Software Foundation; version 2 of the License.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License
+# for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program in a file named COPYING; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor,
+# Boston, MA 02110-1301 USA
+#
+
+import collections
+import functools
+import hashlib
+import time
+import typing as t
+
+from aiohttp import web
+
+
+# Most responses ResponseCache keeps, the least recently used are dropped
+RESPONSE_CACHE_MAX_ENTRIES = 128
+
+
+def make_etag(body: bytes) -> str:
+    return '"{}"'.format(hashlib.sha1(body).hexdigest())
+
+
+def etag_matches(request: web.Request, etag: str) -> bool:
+    if_none_match = request.headers.get("If-None-Match")
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        # If-None-Match uses the weak comparison
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in (etag, "*"):
+            return True
+    return False
+
+
+class CachedBody:
+    def __init__(
+        self,
+        body: bytes,
+        content_type: str,
+        charset: t.Optional[str],
+        expires: t.Optional[float],
+    ):
+        self.body = body
+        self.content_type = content_type
+        self.charset = charset
+        self.etag = make_etag(body)
+        self.expires = expires
+
+    def response(self, request: web.Request) -> web.Response:
+        if etag_matches(request, self.etag):
+            return web.Response(status=304, headers={"ETag": self.etag})
+        return web.Response(
+            body=self.body,
+            content_type=self.content_type,
+            charset=self.charset,
+            headers={"ETag": self.etag},
+        )
+
+
+class ResponseCache:
+    """
+    Encoded bodies of successful responses, keyed on handler and path (or
+    URL), for handlers whose data is static (max_age None) or only changes
+    every so often. Clients that send back the ETag get a 304 without a
+    body. At most max_entries bodies are kept, in LRU order.
+    """
+
+    _instance = None
+
+    def __init__(
+        self,
+        clock: t.Callable[[], float] = time.monotonic,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+    ):
+        self.clock = clock
+        self.max_entries = max_entries
+        self._bodies = collections.OrderedDict()  # type: t.Dict[t.Tuple, CachedBody]
+
+    @classmethod
+    def instance(cls) -> "ResponseCache":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def get(self, key: t.Tuple[str, str]) -> t.Optional[CachedBody]:
+        cached = self._bodies.get(key)
+        if cached is None:
+            return None
+        if cached.expires is not None and self.clock() >= cached.expires:
+            del self._bodies[key]
+            return None
+        self._bodies.move_to_end(key)
+        return cached
+
+    def put(
+        self,
+        key: t.Tuple[str, str],
+        response: web.Response,
+        max_age: t.Optional[float],
+    ) -> t.Optional[CachedBody]:
+        if response.status != 200 or not isinstance(response.body, bytes):
+            return None
+        # Handlers opt out for responses that must not be reused, e.g. ones
+        # built from a failed command
+        if "no-store" in response.headers.get("Cache-Control", ""):
+            return None
+        expires = None
+        if max_age is not None:
+            expires = self.clock() + max_age
+        cached = CachedBody(
+            response.body, response.content_type, response.charset, expires
+        )
+        self._bodies[key] = cached
+        self._bodies.move_to_end(key)
+        while len(self._bodies) > self.max_entries:
+            self._bodies.popitem(last=False)
+        return cached
+
+    def invalidate(self) -> None:
+        self._bodies.clear()
+
+
+def cached_response(max_age: t.Optional[float] = None, vary_query: bool = False):
+    """
+    Decorator for async handlers (functions or methods, the request being
+    the last positional argument) whose response may be served from
+    ResponseCache for max_age seconds, or for good if max_age is None.
+    Responses are cached per path, the query string is ignored unless
+    vary_query is set for handlers whose response depends on it. Responses
+    sent with "Cache-Control: no-store" are not cached.
+    """
+
+    def decorator(handler):
+        name = handler.__module__ + "." + handler.__qualname__
+
+        @functools.wraps(handler)
+        async def wrapper(*args):
+            request = args[-1]
+            if vary_query:
+                key = (name, str(request.rel_url))
+            else:
+                key = (name, request.path)
+            cache = ResponseCache.instance()
+            cached = cache.get(key)
+            if cached is None:
+                response = await handler(*args)
+                cached = cache.put(key, response, max_age)
+                if cached is None:
+                    return response
+            return cached.response(request)
+
+        return wrapper
+
+    return decorator
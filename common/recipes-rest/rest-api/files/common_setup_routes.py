@@ -44,7 +44,7 @@ def setup_common_routes(app: Application, write_enabled: bool):
         server_logger.info("Adding compute base-routes")
         # compute specific common routes
         # Create /api end point as root node
-        node_shim = RestShim(get_node_api(), "/api")
+        node_shim = RestShim(get_node_api(), "/api", cached=True)
         app.router.add_get(node_shim.path, node_shim.get_handler)
 
         # /api/bmc end point
@@ -1,4 +1,5 @@
 import asyncio
+import functools
 import json
 import os
 from concurrent.futures import ThreadPoolExecutor
@@ -18,6 +19,7 @@ def common_force_async(func):
     # board-specific REST handler, so that any problem in
     # common REST handlers will not interfere with board-specific
     # REST handler, and vice versa
+    @functools.wraps(func)
     async def func_wrapper(self, *args, **kwargs):
         # Convert the possibly blocking helper function into async
         loop = asyncio.get_event_loop()
@@ -66,29 +68,31 @@ def get_endpoints(path: str):
     return endpoints
 
 
+def default_bytestr(o):
+    # If the object is a byte string, it will be converted
+    # to a regular string. Otherwise we move on (pass) to
+    # the usual error generation routine
+    try:
+        o = o.decode("utf-8")
+        return o
+    except AttributeError:
+        pass
+    raise TypeError(repr(o) + " is not JSON serializable")
+
+
+# aiohttp's json_response function uses py3 JSON encoder, which
+# doesn't know how to handle a byte string. So we extend the encoder
+# to handle the case. This is a standard way to add a new type,
+# as stated in JSON encoder source code. The encoder is built once,
+# json.dumps() would set up a new one for every response.
+_bytestr_encoder = json.JSONEncoder(default=default_bytestr)
+
+
 # aiohttp allows users to pass a "dumps" function, which will convert
-# different data types to JSON. This new dumps function will simply call
-# the original dumps function, along with the new type handler that can
-# process byte strings.
+# different data types to JSON. This dumps function is capable of
+# processing byte strings.
 def dumps_bytestr(obj):
-    # aiohttp's json_response function uses py3 JSON encoder, which
-    # doesn't know how to handle a byte string. So we extend this function
-    # to handle the case. This is a standard way to add a new type,
-    # as stated in JSON encoder source code.
-    def default_bytestr(o):
-        # If the object is a byte string, it will be converted
-        # to a regular string. Otherwise we move on (pass) to
-        # the usual error generation routine
-        try:
-            o = o.decode("utf-8")
-            return o
-        except AttributeError:
-            pass
-        raise TypeError(repr(o) + " is not JSON serializable")
-
-    # Just call default dumps function, but pass the new default function
-    # that is capable of process byte strings.
-    return json.dumps(obj, default=default_bytestr)
+    return _bytestr_encoder.encode(obj)
 
 
 def running_systemd():
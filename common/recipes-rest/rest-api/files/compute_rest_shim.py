@@ -18,6 +18,7 @@
 # Boston, MA 02110-1301 USA
 #
 from aiohttp import web
+from common_response import cached_response
 from common_utils import (
     dumps_bytestr,
     get_endpoints,
@@ -29,10 +30,14 @@ class RestShim:
     # The purpose of this class is to enable using old
     # node style compute rest controllers with the fboss
     # style routing by providing a get and post action
-    # for each compute node-based rest endpoint
-    def __init__(self, node: node, path: str):
+    # for each compute node-based rest endpoint. Nodes whose
+    # information never changes can have their GET response cached.
+    def __init__(self, node: node, path: str, cached: bool = False):
         self.node = node
         self.path = path
+        if cached:
+            # Nodes get the query as parameters
+            self.get_handler = cached_response(vary_query=True)(self.get_handler)
 
     async def get_handler(self, request):
         param = dict(request.query)
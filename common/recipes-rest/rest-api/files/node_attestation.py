@@ -28,12 +28,70 @@ try:
 except ImportError:
     ATTESTATION_AVAILABLE = False
     # Doing this so that we don't break upstream
+import asyncio
+import time
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
+
 from aiohttp.web import Application
 from compute_rest_shim import RestShim
 from node import node
 
 ACCEPTABLE_ALGORITHMS = ["sha1", "sha256"]
 
+# Flashes are updated outside of the REST API (flashcp, fw-util...) and
+# nothing tells us when, so cached measurements expire after this many
+# seconds.
+MEASUREMENT_MAX_AGE = 300
+
+# Measurements hash whole flash devices. They get their own executor so
+# that they block neither the event loop nor the common REST executor.
+attestation_executor = ThreadPoolExecutor(2)
+
+
+class MeasurementCache:
+    """
+    Results of measure(args), cached per (algo, flash devices) for max_age
+    seconds. Expiry is by age only, a flash written in the meantime is not
+    noticed until then. Concurrent requests for the same measurement share
+    a single run of measure.
+    """
+
+    def __init__(self, measure: t.Callable, max_age: float = MEASUREMENT_MAX_AGE):
+        self.measure = measure
+        self.max_age = max_age
+        self._results = {}  # type: t.Dict[t.Tuple, t.Tuple[float, t.Any]]
+        self._inflight = {}  # type: t.Dict[t.Tuple, asyncio.Future]
+
+    async def get(self, args: t.Dict[str, t.Any]) -> t.Any:
+        key = (args["algo"], args["flash0"], args["flash1"])
+        cached = self._results.get(key)
+        if cached is not None and time.monotonic() - cached[0] <= self.max_age:
+            return cached[1]
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._measure(key, args))
+            self._inflight[key] = inflight
+        return await asyncio.shield(inflight)
+
+    async def _measure(self, key: t.Tuple, args: t.Dict[str, t.Any]) -> t.Any:
+        try:
+            loop = asyncio.get_event_loop()
+            result = await loop.run_in_executor(
+                attestation_executor, self.measure, dict(args)
+            )
+            self._results[key] = (time.monotonic(), result)
+            return result
+        finally:
+            del self._inflight[key]
+
+
+def measure_system(args: t.Dict[str, t.Any]) -> t.Any:
+    return obmc_attestation.measure.return_measure(args)
+
+
+system_measurements = MeasurementCache(measure_system)
+
 
 def setup_attestation_endpoints(app: Application) -> None:
     attestation_shim = RestShim(node(), "/api/attestation")
@@ -82,7 +140,18 @@ class NodeSystemInfo(node):
             )
         result = {}
         # Let's get the system hashes first
-        result["system_hashes"] = obmc_attestation.measure.return_measure(args)
+        result["system_hashes"] = await system_measurements.get(args)
+        loop = asyncio.get_event_loop()
+        result.update(
+            await loop.run_in_executor(
+                attestation_executor, NodeSystemInfo.getStaticInformation
+            )
+        )
+        return result
+
+    @staticmethod
+    def getStaticInformation():
+        result = {}
         tpm_object = obmc_attestation.tpm2.Tpm2v4()
         # Let's get the TPM static info like TPM version
         result["tpm_info"] = tpm_object.get_tpm_static_information()
@@ -136,7 +205,11 @@ class NodeDeviceAttestation(node):
         action = data["action"]
         del data["action"]
         if action == "measurement":
-            return device_attestation.measure.return_measure(**data)
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(
+                attestation_executor,
+                lambda: device_attestation.measure.return_measure(**data),
+            )
         else:
             return {
                 "status": "1",
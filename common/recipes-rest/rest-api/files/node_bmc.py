@@ -21,9 +21,12 @@
 import asyncio
 import functools
 import json
+import mmap
 import os
 import os.path
 import re
+import struct
+import time
 import typing as t
 from shlex import quote
 from subprocess import PIPE, Popen, check_output, CalledProcessError
@@ -106,6 +109,120 @@ async def getSPIVendor(spi_id):
     return getSPIVendorNew(spi_id)
 
 
+# Address of the WDT1 timeout status register, non-zero after a WDT reset
+WDT_COUNTER_ADDR = 0x1E785010
+
+# /proc/stat is sampled this often (seconds) to compute the CPU usage
+CPU_SAMPLE_INTERVAL = 5
+
+# Fields of the /proc/stat cpu line, in order, as named by busybox top
+CPU_STAT_FIELDS = ("usr", "nic", "sys", "idle", "io", "irq", "sirq")
+# Order in which busybox top prints them
+CPU_USAGE_ORDER = ("usr", "sys", "nic", "idle", "io", "irq", "sirq")
+
+
+def read_phymem32(addr: int) -> int:
+    page = addr & ~(mmap.PAGESIZE - 1)
+    with open("/dev/mem", "rb") as f:
+        with mmap.mmap(
+            f.fileno(), mmap.PAGESIZE, mmap.MAP_SHARED, mmap.PROT_READ, offset=page
+        ) as reg_map:
+            return struct.unpack_from("<I", reg_map, addr - page)[0]
+
+
+def read_cpu_stat() -> t.List[int]:
+    with open("/proc/stat") as f:
+        # e.g. "cpu  4705 356 584 3699 23 23 0 0 0 0"
+        values = f.readline().split()[1:]
+    return [int(v) for v in values[: len(CPU_STAT_FIELDS)]]
+
+
+def format_cpu_usage(prev: t.List[int], cur: t.List[int]) -> str:
+    # Same as the second line of busybox `top -b n1`
+    deltas = {name: c - p for name, p, c in zip(CPU_STAT_FIELDS, prev, cur)}
+    total = sum(deltas.values()) or 1
+    return "CPU:" + "".join(
+        " {:3d}% {}".format(100 * deltas[name] // total, name)
+        for name in CPU_USAGE_ORDER
+    )
+
+
+def format_mem_usage(meminfo: t.Dict[str, int]) -> str:
+    # Same as the first line of busybox `top -b n1`
+    return "Mem: {}K used, {}K free, {}K shrd, {}K buff, {}K cached".format(
+        meminfo.get("MemTotal", 0) - meminfo.get("MemFree", 0),
+        meminfo.get("MemFree", 0),
+        meminfo.get("Shmem", 0),
+        meminfo.get("Buffers", 0),
+        meminfo.get("Cached", 0),
+    )
+
+
+def format_uptime(
+    now: time.struct_time, uptime_seconds: float, load_avg: t.List[str]
+) -> str:
+    # Same as the output of busybox `uptime`
+    updays = int(uptime_seconds) // (60 * 60 * 24)
+    upminutes = int(uptime_seconds) // 60
+    uphours = (upminutes // 60) % 24
+    upminutes %= 60
+    out = "{:02d}:{:02d}:{:02d} up ".format(now.tm_hour, now.tm_min, now.tm_sec)
+    if updays:
+        out += "{} day{}, ".format(updays, "s" if updays != 1 else "")
+    if uphours:
+        out += "{:2d}:{:02d}".format(uphours, upminutes)
+    else:
+        out += "{} min".format(upminutes)
+    return out + ",  load average: " + ", ".join(load_avg)
+
+
+def is_asd_running() -> bool:
+    # Equivalent of `ps | grep -i [a]sd`
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            with open("/proc/%s/cmdline" % pid, "rb") as f:
+                cmdline = f.read()
+        except OSError:
+            continue
+        if b"asd" in cmdline.lower():
+            return True
+    return False
+
+
+class CpuSampler:
+    """
+    CPU usage over the last sampling interval, from /proc/stat deltas
+    taken by a background task. Until the task took its first sample the
+    usage is the average since boot, like `top -b n1`.
+    """
+
+    _instance = None
+
+    def __init__(self, interval: float = CPU_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.prev = [0] * len(CPU_STAT_FIELDS)
+        self.cur = read_cpu_stat()
+        self._sampler = None  # type: t.Optional[asyncio.Future]
+
+    @classmethod
+    def instance(cls) -> "CpuSampler":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def usage(self) -> str:
+        if self._sampler is None or self._sampler.done():
+            self._sampler = asyncio.ensure_future(self._sample())
+        return format_cpu_usage(self.prev, self.cur)
+
+    async def _sample(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            self.prev, self.cur = self.cur, read_cpu_stat()
+
+
 @functools.lru_cache(maxsize=1)
 def read_proc_mtd() -> t.List[str]:
     mtd_list = []
@@ -251,80 +368,40 @@ class bmcNode(node):
                     pass
         return meminfo
 
-    async def getInformation(self, param=None):
-        # Get Platform Name
-        name = rest_pal_legacy.pal_get_platform_name()
-
-        # Get MAC Address
+    def getMacAddr(self):
         eth_intf = rest_pal_legacy.pal_get_eth_intf_name()
         mac_path = "/sys/class/net/%s/address" % (eth_intf)
         if os.path.isfile(mac_path):
             mac = open(mac_path).read()
-            mac_addr = mac[0:17].upper()
-        else:
-            mac = get_mac()
-            mac_addr = ":".join(("%012X" % mac)[i : i + 2] for i in range(0, 12, 2))
-
-        # Get BMC Reset Reason
-        _, wdt_counter, _ = await async_exec(["devmem", "0x1e785010"])
-        wdt_counter = int(wdt_counter, 0)
-        wdt_counter &= 0xFF00
-
-        if wdt_counter:
-            por_flag = 0
-        else:
-            por_flag = 1
-
-        if por_flag:
-            reset_reason = "Power ON Reset"
-        else:
-            reset_reason = "User Initiated Reset or WDT Reset"
-
-        # Get BMC's Up Time
-        _, stdout, _ = await async_exec("uptime", shell=True)
-        uptime = stdout.strip()
-
-        # Use another method, ala /proc, but keep the old one for backwards
-        # compat.
-        # See http://man7.org/linux/man-pages/man5/proc.5.html for details
-        # on full contents of proc endpoints.
-        uptime_seconds = read_file_contents("/proc/uptime")[0].split()[0]
-
-        # Pull load average directory from proc instead of processing it from
-        # the contents of uptime command output later.
-        load_avg = read_file_contents("/proc/loadavg")[0].split()[0:3]
-
-        # Get Usage information
-        _, stdout, _ = await async_exec(["top", "-b", "n1"])
-        adata = stdout.split("\n")
-        mem_usage = adata[0]
-        cpu_usage = adata[1]
-
-        memory = self.getMemInfo()
-
-        # Get OpenBMC version
-        obc_version = ""
-        _, stdout, _ = await async_exec(["cat", "/etc/issue"])
+            return mac[0:17].upper()
+        mac = get_mac()
+        return ":".join(("%012X" % mac)[i : i + 2] for i in range(0, 12, 2))
 
-        # OpenBMC Version
-        ver = re.search(r"[v|V]([\w\d._-]*)\s", stdout)
+    def getOpenBMCVer(self):
+        with open("/etc/issue") as f:
+            ver = re.search(r"[v|V]([\w\d._-]*)\s", f.read())
         if ver:
-            obc_version = ver.group(1)
+            return ver.group(1)
+        return ""
+
+    async def getStaticInformation(self):
+        """
+        Fields that do not change until the BMC reboots, read once per
+        process.
+        """
+        try:
+            return await read_static_information()
+        except Exception:
+            # Read them again on the next request
+            read_static_information.cache_clear()
+            raise
 
+    async def _readStaticInformation(self):
         # U-Boot version
         uboot_version = await self.getUbootVer()
         if uboot_version is None:
             uboot_version = "NA"
 
-        # Get kernel release and kernel version
-        kernel_release = ""
-        _, stdout, _ = await async_exec(["uname", "-r"])
-        kernel_release = stdout.strip("\n")
-
-        kernel_version = ""
-        _, stdout, _ = await async_exec(["uname", "-v"])
-        kernel_version = stdout.strip("\n")
-
         # Get TPM version
         tpm_tcg_version = "NA"
         tpm_fw_version = "NA"
@@ -332,46 +409,72 @@ class bmcNode(node):
             tpm_tcg_version = await self.getTpmTcgVer()
             tpm_fw_version = await self.getTpmFwVer()
 
-        spi0_vendor = await getSPIVendor(0)
-        spi1_vendor = await getSPIVendor(1)
-
-        # ASD status - check if ASD daemon/asd-test is currently running
-        _, asd_status, _ = await async_exec("ps | grep -i [a]sd", shell=True)
-        asd_status = bool(asd_status)
-        boot_from_secondary = is_boot_from_secondary()
+        uname = os.uname()
+        return {
+            "Description": rest_pal_legacy.pal_get_platform_name() + " BMC",
+            "MAC Addr": self.getMacAddr(),
+            "OpenBMC Version": self.getOpenBMCVer(),
+            "u-boot version": uboot_version,
+            "kernel version": uname.release + " " + uname.version,
+            "TPM TCG version": tpm_tcg_version,
+            "TPM FW version": tpm_fw_version,
+            "SPI0 Vendor": await getSPIVendor(0),
+            "SPI1 Vendor": await getSPIVendor(1),
+            "Secondary Boot Triggered": is_boot_from_secondary(),
+            "vboot": await get_vboot_status(),
+            "MTD Parts": read_proc_mtd(),
+        }
 
-        vboot_info = await get_vboot_status()
+    async def getResetReason(self):
+        try:
+            wdt_counter = read_phymem32(WDT_COUNTER_ADDR)
+        except OSError:
+            # /dev/mem cannot be mapped (e.g. STRICT_DEVMEM), ask devmem
+            _, stdout, _ = await async_exec(["devmem", "0x%x" % WDT_COUNTER_ADDR])
+            wdt_counter = int(stdout, 0)
+        if wdt_counter & 0xFF00:
+            return "User Initiated Reset or WDT Reset"
+        return "Power ON Reset"
 
+    async def getInformation(self, param=None):
+        # See http://man7.org/linux/man-pages/man5/proc.5.html for details
+        # on full contents of proc endpoints.
+        uptime_seconds = read_file_contents("/proc/uptime")[0].split()[0]
+        load_avg = read_file_contents("/proc/loadavg")[0].split()[0:3]
+        memory = self.getMemInfo()
         used_fd_count = read_file_contents("/proc/sys/fs/file-nr")[0].split()[0]
 
+        static_info = await self.getStaticInformation()
+
         info = {
-            "Description": name + " BMC",
-            "MAC Addr": mac_addr,
-            "Reset Reason": reset_reason,
+            "Description": static_info["Description"],
+            "MAC Addr": static_info["MAC Addr"],
+            "Reset Reason": await self.getResetReason(),
             # Upper case Uptime is for legacy
             # API support
-            "Uptime": uptime,
+            "Uptime": format_uptime(time.localtime(), float(uptime_seconds), load_avg),
             # Lower case Uptime is for simpler
             # more pass-through proxy
             "uptime": uptime_seconds,
-            "Memory Usage": mem_usage,
+            "Memory Usage": format_mem_usage(memory),
             "memory": memory,
-            "CPU Usage": cpu_usage,
-            "OpenBMC Version": obc_version,
-            "u-boot version": uboot_version,
-            "kernel version": kernel_release + " " + kernel_version,
-            "TPM TCG version": tpm_tcg_version,
-            "TPM FW version": tpm_fw_version,
-            "SPI0 Vendor": spi0_vendor,
-            "SPI1 Vendor": spi1_vendor,
-            "At-Scale-Debug Running": asd_status,
-            "Secondary Boot Triggered": boot_from_secondary,
-            "vboot": vboot_info,
+            "CPU Usage": CpuSampler.instance().usage(),
+            "OpenBMC Version": static_info["OpenBMC Version"],
+            "u-boot version": static_info["u-boot version"],
+            "kernel version": static_info["kernel version"],
+            "TPM TCG version": static_info["TPM TCG version"],
+            "TPM FW version": static_info["TPM FW version"],
+            "SPI0 Vendor": static_info["SPI0 Vendor"],
+            "SPI1 Vendor": static_info["SPI1 Vendor"],
+            # ASD status - check if ASD daemon/asd-test is currently running
+            "At-Scale-Debug Running": is_asd_running(),
+            "Secondary Boot Triggered": static_info["Secondary Boot Triggered"],
+            "vboot": static_info["vboot"],
             "load-1": load_avg[0],
             "load-5": load_avg[1],
             "load-15": load_avg[2],
             "open-fds": used_fd_count,
-            "MTD Parts": read_proc_mtd(),
+            "MTD Parts": static_info["MTD Parts"],
         }
 
         return info
@@ -381,6 +484,12 @@ class bmcNode(node):
         return {"result": "success"}
 
 
+@functools.lru_cache(maxsize=1)
+def read_static_information() -> "asyncio.Future[t.Dict[str, t.Any]]":
+    # The read is started once, requests made while it runs share it
+    return asyncio.ensure_future(get_node_bmc()._readStaticInformation())
+
+
 def get_node_bmc():
     actions = ["reboot"]
     return bmcNode(actions=actions)
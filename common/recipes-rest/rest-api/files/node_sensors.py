@@ -18,14 +18,35 @@
 # Boston, MA 02110-1301 USA
 #
 
+import asyncio
 import json
 import os
 import re
 import subprocess
+import time
 from asyncio import TimeoutError
+from typing import Dict, List
 
-from common_utils import async_exec
+from aiohttp.log import server_logger
+from common_utils import async_exec, common_executor
 from node import node
+from sensor_snapshot import SensorSnapshots, max_age_from_query
+
+try:
+    import pal
+    import sdr
+
+    has_libpal = True
+except (ImportError, OSError):
+    # Bindings (or the libraries behind them) are unavailable,
+    # fall back to parsing sensor-util output
+    has_libpal = False
+
+
+AGGREGATE_SENSOR_FRU = "aggregate"
+AGGREGATE_SENSOR_CONF = "/etc/aggregate-sensor-conf.json"
+
+PERIOD_UNITS = {"m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
 
 
 async def sensor_util_history_clear(fru="all", sensor_id="", sensor_name=""):
@@ -191,6 +212,141 @@ async def sensor_util(fru="all", sensor_name="", sensor_id="", period="60", disp
     return sensors
 
 
+def _period_seconds(period: str) -> int:
+    if period and period[-1] in PERIOD_UNITS:
+        return int(period[:-1]) * PERIOD_UNITS[period[-1]]
+    return int(period)
+
+
+def _add_sensor(sensors: Dict, name: str, snr: Dict):
+    # Sensors sharing a name are reported as a list, like sensor-util does
+    if name in sensors:
+        if isinstance(sensors[name], list):
+            sensors[name].append(snr)
+        else:
+            sensors[name] = [sensors[name], snr]
+    else:
+        sensors[name] = snr
+
+
+def _read_pal_sensor(
+    fru_id: int, snr_num: int, metadata, start_time, display
+) -> Dict:
+    if start_time is not None:
+        try:
+            history = pal.sensor_read_history(fru_id, snr_num, start_time)
+            snr = {
+                "min": "{:.2f}".format(history.min_intv_consumed),
+                "avg": "{:.2f}".format(history.avg_intv_consumed),
+                "max": "{:.2f}".format(history.max_intv_consumed),
+            }
+        except pal.LibPalError:
+            snr = {"min": "NA", "avg": "NA", "max": "NA"}
+        if "id" in display:
+            snr["id"] = "{:X}".format(snr_num)
+        return snr
+
+    flag = pal.pal_alter_sensor_thresh_flag(fru_id, snr_num, metadata.thresh.flag)
+    try:
+        value = pal.sensor_read(fru_id, snr_num)
+        snr = {"value": "{:.2f}".format(value)}
+        units = metadata.units
+        status = sdr.sensor_status(value, metadata.thresh, flag)
+    except pal.LibPalError:
+        snr = {"value": "NA"}
+        units = "na"
+        status = "na"
+    if "units" in display:
+        snr["units"] = units
+    if "id" in display:
+        snr["id"] = "{:X}".format(snr_num)
+    if "status" in display:
+        snr["status"] = status
+    if "thresholds" in display:
+        thresholds = sdr.sensor_thresholds(metadata.thresh, flag)
+        if thresholds:
+            snr["thresholds"] = {
+                key: "{:.2f}".format(val) for key, val in thresholds.items()
+            }
+    return snr
+
+
+def _fru_sensor_list(fru_id: int) -> List[int]:
+    try:
+        if pal.pal_is_fru_prsnt(fru_id) and pal.pal_is_fru_ready(fru_id):
+            return pal.pal_get_fru_sensor_list(fru_id)
+    except (ValueError, pal.LibPalError):
+        pass
+    return []
+
+
+def read_pal_sensors(
+    fru="all", sensor_name="", sensor_id="", period="60", display=()
+) -> Dict:
+    """
+    Read sensors of a FRU (or all FRUs) in-process through libpal/libsdr,
+    returning the same structure as sensor_util()
+    """
+    sensors = {}
+    try:
+        if fru == "all":
+            frus = sorted(pal.pal_fru_name_map().values())
+        else:
+            frus = [pal.pal_get_fru_id(fru)]
+        sensor_id_val = int(sensor_id, base=16) if sensor_id != "" else None
+        start_time = None
+        if "history" in display:
+            start_time = int(time.time()) - _period_seconds(period)
+
+        for fru_id in frus:
+            for snr_num in _fru_sensor_list(fru_id):
+                if sensor_id_val is not None and snr_num != sensor_id_val:
+                    continue
+                try:
+                    metadata = sdr.sdr_get_sensor_metadata(fru_id, snr_num)
+                except sdr.LibSdrError:
+                    continue
+                if sensor_name != "" and sensor_name.lower() != metadata.name.lower():
+                    continue
+                snr = _read_pal_sensor(fru_id, snr_num, metadata, start_time, display)
+                _add_sensor(sensors, metadata.name, snr)
+    except Exception:
+        server_logger.exception("Failed to read %s sensors through libpal", fru)
+    return sensors
+
+
+async def sensor_libpal(
+    fru="all", sensor_name="", sensor_id="", period="60", display=()
+) -> Dict:
+    if "thresholds" in display and "history" in display:
+        return {}
+    # Aggregate sensors are computed by sensor-util itself
+    if fru == AGGREGATE_SENSOR_FRU:
+        return await sensor_util(fru, sensor_name, sensor_id, period, display)
+    loop = asyncio.get_event_loop()
+    sensors = await loop.run_in_executor(
+        common_executor,
+        read_pal_sensors,
+        fru,
+        sensor_name,
+        sensor_id,
+        period,
+        display,
+    )
+    if fru == "all" and os.path.exists(AGGREGATE_SENSOR_CONF):
+        aggregate = await sensor_util(
+            AGGREGATE_SENSOR_FRU, sensor_name, sensor_id, period, display
+        )
+        for name, snr in aggregate.items():
+            for entry in snr if isinstance(snr, list) else [snr]:
+                _add_sensor(sensors, name, entry)
+    return sensors
+
+
+# Prefer the in-process reader, it saves a fork+exec and a text parse
+sensor_reader = sensor_libpal if has_libpal else sensor_util
+
+
 class sensorsNode(node):
     def __init__(self, name, info=None, actions=None):
         self.name = name
@@ -216,7 +372,15 @@ class sensorsNode(node):
             snr_id = param["id"]
         if "history-period" in param:
             period = param["history-period"]
-        return await sensor_util(self.name, snr_name, snr_id, period, display)
+        return await SensorSnapshots.instance().get(
+            sensor_reader,
+            self.name,
+            snr_name,
+            snr_id,
+            period,
+            tuple(display),
+            max_age=max_age_from_query(param),
+        )
 
     async def doAction(self, info, param={}):
         snr_name = ""
@@ -227,7 +391,9 @@ class sensorsNode(node):
             snr = param["id"]
         if not self.actions:
             return {"result": "failure"}
-        return await sensor_util_history_clear(self.name, snr, snr_name)
+        result = await sensor_util_history_clear(self.name, snr, snr_name)
+        SensorSnapshots.instance().invalidate(sensor_reader)
+        return result
 
 
 def get_node_sensors(name):
@@ -28,42 +28,45 @@ def get_sensor_details(
     fru_id = fru_name_map[fru_name]
     sensor_details_list = []
     if pal.pal_is_fru_prsnt(fru_id):  # Check if the fru is present
-        sensor_ids_list = pal.pal_get_fru_sensor_list(fru_id)
-        for sensor_id in sensor_ids_list:
-            sensor_unit = sdr.sdr_get_sensor_units(fru_id, sensor_id)
-            if sensor_unit in desired_sensor_units:
-                try:
-                    reading = pal.sensor_read(fru_id, sensor_id)
-                    reading = round(reading, 2)
-                    start_time = int(time.time()) - 60
-                    sensor_history = pal.sensor_read_history(
-                        fru_id, sensor_id, start_time
+        sensor_metadata = {}
+        for sensor_id in pal.pal_get_fru_sensor_list(fru_id):
+            try:
+                metadata = sdr.sdr_get_sensor_metadata(fru_id, sensor_id)
+            except sdr.LibSdrError:
+                print(
+                    "Failed to get sensor thresh for fru: {fru_name} , sensor_id: {sensor_id}".format(  # noqa: B950
+                        fru_name=fru_name, sensor_id=sensor_id
                     )
-                except pal.LibPalError:
-                    print(
-                        "Failed to get reading for fru: {fru_name} , sensor_id: {sensor_id}".format(  # noqa: B950
-                            fru_name=fru_name, sensor_id=sensor_id
-                        )
-                    )
-                try:
-                    sensor_thresh = sdr.sdr_get_sensor_thresh(fru_id, sensor_id)
-                    sensor_name = sdr.sdr_get_sensor_name(fru_id, sensor_id)
-                    sensor_details = SensorDetails(
-                        sensor_name,
-                        sensor_id,
-                        fru_name,
-                        reading,
-                        sensor_thresh,
-                        sensor_unit,
-                        sensor_history,
-                    )
-                    sensor_details_list.append(sensor_details)
-                except sdr.LibSdrError:
-                    print(
-                        "Failed to get sensor thresh for fru: {fru_name} , sensor_id: {sensor_id}".format(  # noqa: B950
-                            fru_name=fru_name, sensor_id=sensor_id
-                        )
+                )
+                continue
+            if metadata.units in desired_sensor_units:
+                sensor_metadata[sensor_id] = metadata
+        sensor_ids = tuple(sensor_metadata)
+        # Read the whole FRU in one go, with a single history start time
+        readings = pal.sensor_read_fru(fru_id, sensor_ids)
+        start_time = int(time.time()) - 60
+        sensor_histories = pal.sensor_read_history_fru(fru_id, sensor_ids, start_time)
+        for idx, sensor_id in enumerate(sensor_ids):
+            reading = readings.value_at(idx)
+            sensor_history = sensor_histories.history_at(idx)
+            if reading is None or sensor_history is None:
+                print(
+                    "Failed to get reading for fru: {fru_name} , sensor_id: {sensor_id}".format(  # noqa: B950
+                        fru_name=fru_name, sensor_id=sensor_id
                     )
+                )
+                continue
+            metadata = sensor_metadata[sensor_id]
+            sensor_details = SensorDetails(
+                metadata.name,
+                sensor_id,
+                fru_name,
+                round(reading, 2),
+                metadata.thresh,
+                metadata.units,
+                sensor_history,
+            )
+            sensor_details_list.append(sensor_details)
     return sensor_details_list
 
 
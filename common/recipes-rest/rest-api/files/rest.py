@@ -31,9 +31,14 @@ import sys
 from aiohttp import web
 from aiohttp.log import access_logger
 from async_ratelimiter import AsyncRateLimiter
-from common_logging import ACCESS_LOG_FORMAT, get_logger_config
+from common_logging import (
+    ACCESS_LOG_FORMAT,
+    get_logger_config,
+    start_access_log_listener,
+)
 from common_webapp import WebApp
 from rest_config import load_acl_provider, parse_config
+from sensor_snapshot import SensorSnapshots
 from setup_plat_routes import setup_plat_routes
 
 
@@ -56,6 +61,7 @@ config = parse_config(configpath)
 
 
 logging.config.dictConfig(get_logger_config(config))
+access_log_listener = start_access_log_listener()
 
 
 servers = []
@@ -63,8 +69,12 @@ servers = []
 
 app = WebApp.instance()
 app["ratelimiter"] = AsyncRateLimiter(
-    slidewindow_size=int(config["ratelimit_window"]), limit=int(config["max_requests"])
+    slidewindow_size=int(config["ratelimit_window"]),
+    limit=int(config["max_requests"]),
+    client_limit=int(config["max_client_requests"]),
+    global_limit=int(config["max_global_requests"]),
 )
+SensorSnapshots.instance().interval = float(config["sensor_snapshot_interval"])
 setup_plat_routes(app, config)
 
 
@@ -108,4 +118,5 @@ finally:
     loop.run_until_complete(app.shutdown())
     loop.run_until_complete(handler.shutdown(60.0))
     loop.run_until_complete(app.cleanup())
+    access_log_listener.stop()
 loop.close()
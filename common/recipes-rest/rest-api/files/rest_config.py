@@ -28,6 +28,7 @@ from acl_providers import common_acl_provider_base
 
 VALID_LOG_HANDLERS = ["stdout", "syslog", "file"]
 VALID_LOG_FORMATS = ["default", "json"]
+DEFAULT_SENSOR_SNAPSHOT_INTERVAL = 5
 
 
 def parse_config(configpath):
@@ -59,6 +60,21 @@ def parse_config(configpath):
             + ") detected, falling back to 'default'",
         )
         log_format = "default"
+    try:
+        sensor_snapshot_interval = RestConfig.getfloat(
+            "sensors", "snapshot_interval", fallback=DEFAULT_SENSOR_SNAPSHOT_INTERVAL
+        )
+    except ValueError:
+        sensor_snapshot_interval = 0
+    if not sensor_snapshot_interval > 0:
+        syslog.syslog(
+            syslog.LOG_WARNING,
+            "Invalid sensor snapshot interval ("
+            + repr(RestConfig.get("sensors", "snapshot_interval"))
+            + ") detected, falling back to "
+            + repr(DEFAULT_SENSOR_SNAPSHOT_INTERVAL),
+        )
+        sensor_snapshot_interval = DEFAULT_SENSOR_SNAPSHOT_INTERVAL
     try:
         acl_settings = dict(RestConfig.items("acl"))
         acl_settings.pop("provider", None)
@@ -87,6 +103,14 @@ def parse_config(configpath):
         "ratelimit_window": RestConfig.get(
             "ratelimiter", "window_seconds", fallback=60
         ),
+        # per user agent across all endpoints, and for all requests
+        "max_client_requests": RestConfig.get(
+            "ratelimiter", "max_client_requests", fallback=0
+        ),
+        "max_global_requests": RestConfig.get(
+            "ratelimiter", "max_global_requests", fallback=0
+        ),
+        "sensor_snapshot_interval": sensor_snapshot_interval,
     }
 
 
@@ -31,10 +31,11 @@ def get_fruid(cmd=["weutil"]):
     proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
     try:
         data, err = proc.communicate(timeout=DEFAULT_TIMEOUT_SEC)
-        data = data.decode(errors="ignore")
-    except proc.TimeoutError as ex:
-        data = ex.output
-        err = ex.error
+    except subprocess.TimeoutExpired as ex:
+        proc.kill()
+        data = ex.output or b""
+    # Decode here so that no byte string makes it into the response
+    data = data.decode(errors="ignore")
 
     # need to remove the first info line from weutil
     adata = data.split("\n", 1)
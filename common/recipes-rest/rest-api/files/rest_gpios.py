@@ -23,7 +23,7 @@ import re
 import typing as t
 
 import rest_fruid
-from rest_helper import read_gpio_by_shadow
+from rest_helper import read_gpios_by_shadow
 
 
 WEDGE40 = ["Wedge-DC-F", "Wedge-AC-F"]
@@ -31,31 +31,31 @@ WEDGE40 = ["Wedge-DC-F", "Wedge-AC-F"]
 
 def read_wedge_back_ports(legacy=False):
     if legacy:
-        bhinfo = {
+        pins = {
             "port_1": {
-                "pin_1": read_gpio_by_shadow("BLOODHOUND_GPIOP0"),
-                "pin_2": read_gpio_by_shadow("BLOODHOUND_GPIOP1"),
-                "pin_3": read_gpio_by_shadow("BLOODHOUND_GPIOP2"),
-                "pin_4": read_gpio_by_shadow("BLOODHOUND_GPIOP3"),
-            },
-            "port_2": {
-                "pin_1": read_gpio_by_shadow("BLOODHOUND_GPIOP4"),
-                "pin_2": read_gpio_by_shadow("BLOODHOUND_GPIOP5"),
+                "pin_1": "BLOODHOUND_GPIOP0",
+                "pin_2": "BLOODHOUND_GPIOP1",
+                "pin_3": "BLOODHOUND_GPIOP2",
+                "pin_4": "BLOODHOUND_GPIOP3",
             },
+            "port_2": {"pin_1": "BLOODHOUND_GPIOP4", "pin_2": "BLOODHOUND_GPIOP5"},
         }
     else:
-        bhinfo = {
+        pins = {
             "port_1": {
-                "pin_1": read_gpio_by_shadow("RMON1_PF"),
-                "pin_2": read_gpio_by_shadow("RMON1_RF"),
-                "pin_3": read_gpio_by_shadow("RMON2_PF"),
-                "pin_4": read_gpio_by_shadow("RMON2_RF"),
-            },
-            "port_2": {
-                "pin_1": read_gpio_by_shadow("RMON3_PF"),
-                "pin_2": read_gpio_by_shadow("RMON3_RF"),
+                "pin_1": "RMON1_PF",
+                "pin_2": "RMON1_RF",
+                "pin_3": "RMON2_PF",
+                "pin_4": "RMON2_RF",
             },
+            "port_2": {"pin_1": "RMON3_PF", "pin_2": "RMON3_RF"},
         }
+    values = read_gpios_by_shadow(
+        [shadow for port in pins.values() for shadow in port.values()]
+    )
+    bhinfo = {}
+    for port, port_pins in pins.items():
+        bhinfo[port] = {pin: values[shadow] for pin, shadow in port_pins.items()}
     return bhinfo
 
 
@@ -17,18 +17,123 @@
 # 51 Franklin Street, Fifth Floor,
 # Boston, MA 02110-1301 USA
 #
+import os
 import subprocess
+import threading
+import typing as t
 
 import libgpio
 from aiohttp.log import server_logger
 
 
+GPIO_SHADOW_ROOT = "/tmp/gpionames"
+
+
+class GPIOHandlePool:
+    """
+    Process wide pool of open libgpio.GPIO handles, keyed by shadow name or
+    by (chip, name). Exporting or unexporting a GPIO adds or removes its
+    shadow symlink, which changes the mtime of GPIO_SHADOW_ROOT; all handles
+    are closed and reopened on demand when that happens.
+    """
+
+    _instance = None
+
+    def __init__(self, shadow_root: str = GPIO_SHADOW_ROOT):
+        self.shadow_root = shadow_root
+        self.handles = {}  # type: t.Dict[t.Tuple[str, ...], libgpio.GPIO]
+        self.generation = None  # type: t.Optional[int]
+        self.lock = threading.Lock()
+
+    @classmethod
+    def instance(cls) -> "GPIOHandlePool":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def _check_generation(self) -> None:
+        try:
+            generation = os.stat(self.shadow_root).st_mtime_ns
+        except OSError:
+            generation = None
+        if generation != self.generation:
+            self._close_all()
+            self.generation = generation
+
+    def _close_all(self) -> None:
+        for key in list(self.handles):
+            self._discard(key)
+
+    def _discard(self, key: t.Tuple[str, ...]) -> None:
+        gpio = self.handles.pop(key, None)
+        if gpio is not None:
+            try:
+                gpio.close()
+            except libgpio.GpioOperationFailure:
+                pass
+
+    def _get(self, key: t.Tuple[str, ...]) -> libgpio.GPIO:
+        gpio = self.handles.get(key)
+        if gpio is None:
+            if key[0] == "shadow":
+                gpio = libgpio.GPIO(shadow=key[1])
+            else:
+                gpio = libgpio.GPIO(chip=key[1], name=key[2])
+            self.handles[key] = gpio
+        return gpio
+
+    def read(self, key: t.Tuple[str, ...]) -> int:
+        with self.lock:
+            self._check_generation()
+            try:
+                return int(self._get(key).get_value())
+            except Exception:
+                # The handle may have gone stale, reopen it next time
+                self._discard(key)
+                raise
+
+    def read_many(
+        self, keys: t.List[t.Tuple[str, ...]]
+    ) -> t.List[t.Union[int, Exception]]:
+        """
+        Read the values of many GPIOs with one libgpio call. GPIOs that
+        cannot be read are returned as the exception raised for them.
+        """
+        with self.lock:
+            self._check_generation()
+            results = [None] * len(keys)  # type: t.List[t.Any]
+            gpios = []
+            indices = []
+            for i, key in enumerate(keys):
+                try:
+                    gpios.append(self._get(key))
+                    indices.append(i)
+                except Exception as exc:
+                    results[i] = exc
+            try:
+                values = libgpio.GPIO.get_values(gpios) if gpios else []
+            except Exception:
+                # Find out which GPIOs failed
+                values = []
+                for i, gpio in zip(indices, gpios):
+                    try:
+                        values.append(gpio.get_value())
+                    except Exception as exc:
+                        self._discard(keys[i])
+                        values.append(exc)
+            for i, value in zip(indices, values):
+                results[i] = value if isinstance(value, Exception) else int(value)
+            return results
+
+    def close(self) -> None:
+        with self.lock:
+            self._close_all()
+            self.generation = None
+
+
 def read_gpio_by_name(name: str, chip: str = "aspeed-gpio") -> int:
     try:
-        gpio = libgpio.GPIO(chip=chip, name=name)
-        val = gpio.get_value()
-        gpio.close()
-        return int(val)
+        return GPIOHandlePool.instance().read(("name", chip, name))
     except Exception as exc:
         server_logger.exception("Error getting gpio value %s " % name, exc_info=exc)
         return None
@@ -36,10 +141,7 @@ def read_gpio_by_name(name: str, chip: str = "aspeed-gpio") -> int:
 
 def read_gpio_by_shadow(shadow_name: str) -> int:
     try:
-        gpio = libgpio.GPIO(shadow=shadow_name)
-        val = gpio.get_value()
-        gpio.close()
-        return int(val)
+        return GPIOHandlePool.instance().read(("shadow", shadow_name))
     except Exception as exc:
         server_logger.exception(
             "Error getting gpio value %s " % shadow_name, exc_info=exc
@@ -47,6 +149,25 @@ def read_gpio_by_shadow(shadow_name: str) -> int:
         return None
 
 
+def read_gpios_by_shadow(shadow_names: t.List[str]) -> t.Dict[str, int]:
+    """
+    Read many GPIOs at once, returns shadow name => value, or None for the
+    GPIOs that could not be read.
+    """
+    results = GPIOHandlePool.instance().read_many(
+        [("shadow", shadow_name) for shadow_name in shadow_names]
+    )
+    values = {}
+    for shadow_name, result in zip(shadow_names, results):
+        if isinstance(result, Exception):
+            server_logger.exception(
+                "Error getting gpio value %s " % shadow_name, exc_info=result
+            )
+            result = None
+        values[shadow_name] = result
+    return values
+
+
 def get_wedge_slot():
     p = subprocess.Popen(
         "source /usr/local/bin/openbmc-utils.sh;" "wedge_slot_id $(wedge_board_type)",
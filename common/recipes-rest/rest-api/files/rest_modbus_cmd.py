@@ -1,16 +1,21 @@
 import asyncio
 import fcntl
+import json
 import pathlib
-import socket
-import struct
 import typing as t
 from typing import List
 
 import aiohttp.web
 
+try:
+    import rackmond_client
+
+    RACKMOND_CLIENT_AVAILABLE = True
+except ImportError:
+    # rackmon is not part of this image
+    RACKMOND_CLIENT_AVAILABLE = False
+
 FLOCK_SOLITON_BEAM = "/tmp/modbus_dynamo_solitonbeam.lock"
-RACKMOND_SOCKET = "/var/run/rackmond.sock"
-RACKMOND_MAX_RESPONSE_LEN = 4096
 
 ALLOWED_OPCODES = (
     0x03,  # Read Holding Register (required by spec)
@@ -71,53 +76,35 @@ async def post_modbus_cmd(request: aiohttp.web.Request) -> aiohttp.web.Response:
 
 
 ## Utils
-def to_bytes(cmd: t.List[int]) -> bytes:
-    return b"".join(i.to_bytes(1, "little") for i in cmd)
-
-
-class raw_modbus_command:  # from common/recipes-core/rackmon/rackmon/rackmond.h
-    COMMAND_TYPE_RAW_MODBUS = 1
-
-    # Minimum timeout for reading rackmond socket. This is not the modbus
-    # command timeout (which is user-defined in the custom_timeout field)
-    RACKMOND_MIN_SOCKET_TIMEOUT_MS = 5000
-
+class raw_modbus_command:
     def __init__(
         self,
         data: t.List[int],
         expected_response_length: int = 0,
         custom_timeout: int = 0,  # ms
     ):
+        self.data = bytes(data)
+        self.expected_response_length = expected_response_length
         self.custom_timeout = custom_timeout
-        self._packed = (
-            struct.pack(
-                "HxxHHL",
-                self.COMMAND_TYPE_RAW_MODBUS,
-                len(data),
-                expected_response_length,
-                custom_timeout,
-            )
-            + to_bytes(data)
-        )
 
     async def get_response(self) -> t.List[int]:
-        # Read response inside thread executor so we don't hold the event loop
-        return await asyncio.get_event_loop().run_in_executor(None, self._get_response)
-
-    def _get_response(self) -> t.List[int]:
-        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-        client.settimeout(
-            (self.RACKMOND_MIN_SOCKET_TIMEOUT_MS + self.custom_timeout) / 1000
-        )
+        if not RACKMOND_CLIENT_AVAILABLE:
+            raise _service_unavailable("rackmond is not installed")
         try:
-            client.connect(RACKMOND_SOCKET)
-            client.send(len(self._packed).to_bytes(2, "little"))
-            client.send(self._packed)
+            # Raw rackmond reply, including its length header
+            response = await rackmond_client.RackmondClient.instance().raw_modbus(
+                self.data, self.expected_response_length, self.custom_timeout
+            )
+        except rackmond_client.RackmondError as e:
+            raise _service_unavailable(str(e))
+        return list(response)
 
-            return list(client.recv(RACKMOND_MAX_RESPONSE_LEN))
 
-        finally:
-            client.close()
+def _service_unavailable(details: str) -> aiohttp.web.HTTPServiceUnavailable:
+    return aiohttp.web.HTTPServiceUnavailable(
+        text=json.dumps({"status": "Service Unavailable", "details": details}),
+        content_type="application/json",
+    )
 
 
 class SolitonBeamFlock:
@@ -18,6 +18,7 @@
 # Boston, MA 02110-1301 USA
 #
 
+import hashlib
 import json
 import os
 import os.path
@@ -37,6 +38,23 @@ UPDATERS = {
     "delta": "/usr/local/bin/psu-update-delta.py",
     "belpower": "/usr/local/bin/psu-update-bel.py",
 }
+# The updaters own <job_id>.json once they run, download progress is kept
+# next to it in <job_id>.download
+DOWNLOAD_SUFFIX = ".download"
+# Firmware is streamed to disk in chunks of this size, never held in memory
+# as a whole, and refused if it grows past FW_MAX_SIZE.
+FW_CHUNK_SIZE = 64 * 1024
+FW_MAX_SIZE = 32 * 1024 * 1024
+# Download progress is written out every this many bytes
+PROGRESS_INTERVAL = 1024 * 1024
+
+
+def write_json(path, data):
+    # Not "~", the updaters use that for their own status updates
+    tmppath = path + ".tmp"
+    with open(tmppath, "w") as fh:
+        fh.write(json.dumps(data))
+    os.rename(tmppath, path)
 
 
 def get_jobs():
@@ -49,10 +67,59 @@ def get_jobs():
             with open(fullpath, "r") as fh:
                 jdata = json.load(fh)
                 jdata["job_id"] = os.path.splitext(f)[0]
-                jobs.append(jdata)
+            try:
+                with open(os.path.splitext(fullpath)[0] + DOWNLOAD_SUFFIX) as fh:
+                    jdata["download"] = json.load(fh)
+            except (OSError, ValueError):
+                pass
+            jobs.append(jdata)
     return {"jobs": jobs}
 
 
+def fetch_firmware(url, fwfile, downloadpath, expected_sha256=None):
+    """
+    Stream url into fwfile, hashing as data arrives and recording progress
+    in downloadpath. Raises HTTPRequestEntityTooLarge past FW_MAX_SIZE and
+    HTTPBadRequest if expected_sha256 is given and does not match.
+    """
+    sha256 = hashlib.sha256()
+    progress = {"bytes": 0, "total": None, "sha256": None}
+    with urllib.request.urlopen(url) as fwdata:
+        length = fwdata.headers.get("Content-Length")
+        if length is not None and length.isdigit():
+            progress["total"] = int(length)
+            if progress["total"] > FW_MAX_SIZE:
+                raise web.HTTPRequestEntityTooLarge(
+                    max_size=FW_MAX_SIZE, actual_size=progress["total"]
+                )
+        write_json(downloadpath, progress)
+        reported = 0
+        while True:
+            chunk = fwdata.read(FW_CHUNK_SIZE)
+            if not chunk:
+                break
+            progress["bytes"] += len(chunk)
+            if progress["bytes"] > FW_MAX_SIZE:
+                raise web.HTTPRequestEntityTooLarge(
+                    max_size=FW_MAX_SIZE, actual_size=progress["bytes"]
+                )
+            sha256.update(chunk)
+            fwfile.write(chunk)
+            if progress["bytes"] - reported >= PROGRESS_INTERVAL:
+                write_json(downloadpath, progress)
+                reported = progress["bytes"]
+    fwfile.flush()
+    progress["sha256"] = sha256.hexdigest()
+    write_json(downloadpath, progress)
+    if expected_sha256 is not None and expected_sha256.lower() != progress["sha256"]:
+        raise web.HTTPBadRequest(
+            text="sha256 mismatch: expected {}, got {}".format(
+                expected_sha256, progress["sha256"]
+            )
+        )
+    return progress
+
+
 updater_process = None
 
 
@@ -70,16 +137,18 @@ def begin_job(jobdesc):
     if not os.path.exists(UPDATE_JOB_DIR):
         os.makedirs(UPDATE_JOB_DIR)
     statusfilepath = os.path.join(UPDATE_JOB_DIR, str(job_id) + ".json")
+    downloadpath = os.path.join(UPDATE_JOB_DIR, str(job_id) + DOWNLOAD_SUFFIX)
     status = {"pid": 0, "state": "fetching"}
-    with open(statusfilepath, "wb") as sfh:
-        sfh.write(json.dumps(status))
+    write_json(statusfilepath, status)
     try:
-        fwdata = urllib.request.urlopen(jobdesc["fw_url"])
         with os.fdopen(fwfd, "wb") as fwfile:
-            fwfile.write(fwdata.read())
-            fwfile.flush()
+            fetch_firmware(
+                jobdesc["fw_url"], fwfile, downloadpath, jobdesc.get("sha256")
+            )
     except:
-        os.remove(statusfilepath)
+        for path in (statusfilepath, downloadpath, fwfilepath):
+            if os.path.exists(path):
+                os.remove(path)
         raise
 
     updater = UPDATERS[jobdesc.get("updater", "delta")]
@@ -95,6 +164,5 @@ def begin_job(jobdesc):
         ]
     )
     status = {"pid": updater_process.pid, "state": "starting"}
-    with open(statusfilepath, "wb") as sfh:
-        sfh.write(json.dumps(status))
+    write_json(statusfilepath, status)
     return {"job_id": job_id, "pid": updater_process.pid}
@@ -31,11 +31,10 @@ def get_sensors():
     proc = subprocess.Popen(["sensors"], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
     try:
         data, err = proc.communicate(timeout=DEFAULT_TIMEOUT_SEC)
-        data = data.decode()
-    except proc.TimeoutError as ex:
-        data = ex.output
-        data = data.decode()
-        err = ex.error
+    except subprocess.TimeoutExpired as ex:
+        proc.kill()
+        data = ex.output or b""
+    data = data.decode(errors="ignore")
 
     data = re.sub("\(.+?\)", "", data)
     for edata in data.split("\n\n"):
@@ -69,9 +68,10 @@ def get_sensors_full():
     )
     try:
         data, err = proc.communicate(timeout=DEFAULT_TIMEOUT_SEC)
-    except proc.TimeoutError as ex:
-        data = ex.output
-        err = ex.error
+    except subprocess.TimeoutExpired as ex:
+        proc.kill()
+        data = ex.output or b""
+    data = data.decode(errors="ignore")
 
     # The output of sensors -u is a series of sections separated
     # by blank lines.  Each section looks like this:
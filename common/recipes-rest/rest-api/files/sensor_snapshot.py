@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+#
+# Copyright 2014-present Facebook. All Rights Reserved.
+#
+# This program file is free software; you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the
+# Free Software Foundation; version 2 of the License.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License
+# for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program in a file named COPYING; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor,
+# Boston, MA 02110-1301 USA
+#
+
+import asyncio
+import time
+import typing as t
+
+from aiohttp import web
+from aiohttp.log import server_logger
+from common_utils import common_executor
+
+
+DEFAULT_INTERVAL_SEC = 5
+# Snapshots that were not read by any client for this many intervals are
+# dropped, and the poller stops refreshing them.
+IDLE_INTERVALS = 12
+
+
+class SensorSnapshot:
+    """
+    Last known result of a sensor read, together with the time it was
+    taken and the refresh that is currently running (if any).
+    """
+
+    def __init__(self):
+        self.data = None
+        self.timestamp = None  # type: t.Optional[float]
+        self.last_access = time.monotonic()
+        self.inflight = None  # type: t.Optional[asyncio.Future]
+
+    def age(self) -> float:
+        if self.timestamp is None:
+            return float("inf")
+        return time.monotonic() - self.timestamp
+
+
+class SensorSnapshots:
+    """
+    Per-process cache of sensor readings.
+
+    Every distinct reader (function + arguments) gets its own snapshot.
+    A single background poller refreshes all snapshots that are being read
+    once per interval, so N concurrent clients cost one sensor-util/sensors
+    invocation per interval instead of N. Requests that need fresher data
+    than what is cached (see max_age) trigger a refresh themselves, and
+    concurrent refreshes of the same snapshot are coalesced onto one
+    in-flight read.
+    """
+
+    _instance = None
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL_SEC):
+        self.interval = interval
+        self._snapshots = {}  # type: t.Dict[t.Tuple, SensorSnapshot]
+        self._poller = None  # type: t.Optional[asyncio.Future]
+
+    @classmethod
+    def instance(cls) -> "SensorSnapshots":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    async def get(
+        self, fetch: t.Callable, *args, max_age: t.Optional[float] = None
+    ) -> t.Any:
+        """
+        Return the result of fetch(*args), served from the snapshot if it
+        is not older than max_age seconds. max_age defaults to twice the
+        poll interval, which allows for poller jitter; 0 forces a read.
+        fetch may be a coroutine function or a blocking function, the
+        latter is run in the common executor.
+        """
+        if max_age is None:
+            max_age = 2 * self.interval
+        key = (fetch,) + args
+        snapshot = self._snapshots.get(key)
+        if snapshot is None:
+            snapshot = SensorSnapshot()
+            self._snapshots[key] = snapshot
+        snapshot.last_access = time.monotonic()
+        self._ensure_poller()
+        if snapshot.age() <= max_age:
+            return snapshot.data
+        return await asyncio.shield(self._refresh(snapshot, fetch, args))
+
+    def invalidate(self, fetch: t.Callable):
+        """
+        Mark every snapshot of fetch as stale, e.g. after an action that
+        changes what fetch would return.
+        """
+        for key, snapshot in self._snapshots.items():
+            if key[0] == fetch:
+                snapshot.timestamp = None
+
+    def _refresh(
+        self, snapshot: SensorSnapshot, fetch: t.Callable, args: t.Tuple
+    ) -> asyncio.Future:
+        if snapshot.inflight is None:
+            snapshot.inflight = asyncio.ensure_future(
+                self._read(snapshot, fetch, args)
+            )
+        return snapshot.inflight
+
+    async def _read(
+        self, snapshot: SensorSnapshot, fetch: t.Callable, args: t.Tuple
+    ) -> t.Any:
+        try:
+            if asyncio.iscoroutinefunction(fetch):
+                data = await fetch(*args)
+            else:
+                loop = asyncio.get_event_loop()
+                data = await loop.run_in_executor(common_executor, fetch, *args)
+            snapshot.data = data
+            snapshot.timestamp = time.monotonic()
+            return data
+        finally:
+            snapshot.inflight = None
+
+    def _ensure_poller(self):
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.ensure_future(self._poll())
+
+    async def _poll(self):
+        while self._snapshots:
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            refreshes = []
+            for key, snapshot in list(self._snapshots.items()):
+                if now - snapshot.last_access > IDLE_INTERVALS * self.interval:
+                    if snapshot.inflight is None:
+                        del self._snapshots[key]
+                    continue
+                if snapshot.age() < self.interval:
+                    # Already refreshed on behalf of a client
+                    continue
+                refreshes.append(self._refresh(snapshot, key[0], key[1:]))
+            results = await asyncio.gather(*refreshes, return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    server_logger.warning(
+                        "Sensor snapshot refresh failed: %s" % repr(result)
+                    )
+
+
+def max_age_from_query(query: t.Mapping[str, str]) -> t.Optional[float]:
+    """
+    Parse the optional ?max_age= query parameter (seconds).
+    """
+    if "max_age" not in query:
+        return None
+    try:
+        max_age = float(query["max_age"])
+    except ValueError:
+        max_age = -1
+    if max_age < 0:
+        raise web.HTTPBadRequest(
+            text="max_age must be a non-negative number of seconds"
+        )
+    return max_age
+
+
+async def get_sensor_snapshot(request: web.Request, fetch: t.Callable, *args):
+    """
+    Convenience wrapper for handlers: read fetch(*args) through the shared
+    snapshot cache, honouring the request's ?max_age= parameter.
+    """
+    max_age = max_age_from_query(request.query)
+    return await SensorSnapshots.instance().get(fetch, *args, max_age=max_age)
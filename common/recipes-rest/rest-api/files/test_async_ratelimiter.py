@@ -17,6 +17,7 @@
 # 51 Franklin Street, Fifth Floor,
 # Boston, MA 02110-1301 USA
 #
+import asyncio
 import json
 import unittest
 
@@ -92,3 +93,108 @@ class TestRatelimiterWorks(test_utils.AioHTTPTestCase):
         for _ in range(0, 2):
             await self.__assert_normal_request()
         await self.__assert_normal_request("POST")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestAsyncRateLimiterWindow(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        self.clock = FakeClock()
+
+    def limiter(self, **kwargs):
+        return async_ratelimiter.AsyncRateLimiter(clock=self.clock, **kwargs)
+
+    def is_limited(self, limiter, endpoint="/test", method="GET", agent="agent"):
+        return self.loop.run_until_complete(
+            limiter.is_limited(endpoint, method, agent)
+        )
+
+    def test_requests_expire_after_window(self):
+        limiter = self.limiter(slidewindow_size=20, limit=2)
+        self.assertFalse(self.is_limited(limiter))
+        self.clock.now += 10
+        self.assertFalse(self.is_limited(limiter))
+        self.assertTrue(self.is_limited(limiter))
+        # the first request has left the window, the second has not
+        self.clock.now += 12
+        self.assertFalse(self.is_limited(limiter))
+        self.assertTrue(self.is_limited(limiter))
+
+    def test_client_limit_applies_across_endpoints(self):
+        limiter = self.limiter(slidewindow_size=20, limit=0, client_limit=2)
+        self.assertFalse(self.is_limited(limiter, endpoint="/a"))
+        self.assertFalse(self.is_limited(limiter, endpoint="/b"))
+        self.assertTrue(self.is_limited(limiter, endpoint="/c"))
+        self.assertFalse(self.is_limited(limiter, endpoint="/c", agent="other"))
+
+    def test_global_limit(self):
+        limiter = self.limiter(slidewindow_size=20, limit=0, global_limit=2)
+        self.assertFalse(self.is_limited(limiter, agent="a"))
+        self.assertFalse(self.is_limited(limiter, agent="b"))
+        self.assertTrue(self.is_limited(limiter, agent="c"))
+
+    def test_limited_requests_are_not_counted(self):
+        limiter = self.limiter(slidewindow_size=20, limit=2, client_limit=3)
+        for _ in range(2):
+            self.assertFalse(self.is_limited(limiter, endpoint="/a"))
+        for _ in range(5):
+            self.assertTrue(self.is_limited(limiter, endpoint="/a"))
+        self.assertFalse(self.is_limited(limiter, endpoint="/b"))
+
+    def test_idle_keys_are_evicted(self):
+        limiter = self.limiter(slidewindow_size=20, limit=5, client_limit=5)
+        for i in range(100):
+            self.is_limited(limiter, agent="agent%d" % i)
+        self.assertEqual(len(limiter._request_counters), 100)
+        self.clock.now += 40
+        self.is_limited(limiter)
+        self.assertEqual(list(limiter._request_counters), [("/test", "GET", "agent")])
+        self.assertEqual(list(limiter._client_counters), ["agent"])
+
+    def test_scraping_burst(self):
+        """
+        50k requests over 500 user agents in 100 seconds.
+        The limiter must not leave tasks behind nor keep idle counters.
+        """
+        limiter = self.limiter(
+            slidewindow_size=60, limit=20, client_limit=100, global_limit=10000
+        )
+
+        async def burst():
+            tasks = len(asyncio.all_tasks())
+            allowed = 0
+            for i in range(50000):
+                self.clock.now += 0.002
+                if not await limiter.is_limited(
+                    "/api/sys/sensors", "GET", "agent%d" % (i % 500)
+                ):
+                    allowed += 1
+            return allowed, len(asyncio.all_tasks()) - tasks
+
+        allowed, new_tasks = self.loop.run_until_complete(burst())
+        self.assertEqual(new_tasks, 0)
+        # 100 seconds at 20 requests per window per agent
+        self.assertLessEqual(allowed, 500 * 20 * 2)
+        self.assertLessEqual(len(limiter._request_counters), 500)
+        self.assertLessEqual(len(limiter._client_counters), 500)
+
+    def test_invalid_window(self):
+        for kwargs in (
+            {"slidewindow_size": 0},
+            {"slidewindow_size": 20, "subwindows": 0},
+        ):
+            with self.subTest(**kwargs):
+                with self.assertRaises(ValueError):
+                    self.limiter(limit=2, **kwargs)
+
+    def test_invalid_window_disabled(self):
+        limiter = self.limiter(slidewindow_size=0, limit=0)
+        self.assertFalse(self.is_limited(limiter))
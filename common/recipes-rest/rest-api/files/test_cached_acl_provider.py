@@ -81,3 +81,19 @@ class TestCachedAclProvider(unittest.TestCase):
                     common_auth.Identity(user="deathowl", host=None)
                 ),
             )
+
+    def test_signal_handler_invalidates_decisions(self):
+        with tempfile.NamedTemporaryFile("wb") as tmpfile:
+            rules = {"deathowl": ["test", "awesome"]}
+            tmpfile.write(gzip.compress(bytes(json.dumps(rules), encoding="utf-8")))
+            tmpfile.seek(0)
+            subject = cached_acl_provider.CachedAclProvider(cachepath=tmpfile.name)
+            identity = common_auth.Identity(user="deathowl", host=None)
+            self.assertTrue(subject.is_authorized(identity, ["awesome"]))
+            newrules = {"deathowl": ["cats"]}
+            tmpfile.seek(0)
+            tmpfile.truncate()
+            tmpfile.write(gzip.compress(bytes(json.dumps(newrules), encoding="utf-8")))
+            tmpfile.seek(0)
+            os.kill(os.getpid(), signal.SIGHUP)
+            self.assertFalse(subject.is_authorized(identity, ["awesome"]))
@@ -132,4 +132,35 @@ class TestCachedAclProvider(unittest.TestCase):
     def test_is_authorized_unauthorized(self):
         acl_provider = MockAclProvider()
 
-        self.assertEqual(acl_provider.is_authorized(common_auth.NO_IDENTITY, []), False)
+        self.assertFalse(acl_provider.is_authorized(common_auth.NO_IDENTITY, []))
+
+    def test_is_authorized_caches_decisions(self):
+        acl_provider = MockAclProvider()
+        acl_provider.always_authorize_user = True
+
+        for _ in range(3):
+            self.assertTrue(acl_provider.is_authorized(common_auth.NO_IDENTITY, []))
+        self.assertEqual(acl_provider.is_user_authorized.call_count, 1)
+
+        acl_provider.always_authorize_user = False
+        acl_provider.invalidate_decisions()
+        self.assertFalse(acl_provider.is_authorized(common_auth.NO_IDENTITY, []))
+
+    def test_is_authorized_decisions_follow_hostname(self):
+        acl_provider = AclProviderBase.__new__(MockAclProvider)
+        AclProviderBase.__init__(acl_provider)
+        acl_provider.is_host_authorized = AclProviderBase.is_host_authorized
+
+        self.assertEqual(
+            acl_provider.is_authorized(
+                EXAMPLE_MANAGED_HOST_IDENTITY, ["MANAGED_HOST_ANY"]
+            ),
+            True,
+        )
+        socket.gethostname.return_value = "another_hostname-oob.example.com"
+        self.assertEqual(
+            acl_provider.is_authorized(
+                EXAMPLE_MANAGED_HOST_IDENTITY, ["MANAGED_HOST_ANY"]
+            ),
+            False,
+        )
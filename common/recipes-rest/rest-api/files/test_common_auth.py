@@ -196,6 +196,26 @@ class TestCommonAuth(AioHTTPTestCase):
 
         self.assertEqual(res, common_auth.Identity(user="user:a_username", host=None))
 
+    def test_extract_identity_cached_per_transport(self):
+        req = self.make_mocked_request_user_cert()
+        common_auth._extract_identity(req)
+        calls = req.transport.get_extra_info.call_count
+        res = common_auth._extract_identity(req)
+
+        self.assertEqual(res, common_auth.Identity(user="user:a_username", host=None))
+        self.assertEqual(req.transport.get_extra_info.call_count, calls)
+
+    def test_extract_identity_cache_expires_with_cert(self):
+        req = self.make_mocked_request_user_cert()
+        common_auth._extract_identity(req)
+        calls = req.transport.get_extra_info.call_count
+        common_auth.now.return_value = datetime.datetime(2000, 1, 3)
+        with self.assertLogs(level="INFO"):
+            res = common_auth._extract_identity(req)
+
+        self.assertEqual(res, common_auth.NO_IDENTITY)
+        self.assertGreater(req.transport.get_extra_info.call_count, calls)
+
     def test_validate_cert_date(self):
         req = self.make_mocked_request_user_cert()
         self.assertEqual(common_auth._validate_cert_date(req), True)
@@ -24,12 +24,18 @@ import io
 import json
 import logging
 import logging.config
+import logging.handlers
 import os
+import queue
 import tempfile
 import unittest
 from unittest.mock import patch
 
-from common_logging import get_logger_config
+from common_logging import (
+    BatchingQueueListener,
+    DroppingQueueHandler,
+    get_logger_config,
+)
 
 
 stdout_target = {"loghandler": "stdout"}
@@ -148,3 +154,101 @@ class TestLoggerConfigurator(unittest.TestCase):
                 },
                 json.loads(fake_out.getvalue()),
             )
+
+    def test_json_access_log_request_time(self):
+        with patch("sys.stdout", new=io.StringIO()) as fake_out:
+            logging.config.dictConfig(
+                get_logger_config(merge_configs([stdout_target, json_format]))
+            )
+            record = logging.makeLogRecord(
+                {
+                    "name": "aiohttp.access",
+                    "levelno": logging.INFO,
+                    "levelname": "INFO",
+                    "msg": "GET /api",
+                    "created": 1000.5,
+                    "request_start_time": "[01/Jan/1970:00:16:40 +0000]",
+                    "request_time_micro": "250000",
+                }
+            )
+            logging.getLogger("aiohttp.access").handle(record)
+            logged = json.loads(fake_out.getvalue())
+        self.assertNotIn("request_start_time", logged)
+        self.assertEqual(
+            datetime.datetime.fromisoformat(logged["request_time"]).timestamp(),
+            1000.25,
+        )
+
+    def test_json_logger_time_is_record_time(self):
+        with patch("sys.stdout", new=io.StringIO()) as fake_out:
+            logging.config.dictConfig(
+                get_logger_config(merge_configs([stdout_target, json_format]))
+            )
+            record = logging.makeLogRecord(
+                {
+                    "levelno": logging.INFO,
+                    "levelname": "INFO",
+                    "msg": "testmessage",
+                    "created": 1000.5,
+                }
+            )
+            logging.getLogger().handle(record)
+            logged = json.loads(fake_out.getvalue())
+        self.assertEqual(logged["time"], "1970-01-01T00:16:40.500000")
+
+
+class TestAccessLogQueue(unittest.TestCase):
+    def make_record(self, n):
+        return logging.makeLogRecord(
+            {"name": "aiohttp.access", "levelno": logging.INFO, "msg": str(n)}
+        )
+
+    def test_queue_handler_drops_when_full(self):
+        log_queue = queue.Queue(2)
+        handler = DroppingQueueHandler(log_queue)
+        for n in range(5):
+            handler.handle(self.make_record(n))
+        self.assertEqual(handler.dropped, 3)
+        self.assertEqual(log_queue.get_nowait().msg, "0")
+
+    def test_listener_writes_batches(self):
+        log_queue = queue.Queue()
+        stream = io.StringIO()
+        stream_handler = logging.StreamHandler(stream)
+        queue_handler = DroppingQueueHandler(log_queue)
+        queue_handler.dropped = 2
+        listener = BatchingQueueListener(
+            log_queue, stream_handler, batch_size=3, queue_handler=queue_handler
+        )
+        for n in range(5):
+            queue_handler.handle(self.make_record(n))
+        with patch.object(stream_handler, "flush") as flush, self.assertLogs(
+            "aiohttp.server", level="WARNING"
+        ) as logs:
+            listener.start()
+            listener.stop()
+        self.assertEqual(stream.getvalue(), "0\n1\n2\n3\n4\n")
+        self.assertEqual(flush.call_count, 2)
+        self.assertEqual(
+            logs.output, ["WARNING:aiohttp.server:Dropped 2 access log records"]
+        )
+
+    def test_listener_rotates_files(self):
+        with tempfile.TemporaryDirectory() as logdir:
+            logfile = os.path.join(logdir, "rest.log")
+            # The second batch rolls over when its last record does not fit
+            file_handler = logging.handlers.RotatingFileHandler(
+                logfile, maxBytes=6, backupCount=1, delay=True
+            )
+            log_queue = queue.Queue()
+            listener = BatchingQueueListener(log_queue, file_handler, batch_size=2)
+            queue_handler = DroppingQueueHandler(log_queue)
+            for n in range(4):
+                queue_handler.handle(self.make_record(n))
+            listener.start()
+            listener.stop()
+            file_handler.close()
+            with open(logfile) as f:
+                self.assertEqual(f.read(), "2\n3\n")
+            with open(logfile + ".1") as f:
+                self.assertEqual(f.read(), "0\n1\n")
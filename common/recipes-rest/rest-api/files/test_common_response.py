@@ -0,0 +1,161 @@
+import json
+import unittest
+from unittest.mock import patch
+
+import common_utils
+from aiohttp import web
+from aiohttp.test_utils import AioHTTPTestCase, unittest_run_loop
+from common_response import ResponseCache, cached_response
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Handler:
+    def __init__(self):
+        self.calls = 0
+
+    @cached_response()
+    async def static(self, request):
+        self.calls += 1
+        return web.json_response(
+            {"calls": self.calls, "name": b"wedge"}, dumps=common_utils.dumps_bytestr
+        )
+
+    @cached_response(max_age=10)
+    async def bounded(self, request):
+        self.calls += 1
+        return web.json_response({"calls": self.calls})
+
+    @cached_response(vary_query=True)
+    async def query(self, request):
+        self.calls += 1
+        return web.json_response({"calls": self.calls, "query": dict(request.query)})
+
+    @cached_response()
+    async def failing(self, request):
+        self.calls += 1
+        return web.json_response({"calls": self.calls}, status=500)
+
+    @cached_response()
+    async def no_store(self, request):
+        self.calls += 1
+        return web.json_response(
+            {"calls": self.calls}, headers={"Cache-Control": "no-store"}
+        )
+
+
+
+class TestResponseCache(AioHTTPTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = ResponseCache(clock=self.clock, max_entries=3)
+        patcher = patch.object(ResponseCache, "_instance", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.handler = Handler()
+        super().setUp()
+
+    async def get_application(self):
+        webapp = web.Application()
+        webapp.router.add_get("/static", self.handler.static)
+        webapp.router.add_get("/bounded", self.handler.bounded)
+        webapp.router.add_get("/query", self.handler.query)
+        webapp.router.add_get("/failing", self.handler.failing)
+        webapp.router.add_get("/no_store", self.handler.no_store)
+        return webapp
+
+    @unittest_run_loop
+    async def test_static_body_is_cached(self):
+        for _ in range(3):
+            resp = await self.client.request("GET", "/static")
+            self.assertEqual(resp.status, 200)
+            self.assertEqual(await resp.json(), {"calls": 1, "name": "wedge"})
+            self.assertEqual(resp.content_type, "application/json")
+        self.assertEqual(self.handler.calls, 1)
+
+    @unittest_run_loop
+    async def test_query_is_ignored(self):
+        for i in range(10):
+            resp = await self.client.request("GET", "/static?x=%d" % i)
+            self.assertEqual(await resp.json(), {"calls": 1, "name": "wedge"})
+        self.assertEqual(len(self.cache._bodies), 1)
+
+    @unittest_run_loop
+    async def test_vary_query_is_bounded(self):
+        for i in range(10):
+            resp = await self.client.request("GET", "/query?x=%d" % i)
+            self.assertEqual(
+                await resp.json(), {"calls": i + 1, "query": {"x": str(i)}}
+            )
+        self.assertEqual(len(self.cache._bodies), 3)
+        # The most recently used entries are kept
+        resp = await self.client.request("GET", "/query?x=9")
+        self.assertEqual(await resp.json(), {"calls": 10, "query": {"x": "9"}})
+        resp = await self.client.request("GET", "/query?x=0")
+        self.assertEqual(await resp.json(), {"calls": 11, "query": {"x": "0"}})
+
+    @unittest_run_loop
+    async def test_conditional_get(self):
+        resp = await self.client.request("GET", "/static")
+        etag = resp.headers["ETag"]
+        resp = await self.client.request(
+            "GET", "/static", headers={"If-None-Match": etag}
+        )
+        self.assertEqual(resp.status, 304)
+        self.assertEqual(resp.headers["ETag"], etag)
+        self.assertEqual(await resp.read(), b"")
+        resp = await self.client.request(
+            "GET", "/static", headers={"If-None-Match": '"stale"'}
+        )
+        self.assertEqual(resp.status, 200)
+
+    @unittest_run_loop
+    async def test_max_age(self):
+        await self.client.request("GET", "/bounded")
+        self.clock.now = 9
+        resp = await self.client.request("GET", "/bounded")
+        self.assertEqual(await resp.json(), {"calls": 1})
+        self.clock.now = 10
+        resp = await self.client.request("GET", "/bounded")
+        self.assertEqual(await resp.json(), {"calls": 2})
+
+    @unittest_run_loop
+    async def test_errors_are_not_cached(self):
+        for _ in range(2):
+            resp = await self.client.request("GET", "/failing")
+            self.assertEqual(resp.status, 500)
+            self.assertNotIn("ETag", resp.headers)
+        self.assertEqual(self.handler.calls, 2)
+
+    @unittest_run_loop
+    async def test_no_store_is_not_cached(self):
+        for i in range(2):
+            resp = await self.client.request("GET", "/no_store")
+            self.assertEqual(await resp.json(), {"calls": i + 1})
+            self.assertNotIn("ETag", resp.headers)
+        self.assertEqual(len(self.cache._bodies), 0)
+
+    @unittest_run_loop
+    async def test_invalidate(self):
+        await self.client.request("GET", "/static")
+        self.cache.invalidate()
+        resp = await self.client.request("GET", "/static")
+        self.assertEqual(await resp.json(), {"calls": 2, "name": "wedge"})
+
+
+class TestDumpsBytestr(unittest.TestCase):
+    def test_bytes_are_decoded(self):
+        obj = {"a": b"b", 1: [b"c", None]}
+        self.assertEqual(
+            json.loads(common_utils.dumps_bytestr(obj)), {"a": "b", "1": ["c", None]}
+        )
+
+    def test_unserializable(self):
+        with self.assertRaises(TypeError):
+            common_utils.dumps_bytestr({"a": object()})
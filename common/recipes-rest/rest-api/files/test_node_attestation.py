@@ -0,0 +1,59 @@
+import asyncio
+import threading
+import time
+import unittest
+
+import node_attestation
+
+ARGS = {"algo": "sha256", "flash0": "/dev/flash0", "flash1": "/dev/flash1"}
+
+
+class TestMeasurementCache(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        self.calls = []
+        self.threads = set()
+        self.cache = node_attestation.MeasurementCache(self.measure)
+
+    def measure(self, args):
+        self.calls.append(args)
+        calls = len(self.calls)
+        self.threads.add(threading.get_ident())
+        time.sleep(0.05)
+        return {"algo": args["algo"], "calls": calls}
+
+    def get(self, args, count=1):
+        async def run():
+            return await asyncio.gather(*[self.cache.get(args) for _ in range(count)])
+
+        return self.loop.run_until_complete(run())
+
+    def test_measure_runs_off_the_event_loop(self):
+        self.get(ARGS)
+        self.assertNotIn(threading.get_ident(), self.threads)
+
+    def test_concurrent_requests_share_one_measurement(self):
+        results = self.get(ARGS, count=5)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(results, [{"algo": "sha256", "calls": 1}] * 5)
+
+    def test_results_are_cached_per_algo(self):
+        self.get(ARGS)
+        self.get(ARGS)
+        self.assertEqual(len(self.calls), 1)
+        self.get({**ARGS, "algo": "sha1"})
+        self.assertEqual(len(self.calls), 2)
+
+    def test_max_age(self):
+        self.cache.max_age = 0
+        self.get(ARGS)
+        self.get(ARGS)
+        self.assertEqual(len(self.calls), 2)
+
+    def test_expired_requests_share_one_measurement(self):
+        self.cache.max_age = 0
+        self.get(ARGS)
+        results = self.get(ARGS, count=3)
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(results, [{"algo": "sha256", "calls": 2}] * 3)
@@ -0,0 +1,143 @@
+import asyncio
+import time
+import unittest
+from unittest.mock import mock_open, patch
+
+import node_bmc
+
+
+class TestNodeBmcFormatting(unittest.TestCase):
+    def test_format_uptime(self):
+        now = time.strptime("10:20:30", "%H:%M:%S")
+        load_avg = ["0.00", "0.01", "0.05"]
+        self.assertEqual(
+            node_bmc.format_uptime(now, 2 * 86400 + 3 * 3600 + 4 * 60 + 5, load_avg),
+            "10:20:30 up 2 days,  3:04,  load average: 0.00, 0.01, 0.05",
+        )
+        self.assertEqual(
+            node_bmc.format_uptime(now, 86400 + 59, load_avg),
+            "10:20:30 up 1 day, 0 min,  load average: 0.00, 0.01, 0.05",
+        )
+        self.assertEqual(
+            node_bmc.format_uptime(now, 12 * 3600 + 60, load_avg),
+            "10:20:30 up 12:01,  load average: 0.00, 0.01, 0.05",
+        )
+
+    def test_format_mem_usage(self):
+        meminfo = {
+            "MemTotal": 1000,
+            "MemFree": 300,
+            "Shmem": 10,
+            "Buffers": 20,
+            "Cached": 30,
+        }
+        self.assertEqual(
+            node_bmc.format_mem_usage(meminfo),
+            "Mem: 700K used, 300K free, 10K shrd, 20K buff, 30K cached",
+        )
+
+    def test_format_cpu_usage(self):
+        prev = [100, 0, 50, 800, 0, 0, 0]
+        cur = [150, 0, 75, 1000, 0, 0, 25]
+        self.assertEqual(
+            node_bmc.format_cpu_usage(prev, cur),
+            "CPU:  16% usr   8% sys   0% nic  66% idle   0% io   0% irq   8% sirq",
+        )
+
+    def test_read_cpu_stat(self):
+        stat = (
+            "cpu  4705 356 584 3699 23 23 0 0 0 0\ncpu0 4705 356 584 3699 23 23 0 0\n"
+        )
+        with patch("builtins.open", mock_open(read_data=stat)):
+            self.assertEqual(
+                node_bmc.read_cpu_stat(), [4705, 356, 584, 3699, 23, 23, 0]
+            )
+
+
+class TestNodeBmcStaticInformation(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        node_bmc.read_static_information.cache_clear()
+        self.addCleanup(node_bmc.read_static_information.cache_clear)
+
+    def test_static_information_is_read_once(self):
+        async def uboot_ver(_self):
+            return "2019.04"
+
+        async def spi_vendor(spi_id):
+            return "Winbond"
+
+        async def vboot_status():
+            return {"status": "-1"}
+
+        with patch.multiple(
+            node_bmc.bmcNode,
+            getUbootVer=uboot_ver,
+            getMacAddr=lambda _self: "00:11:22:33:44:55",
+            getOpenBMCVer=lambda _self: "fby3-v2021.01",
+        ), patch.multiple(
+            node_bmc,
+            getSPIVendor=spi_vendor,
+            get_vboot_status=vboot_status,
+            is_boot_from_secondary=lambda: False,
+            read_proc_mtd=lambda: ["flash0"],
+        ), patch(
+            "rest_pal_legacy.pal_get_platform_name", return_value="fby3"
+        ) as platform_name, patch(
+            "os.path.exists", return_value=False
+        ):
+            bmc = node_bmc.get_node_bmc()
+            first = self.loop.run_until_complete(bmc.getStaticInformation())
+            second = self.loop.run_until_complete(bmc.getStaticInformation())
+
+        self.assertIs(first, second)
+        self.assertEqual(platform_name.call_count, 1)
+        self.assertEqual(first["Description"], "fby3 BMC")
+        self.assertEqual(first["u-boot version"], "2019.04")
+        self.assertEqual(first["SPI1 Vendor"], "Winbond")
+        self.assertEqual(first["TPM TCG version"], "NA")
+
+    def test_failed_read_is_retried(self):
+        reads = []
+
+        async def read(_self):
+            reads.append(1)
+            if len(reads) == 1:
+                raise OSError("vboot-util failed")
+            return {"Description": "fby3 BMC"}
+
+        with patch.object(node_bmc.bmcNode, "_readStaticInformation", read):
+            bmc = node_bmc.get_node_bmc()
+            with self.assertRaises(OSError):
+                self.loop.run_until_complete(bmc.getStaticInformation())
+            info = self.loop.run_until_complete(bmc.getStaticInformation())
+            self.loop.run_until_complete(bmc.getStaticInformation())
+
+        self.assertEqual(info, {"Description": "fby3 BMC"})
+        self.assertEqual(len(reads), 2)
+
+
+class TestNodeBmcResetReason(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+    def reset_reason(self):
+        return self.loop.run_until_complete(node_bmc.get_node_bmc().getResetReason())
+
+    def test_wdt_counter(self):
+        with patch.object(node_bmc, "read_phymem32", return_value=0x100):
+            self.assertEqual(self.reset_reason(), "User Initiated Reset or WDT Reset")
+        with patch.object(node_bmc, "read_phymem32", return_value=0):
+            self.assertEqual(self.reset_reason(), "Power ON Reset")
+
+    def test_devmem_fallback(self):
+        async def devmem(cmd, shell=False):
+            self.assertEqual(cmd, ["devmem", "0x1e785010"])
+            return 0, "0x00000100\n", ""
+
+        with patch.object(
+            node_bmc, "read_phymem32", side_effect=PermissionError()
+        ), patch.object(node_bmc, "async_exec", devmem):
+            self.assertEqual(self.reset_reason(), "User Initiated Reset or WDT Reset")
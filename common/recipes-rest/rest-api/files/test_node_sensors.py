@@ -1,10 +1,27 @@
 import os
 import subprocess
+import sys
+import types
 import unittest
 from unittest.mock import Mock, patch
 
+import node_sensors
 from node_sensors import sensorsNode
 
+SDR_SOURCE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "../../../recipes-lib/sdr/files"
+)
+if SDR_SOURCE_DIR not in sys.path:
+    sys.path.append(SDR_SOURCE_DIR)
+
+try:
+    from sdr_testing import load_sdr
+
+    sdr_helpers = load_sdr()
+except ImportError:
+    # Not run from the source tree
+    sdr_helpers = None
+
 
 class TestSensors(unittest.TestCase):
     def setUp(self):
@@ -140,7 +157,6 @@ class TestSensors(unittest.TestCase):
             stdout=-1,
         )
 
-
     # removing this test, since it makes no sense to me
     # TODO: someone who has a concept about this pls fix this
     # @patch.object(subprocess, "check_call")
@@ -183,3 +199,138 @@ class TestSensors(unittest.TestCase):
     #     mocked_check_call.assert_called_with(
     #         ["/usr/local/bin/sensor-util", "mb", "--history-clear", "0xA0"]
     #     )
+
+
+class LibPalError(Exception):
+    pass
+
+
+class LibSdrError(Exception):
+    pass
+
+
+def fake_thresh(name, units, flag, ucr=0.0, lcr=0.0):
+    return types.SimpleNamespace(
+        name=name.encode(),
+        units=units.encode(),
+        flag=flag,
+        ucr_thresh=ucr,
+        unc_thresh=0.0,
+        unr_thresh=0.0,
+        lcr_thresh=lcr,
+        lnc_thresh=0.0,
+        lnr_thresh=0.0,
+    )
+
+
+@unittest.skipIf(sdr_helpers is None, "sdr bindings not found")
+class TestLibpalSensors(unittest.TestCase):
+    def setUp(self):
+        thresholds = {
+            (1, 0xA0): fake_thresh("MB_INLET_TEMP", "C", 0x13, ucr=40.0, lcr=5.0),
+            (1, 0xA1): fake_thresh("MB_OUTLET_TEMP", "C", 0x03, ucr=30.0),
+            (1, 0xA2): fake_thresh("MB_FAN0_TACH", "RPM", 0x00),
+        }
+        readings = {(1, 0xA0): 33.3125, (1, 0xA1): 31.0}
+        pal = Mock()
+        pal.LibPalError = LibPalError
+        pal.pal_fru_name_map.return_value = {"mb": 1, "nic": 2}
+        pal.pal_get_fru_id.side_effect = {"mb": 1, "nic": 2}.__getitem__
+        pal.pal_is_fru_prsnt.side_effect = lambda fru: fru == 1
+        pal.pal_is_fru_ready.return_value = True
+        pal.pal_get_fru_sensor_list.return_value = (0xA0, 0xA1, 0xA2)
+        pal.pal_alter_sensor_thresh_flag.side_effect = lambda f, s, flag: flag
+
+        def sensor_read(fru, snr_num):
+            if (fru, snr_num) not in readings:
+                raise LibPalError()
+            return readings[(fru, snr_num)]
+
+        pal.sensor_read.side_effect = sensor_read
+        pal.sensor_read_history.return_value = types.SimpleNamespace(
+            min_intv_consumed=30.0, max_intv_consumed=35.0, avg_intv_consumed=32.5
+        )
+        sdr = Mock()
+        sdr.LibSdrError = LibSdrError
+        sdr.sdr_get_sensor_metadata.side_effect = lambda fru, snr: (
+            types.SimpleNamespace(
+                name=thresholds[(fru, snr)].name.decode(),
+                units=thresholds[(fru, snr)].units.decode(),
+                thresh=thresholds[(fru, snr)],
+            )
+        )
+        sdr.sensor_status = sdr_helpers.sensor_status
+        sdr.sensor_thresholds = sdr_helpers.sensor_thresholds
+        for name, mock in [("pal", pal), ("sdr", sdr)]:
+            patcher = patch.object(node_sensors, name, mock, create=True)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.pal = pal
+
+    def test_basic_call(self):
+        self.assertEqual(
+            node_sensors.read_pal_sensors("mb"),
+            {
+                "MB_INLET_TEMP": {"value": "33.31"},
+                "MB_OUTLET_TEMP": {"value": "31.00"},
+                "MB_FAN0_TACH": {"value": "NA"},
+            },
+        )
+
+    def test_all_frus_skips_absent(self):
+        self.assertEqual(len(node_sensors.read_pal_sensors("all")), 3)
+        self.pal.pal_get_fru_sensor_list.assert_called_once_with(1)
+
+    def test_display_options(self):
+        self.assertEqual(
+            node_sensors.read_pal_sensors(
+                "mb", display=("units", "id", "status", "thresholds")
+            ),
+            {
+                "MB_INLET_TEMP": {
+                    "value": "33.31",
+                    "units": "C",
+                    "id": "A0",
+                    "status": "ok",
+                    "thresholds": {"UCR": "40.00", "LCR": "5.00"},
+                },
+                "MB_OUTLET_TEMP": {
+                    "value": "31.00",
+                    "units": "C",
+                    "id": "A1",
+                    "status": "ucr",
+                    "thresholds": {"UCR": "30.00"},
+                },
+                "MB_FAN0_TACH": {
+                    "value": "NA",
+                    "units": "na",
+                    "id": "A2",
+                    "status": "na",
+                },
+            },
+        )
+
+    def test_filter_by_name_and_id(self):
+        expected = {"MB_OUTLET_TEMP": {"value": "31.00"}}
+        self.assertEqual(
+            node_sensors.read_pal_sensors("mb", sensor_name="mb_outlet_temp"),
+            expected,
+        )
+        self.assertEqual(
+            node_sensors.read_pal_sensors("mb", sensor_id="0xA1"), expected
+        )
+
+    def test_history_call(self):
+        with patch.object(node_sensors.time, "time", return_value=1000):
+            result = node_sensors.read_pal_sensors(
+                "mb", sensor_name="MB_INLET_TEMP", period="2m", display=("history",)
+            )
+        self.assertEqual(
+            result, {"MB_INLET_TEMP": {"min": "30.00", "avg": "32.50", "max": "35.00"}}
+        )
+        self.pal.sensor_read_history.assert_called_with(1, 0xA0, 880)
+
+    def test_read_failure_is_logged(self):
+        self.pal.pal_fru_name_map.side_effect = RuntimeError("libpal")
+        with self.assertLogs("aiohttp.server", level="ERROR"):
+            self.assertEqual(node_sensors.read_pal_sensors("all"), {})
@@ -28,6 +28,17 @@ sensor_thresh = t.NamedTuple(
     ],
 )
 
+# mocking a tuple instead of sdr.SensorMetadata bc sdr lib isn't available here
+sensor_metadata = t.NamedTuple(
+    "sensor_metadata",
+    [("name", str), ("units", str), ("thresh", sensor_thresh)],
+)
+
+
+def sensor_readings(values: t.List[float]) -> unittest.mock.Mock:
+    "Stand-in for pal.FruSensorReadings"
+    return unittest.mock.Mock(value_at=values.__getitem__)
+
 
 class TestChassisService(AioHTTPTestCase):
     def setUp(self):
@@ -68,39 +79,34 @@ class TestChassisService(AioHTTPTestCase):
                 "pal.pal_get_fru_sensor_list", create=True, side_effect=[[224]]
             ),
             unittest.mock.patch(
-                "sdr.sdr_get_sensor_units",
-                create=True,
-                side_effect=["Amps", "C", "RPM"],
-            ),
-            unittest.mock.patch(
-                "pal.sensor_read",
-                create=True,
-                side_effect=[24.9444444444, 7177],
-            ),
-            unittest.mock.patch(
-                "sdr.sdr_get_sensor_thresh",
+                "sdr.sdr_get_sensor_metadata",
                 create=True,
                 side_effect=[
-                    sensor_thresh(
-                        0,
-                        5.5,
-                        0,
-                        0,
-                        0,
-                        0,
+                    sensor_metadata(
+                        "SP_P5V",
+                        "Amps",
+                        sensor_thresh(
+                            0,
+                            5.5,
+                            0,
+                            0,
+                            0,
+                            0,
+                        ),
                     ),
                 ],
             ),
             unittest.mock.patch(
-                "pal.sensor_read_history",
-                new_callable=unittest.mock.MagicMock,
+                "pal.sensor_read_fru",
                 create=True,
-                return_value=SensorHistory(5.02, 5.03, 5.03),
+                side_effect=[sensor_readings([24.9444444444, 7177])],
             ),
             unittest.mock.patch(
-                "sdr.sdr_get_sensor_name",
+                "pal.sensor_read_history_fru",
                 create=True,
-                side_effect=["SP_P5V", "SP_INLET_TEMP", "SP_FAN0_TACH"],
+                return_value=unittest.mock.Mock(
+                    history_at=lambda idx: SensorHistory(5.02, 5.03, 5.03)
+                ),
             ),
             unittest.mock.patch(
                 "pal.LibPalError",
@@ -150,14 +156,18 @@ class TestChassisService(AioHTTPTestCase):
 
         for server_name in ["1", "server1", "server2", "server3", "server4"]:
             with self.subTest(server_name=server_name):
-                sdr.sdr_get_sensor_thresh.side_effect = [
-                    sensor_thresh(
-                        0,
-                        5.5,
-                        0,
-                        0,
-                        0,
-                        0,
+                sdr.sdr_get_sensor_metadata.side_effect = [
+                    sensor_metadata(
+                        "SP_P5V",
+                        "Amps",
+                        sensor_thresh(
+                            0,
+                            5.5,
+                            0,
+                            0,
+                            0,
+                            0,
+                        ),
                     ),
                 ]
                 expected_resp = {
@@ -198,28 +208,34 @@ class TestChassisService(AioHTTPTestCase):
             fru_name = self.get_fru_name(server_name)
             with self.subTest(server_name=server_name):
                 pal.pal_get_fru_sensor_list.side_effect = [[129], [70]]
-                sdr.sdr_get_sensor_units.side_effect = ["C", "RPM"]
-                sdr.sdr_get_sensor_name.side_effect = [
-                    "SP_INLET_TEMP",
-                    "SP_FAN0_TACH",
+                pal.sensor_read_fru.side_effect = [
+                    sensor_readings([24.9444444444]),
+                    sensor_readings([7177]),
                 ]
-                pal.sensor_read.side_effect = [24.9444444444, 7177]
-                sdr.sdr_get_sensor_thresh.side_effect = [
-                    sensor_thresh(
-                        0,
-                        40,
-                        0,
-                        0,
-                        0,
-                        0,
+                sdr.sdr_get_sensor_metadata.side_effect = [
+                    sensor_metadata(
+                        "SP_INLET_TEMP",
+                        "C",
+                        sensor_thresh(
+                            0,
+                            40,
+                            0,
+                            0,
+                            0,
+                            0,
+                        ),
                     ),
-                    sensor_thresh(
-                        0,
-                        70,
-                        0,
-                        0,
-                        0,
-                        0,
+                    sensor_metadata(
+                        "SP_FAN0_TACH",
+                        "RPM",
+                        sensor_thresh(
+                            0,
+                            70,
+                            0,
+                            0,
+                            0,
+                            0,
+                        ),
                     ),
                 ]
                 expected_resp = {
@@ -304,19 +320,21 @@ class TestChassisService(AioHTTPTestCase):
             fru_name = self.get_fru_name(server_name)
             with self.subTest(server_name=server_name):
                 pal.pal_get_fru_sensor_list.side_effect = [[224]]
-                sdr.sdr_get_sensor_units.side_effect = ["Amps"]
-                sdr.sdr_get_sensor_name.side_effect = ["SP_P5V"]
-                pal.sensor_read.side_effect = [
-                    0
+                pal.sensor_read_fru.side_effect = [
+                    sensor_readings([0])
                 ]  # placeholder to avoid running out of side_effect vals
-                sdr.sdr_get_sensor_thresh.side_effect = [
-                    sensor_thresh(
-                        0,
-                        5.5,
-                        0,
-                        0,
-                        0,
-                        0,
+                sdr.sdr_get_sensor_metadata.side_effect = [
+                    sensor_metadata(
+                        "SP_P5V",
+                        "Amps",
+                        sensor_thresh(
+                            0,
+                            5.5,
+                            0,
+                            0,
+                            0,
+                            0,
+                        ),
                     ),
                 ]
                 expected_resp = {
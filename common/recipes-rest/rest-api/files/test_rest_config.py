@@ -24,6 +24,9 @@ valid_config = [
             "ssl_ca_certificate": None,
             "max_requests": 0,
             "ratelimit_window": 60,
+            "max_client_requests": 0,
+            "max_global_requests": 0,
+            "sensor_snapshot_interval": 5,
         },
     ),
     (
@@ -45,6 +48,9 @@ valid_config = [
             "ssl_ca_certificate": None,
             "max_requests": 0,
             "ratelimit_window": 60,
+            "max_client_requests": 0,
+            "max_global_requests": 0,
+            "sensor_snapshot_interval": 5,
         },
     ),
     (
@@ -67,6 +73,9 @@ valid_config = [
             "ssl_ca_certificate": None,
             "max_requests": 0,
             "ratelimit_window": 60,
+            "max_client_requests": 0,
+            "max_global_requests": 0,
+            "sensor_snapshot_interval": 5,
         },
     ),
     (
@@ -95,6 +104,9 @@ valid_config = [
             "ssl_ca_certificate": None,
             "max_requests": 0,
             "ratelimit_window": 60,
+            "max_client_requests": 0,
+            "max_global_requests": 0,
+            "sensor_snapshot_interval": 5,
         },
     ),
     (
@@ -124,6 +136,9 @@ valid_config = [
             "ssl_ca_certificate": None,
             "max_requests": 0,
             "ratelimit_window": 60,
+            "max_client_requests": 0,
+            "max_global_requests": 0,
+            "sensor_snapshot_interval": 5,
         },
     ),
     (
@@ -153,6 +168,9 @@ valid_config = [
             "ssl_ca_certificate": None,
             "max_requests": 0,
             "ratelimit_window": 60,
+            "max_client_requests": 0,
+            "max_global_requests": 0,
+            "sensor_snapshot_interval": 5,
         },
     ),
     (
@@ -176,8 +194,46 @@ valid_config = [
             "ssl_ca_certificate": None,
             "max_requests": 0,
             "ratelimit_window": 60,
+            "max_client_requests": 0,
+            "max_global_requests": 0,
+            "sensor_snapshot_interval": 5,
         },
     ),
+    (
+        b"""
+        [ratelimiter]
+        max_requests = 10
+        window_seconds = 30
+        max_client_requests = 50
+        max_global_requests = 200
+        """,
+        {
+            "acl_provider": "acl_providers.cached_acl_provider.CachedAclProvider",
+            "acl_settings": {},
+            "ports": ["8080"],
+            "ssl_ports": [],
+            "logfile": "/tmp/rest.log",
+            "logformat": "default",
+            "loghandler": "file",
+            "writable": False,
+            "ssl_certificate": None,
+            "ssl_key": None,
+            "ssl_ca_certificate": None,
+            "max_requests": "10",
+            "ratelimit_window": "30",
+            "max_client_requests": "50",
+            "max_global_requests": "200",
+            "sensor_snapshot_interval": 5,
+        },
+    ),
+]
+
+sensor_snapshot_intervals = [
+    (b"snapshot_interval = 2.5", 2.5),
+    (b"snapshot_interval = 0", 5),
+    (b"snapshot_interval = -1", 5),
+    (b"snapshot_interval = nan", 5),
+    (b"snapshot_interval = often", 5),
 ]
 
 
@@ -197,6 +253,17 @@ class TestRestConfig(unittest.TestCase):
                 self.assertDictEqual(ret, expected)
                 os.unlink(f.name)
 
+    def test_sensor_snapshot_interval(self):
+        for cfg_line, expected in sensor_snapshot_intervals:
+            with self.subTest(cfg_line=cfg_line):
+                with tempfile.NamedTemporaryFile(
+                    prefix="rest_config", delete=False
+                ) as f:
+                    f.write(b"[sensors]\n" + cfg_line + b"\n")
+                self.addCleanup(os.unlink, f.name)
+                ret = sut.parse_config(f.name)
+                self.assertEqual(ret["sensor_snapshot_interval"], expected)
+
     def test_acl_provider_loader(self):
         loaded_provider = sut.load_acl_provider(
             {
@@ -40,6 +40,9 @@ class TestRestGpios(AioHTTPTestCase):
         sys.modules["rest_helper"].read_gpio_by_shadow = unittest.mock.Mock(
             wraps=lambda x: -1
         )
+        sys.modules["rest_helper"].read_gpios_by_shadow = unittest.mock.Mock(
+            wraps=lambda shadows: {shadow: -1 for shadow in shadows}
+        )
 
         self.patches = [
             unittest.mock.patch(
@@ -123,5 +126,21 @@ class TestRestGpios(AioHTTPTestCase):
             result = rest_gpios.get_gpios()
             self.assertEqual(result, {})
 
+    def test_read_wedge_back_ports(self):
+        with unittest.mock.patch(
+            "rest_gpios.read_gpios_by_shadow",
+            side_effect=lambda shadows: {s: i for i, s in enumerate(shadows)},
+        ) as read_gpios_by_shadow:
+            self.assertEqual(
+                rest_gpios.read_wedge_back_ports(),
+                {
+                    "port_1": {"pin_1": 0, "pin_2": 1, "pin_3": 2, "pin_4": 3},
+                    "port_2": {"pin_1": 4, "pin_2": 5},
+                },
+            )
+            read_gpios_by_shadow.assert_called_once_with(
+                ["RMON1_PF", "RMON1_RF", "RMON2_PF", "RMON2_RF", "RMON3_PF", "RMON3_RF"]
+            )
+
     async def get_application(self):
         return aiohttp.web.Application()
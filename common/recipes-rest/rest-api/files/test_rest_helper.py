@@ -0,0 +1,102 @@
+import os
+import sys
+import tempfile
+import types
+import unittest
+from unittest.mock import patch
+
+
+class GpioOperationFailure(Exception):
+    pass
+
+
+class FakeGPIO:
+    values = {}
+    opened = []
+    batch_calls = 0
+
+    def __init__(self, shadow=None, chip=None, name=None):
+        key = shadow if shadow is not None else name
+        if key not in self.values:
+            raise GpioOperationFailure(2)
+        self.key = key
+        self.desc = key
+        FakeGPIO.opened.append(key)
+
+    def close(self):
+        self.desc = None
+
+    def get_value(self):
+        if self.desc is None:
+            raise GpioOperationFailure(1)
+        value = self.values[self.key]
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    @staticmethod
+    def get_values(gpios):
+        FakeGPIO.batch_calls += 1
+        return [gpio.get_value() for gpio in gpios]
+
+
+class TestGPIOHandlePool(unittest.TestCase):
+    def setUp(self):
+        fake_libgpio = types.ModuleType("libgpio")
+        fake_libgpio.GPIO = FakeGPIO
+        fake_libgpio.GpioOperationFailure = GpioOperationFailure
+        patcher = patch.dict(sys.modules, {"libgpio": fake_libgpio})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Other tests may have left a mock rest_helper behind
+        sys.modules.pop("rest_helper", None)
+        import rest_helper
+
+        self.rest_helper = rest_helper
+        FakeGPIO.values = {"PRESENT": 1, "ABSENT": 0}
+        FakeGPIO.opened = []
+        FakeGPIO.batch_calls = 0
+        self.shadow_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.shadow_root.cleanup)
+        self.pool = rest_helper.GPIOHandlePool(self.shadow_root.name)
+        patcher = patch.object(rest_helper.GPIOHandlePool, "_instance", self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_handles_are_reused(self):
+        for _ in range(3):
+            self.assertEqual(self.rest_helper.read_gpio_by_shadow("PRESENT"), 1)
+        self.assertEqual(FakeGPIO.opened, ["PRESENT"])
+
+    def test_handles_are_reopened_when_shadows_change(self):
+        self.rest_helper.read_gpio_by_shadow("PRESENT")
+        st = os.stat(self.shadow_root.name)
+        os.utime(
+            self.shadow_root.name, ns=(st.st_atime_ns, st.st_mtime_ns + 1000000000)
+        )
+        self.rest_helper.read_gpio_by_shadow("PRESENT")
+        self.assertEqual(FakeGPIO.opened, ["PRESENT", "PRESENT"])
+
+    def test_failed_read_drops_handle(self):
+        self.rest_helper.read_gpio_by_shadow("PRESENT")
+        FakeGPIO.values["PRESENT"] = GpioOperationFailure(5)
+        self.assertIsNone(self.rest_helper.read_gpio_by_shadow("PRESENT"))
+        FakeGPIO.values["PRESENT"] = 1
+        self.assertEqual(self.rest_helper.read_gpio_by_shadow("PRESENT"), 1)
+        self.assertEqual(FakeGPIO.opened, ["PRESENT", "PRESENT"])
+
+    def test_read_gpios_by_shadow(self):
+        self.assertEqual(
+            self.rest_helper.read_gpios_by_shadow(["PRESENT", "ABSENT"]),
+            {"PRESENT": 1, "ABSENT": 0},
+        )
+        self.assertEqual(FakeGPIO.batch_calls, 1)
+
+    def test_read_gpios_by_shadow_with_failures(self):
+        FakeGPIO.values["BROKEN"] = GpioOperationFailure(5)
+        self.assertEqual(
+            self.rest_helper.read_gpios_by_shadow(["PRESENT", "MISSING", "BROKEN"]),
+            {"PRESENT": 1, "MISSING": None, "BROKEN": None},
+        )
+        self.assertNotIn(("shadow", "BROKEN"), self.pool.handles)
+        self.assertIn(("shadow", "PRESENT"), self.pool.handles)
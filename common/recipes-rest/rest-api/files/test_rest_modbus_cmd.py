@@ -1,4 +1,5 @@
 import asyncio
+import types
 import unittest
 
 import aiohttp.web
@@ -160,29 +161,6 @@ class TestRestModbusCmd(AioHTTPTestCase):
                 ),
             )
 
-    def test_raw_modbus_command_get_response_timeout(self):
-        with unittest.mock.patch("socket.socket", autospec=True) as p:
-            client = p.return_value
-
-            cmd = rest_modbus_cmd.raw_modbus_command(
-                data=[1, 2, 3], expected_response_length=456, custom_timeout=789
-            )
-
-            client.recv.return_value = b"\xf1\xf0"
-
-            resp = cmd._get_response()
-
-            self.assertEqual(resp, [0xF1, 0xF0])
-
-            # Check if timeout was set as expected
-            client.settimeout.assert_called_once_with(
-                (
-                    rest_modbus_cmd.raw_modbus_command.RACKMOND_MIN_SOCKET_TIMEOUT_MS
-                    + 789
-                )
-                / 1000
-            )
-
     async def get_application(self):
         webapp = aiohttp.web.Application()
         webapp.router.add_post("/api/sys/modbus/cmd", rest_modbus_cmd.post_modbus_cmd)
@@ -234,6 +212,134 @@ EXAMPLE_INVALID_PAYLOADS = [
 ]
 
 
+class TestRawModbusCommand(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        self.client = MockRackmondClient()
+        rackmond_client = types.SimpleNamespace(
+            RackmondError=MockRackmondError,
+            RackmondClient=unittest.mock.MagicMock(),
+        )
+        rackmond_client.RackmondClient.instance.return_value = self.client
+        self.patches = [
+            unittest.mock.patch.object(
+                rest_modbus_cmd, "rackmond_client", rackmond_client, create=True
+            ),
+            unittest.mock.patch.object(
+                rest_modbus_cmd, "RACKMOND_CLIENT_AVAILABLE", True
+            ),
+        ]
+
+        for p in self.patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_raw_modbus_command_get_response_timeout(self):
+        self.client.reply = b"\xf1\xf0"
+        cmd = rest_modbus_cmd.raw_modbus_command(
+            data=[1, 2, 3], expected_response_length=456, custom_timeout=789
+        )
+
+        resp = self.loop.run_until_complete(cmd.get_response())
+
+        self.assertEqual(resp, [0xF1, 0xF0])
+        # Check if the response length and timeout were passed to rackmond
+        self.assertEqual(self.client.calls, [(b"\x01\x02\x03", 456, 789)])
+
+    def test_raw_modbus_command_get_response_unavailable(self):
+        self.client.error = MockRackmondError("cannot connect")
+        cmd = rest_modbus_cmd.raw_modbus_command(data=[1, 2])
+        with self.assertRaises(aiohttp.web.HTTPServiceUnavailable):
+            self.loop.run_until_complete(cmd.get_response())
+
+    def test_raw_modbus_command_get_response_not_installed(self):
+        cmd = rest_modbus_cmd.raw_modbus_command(data=[1, 2])
+        with unittest.mock.patch.object(
+            rest_modbus_cmd, "RACKMOND_CLIENT_AVAILABLE", False
+        ):
+            with self.assertRaises(aiohttp.web.HTTPServiceUnavailable):
+                self.loop.run_until_complete(cmd.get_response())
+        self.assertEqual(self.client.calls, [])
+
+
+class TestRestModbusCmdRackmond(AioHTTPTestCase):
+    def setUp(self):
+        super().setUp()
+        self.rackmond = MockRackmondClient()
+        rackmond_client = types.SimpleNamespace(
+            RackmondError=MockRackmondError,
+            RackmondClient=unittest.mock.MagicMock(),
+        )
+        rackmond_client.RackmondClient.instance.return_value = self.rackmond
+        self.patches = [
+            unittest.mock.patch.object(
+                rest_modbus_cmd, "rackmond_client", rackmond_client, create=True
+            ),
+            unittest.mock.patch.object(
+                rest_modbus_cmd, "RACKMOND_CLIENT_AVAILABLE", True
+            ),
+            unittest.mock.patch(
+                "rest_modbus_cmd.SolitonBeamFlock",
+                new_callable=unittest.mock.MagicMock,  # python < 3.8 compat
+                return_value=MockAsyncContextManager(),
+            ),
+        ]
+
+        for p in self.patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    @unittest_run_loop
+    async def test_post_modbus_cmd_200(self):
+        req = await self.client.request(
+            "POST", "/api/sys/modbus/cmd", json=EXAMPLE_PAYLOAD
+        )
+        resp = await req.json()
+
+        self.assertEqual(req.status, 200)
+        self.assertEqual(resp, {"status": "OK", "responses": [EXAMPLE_MODBUS_RESPONSE]})
+        self.assertEqual(
+            self.rackmond.calls, [(bytes(EXAMPLE_PAYLOAD["commands"][0]), 0, 2)]
+        )
+
+    @unittest_run_loop
+    async def test_post_modbus_cmd_503(self):
+        self.rackmond.error = MockRackmondError("cannot connect")
+        req = await self.client.request(
+            "POST", "/api/sys/modbus/cmd", json=EXAMPLE_PAYLOAD
+        )
+        resp = await req.json()
+
+        self.assertEqual(req.status, 503)
+        self.assertEqual(
+            resp, {"status": "Service Unavailable", "details": "cannot connect"}
+        )
+        self.assertTrue(rest_modbus_cmd.SolitonBeamFlock.return_value.exited)
+
+    async def get_application(self):
+        webapp = aiohttp.web.Application()
+        webapp.router.add_post("/api/sys/modbus/cmd", rest_modbus_cmd.post_modbus_cmd)
+        return webapp
+
+
+class MockRackmondError(Exception):
+    pass
+
+
+class MockRackmondClient:
+    def __init__(self):
+        self.calls = []
+        self.reply = bytes(EXAMPLE_MODBUS_RESPONSE)
+        self.error = None
+
+    async def raw_modbus(self, data, expected=0, timeout=0):
+        self.calls.append((data, expected, timeout))
+        if self.error is not None:
+            raise self.error
+        return self.reply
+
+
 class MockAsyncContextManager:
     def __init__(self):
         self.entered = False
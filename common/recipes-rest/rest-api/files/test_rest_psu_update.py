@@ -0,0 +1,92 @@
+import hashlib
+import os
+import pathlib
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import rest_psu_update
+from aiohttp import web
+
+
+FIRMWARE = bytes(range(256)) * 40
+
+
+class TestPsuUpdate(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.tmpdir = tmpdir.name
+        self.jobdir = os.path.join(self.tmpdir, "jobs")
+        fwpath = os.path.join(self.tmpdir, "fw.bin")
+        with open(fwpath, "wb") as f:
+            f.write(FIRMWARE)
+        self.fw_url = pathlib.Path(fwpath).as_uri()
+        for name, value in (
+            ("UPDATE_JOB_DIR", self.jobdir),
+            ("FW_CHUNK_SIZE", 1000),
+            ("PROGRESS_INTERVAL", 4000),
+            ("updater_process", None),
+        ):
+            patcher = patch.object(rest_psu_update, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = patch.object(rest_psu_update, "Popen")
+        self.popen = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.popen.return_value = MagicMock(pid=1234)
+
+    def test_fetch_firmware(self):
+        downloadpath = os.path.join(self.tmpdir, "job.download")
+        with open(os.path.join(self.tmpdir, "out.bin"), "wb") as fwfile:
+            with patch.object(
+                rest_psu_update, "write_json", wraps=rest_psu_update.write_json
+            ) as write_json:
+                progress = rest_psu_update.fetch_firmware(
+                    self.fw_url, fwfile, downloadpath
+                )
+        with open(os.path.join(self.tmpdir, "out.bin"), "rb") as f:
+            self.assertEqual(f.read(), FIRMWARE)
+        self.assertEqual(
+            progress,
+            {
+                "bytes": len(FIRMWARE),
+                "total": len(FIRMWARE),
+                "sha256": hashlib.sha256(FIRMWARE).hexdigest(),
+            },
+        )
+        # start, every PROGRESS_INTERVAL bytes and once done
+        self.assertEqual(write_json.call_count, 1 + 2 + 1)
+
+    def test_begin_job(self):
+        result = rest_psu_update.begin_job(
+            {
+                "fw_url": self.fw_url,
+                "address": 0xA4,
+                "sha256": hashlib.sha256(FIRMWARE).hexdigest(),
+            }
+        )
+        self.assertEqual(result["pid"], 1234)
+        args = self.popen.call_args[0][0]
+        with open(args[-1], "rb") as f:
+            self.assertEqual(f.read(), FIRMWARE)
+        os.remove(args[-1])
+        (job,) = rest_psu_update.get_jobs()["jobs"]
+        self.assertEqual(job["job_id"], result["job_id"])
+        self.assertEqual(job["state"], "starting")
+        self.assertEqual(job["download"]["bytes"], len(FIRMWARE))
+
+    def test_size_cap(self):
+        with patch.object(rest_psu_update, "FW_MAX_SIZE", len(FIRMWARE) - 1):
+            with self.assertRaises(web.HTTPRequestEntityTooLarge):
+                rest_psu_update.begin_job({"fw_url": self.fw_url, "address": 0xA4})
+        self.assertEqual(os.listdir(self.jobdir), [])
+        self.popen.assert_not_called()
+
+    def test_checksum_mismatch(self):
+        with self.assertRaises(web.HTTPBadRequest):
+            rest_psu_update.begin_job(
+                {"fw_url": self.fw_url, "address": 0xA4, "sha256": "00" * 32}
+            )
+        self.assertEqual(os.listdir(self.jobdir), [])
+        self.popen.assert_not_called()
@@ -0,0 +1,103 @@
+import asyncio
+import unittest
+
+import sensor_snapshot
+from aiohttp import web
+from aiohttp.test_utils import AioHTTPTestCase, unittest_run_loop
+
+
+class TestSensorSnapshots(AioHTTPTestCase):
+    def setUp(self):
+        super().setUp()
+        self.calls = 0
+        self.snapshots = sensor_snapshot.SensorSnapshots(interval=60)
+        patcher = unittest.mock.patch.object(
+            sensor_snapshot.SensorSnapshots, "_instance", self.snapshots
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        if self.snapshots._poller is not None:
+            self.snapshots._poller.cancel()
+        super().tearDown()
+
+    async def slow_read(self, fru):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return {"fru": fru, "calls": self.calls}
+
+    def blocking_read(self):
+        self.calls += 1
+        return {"calls": self.calls}
+
+    async def sensors_handler(self, request):
+        result = await sensor_snapshot.get_sensor_snapshot(
+            request, self.blocking_read
+        )
+        return web.json_response(result)
+
+    async def get_application(self):
+        webapp = web.Application()
+        webapp.router.add_get("/api/sys/sensors", self.sensors_handler)
+        return webapp
+
+    @unittest_run_loop
+    async def test_concurrent_reads_are_coalesced(self):
+        results = await asyncio.gather(
+            *[self.snapshots.get(self.slow_read, "mb") for _ in range(10)]
+        )
+        self.assertEqual(self.calls, 1)
+        for result in results:
+            self.assertEqual(result, {"fru": "mb", "calls": 1})
+
+    @unittest_run_loop
+    async def test_reads_are_served_from_snapshot(self):
+        await self.snapshots.get(self.slow_read, "mb")
+        result = await self.snapshots.get(self.slow_read, "mb")
+        self.assertEqual(result, {"fru": "mb", "calls": 1})
+        self.assertEqual(self.calls, 1)
+
+    @unittest_run_loop
+    async def test_arguments_get_separate_snapshots(self):
+        await self.snapshots.get(self.slow_read, "mb")
+        result = await self.snapshots.get(self.slow_read, "nic")
+        self.assertEqual(result, {"fru": "nic", "calls": 2})
+
+    @unittest_run_loop
+    async def test_max_age_zero_forces_read(self):
+        await self.snapshots.get(self.slow_read, "mb")
+        result = await self.snapshots.get(self.slow_read, "mb", max_age=0)
+        self.assertEqual(result, {"fru": "mb", "calls": 2})
+
+    @unittest_run_loop
+    async def test_invalidate(self):
+        await self.snapshots.get(self.slow_read, "mb")
+        self.snapshots.invalidate(self.slow_read)
+        result = await self.snapshots.get(self.slow_read, "mb")
+        self.assertEqual(result, {"fru": "mb", "calls": 2})
+
+    @unittest_run_loop
+    async def test_poller_refreshes_snapshot(self):
+        self.snapshots.interval = 0.01
+        await self.snapshots.get(self.slow_read, "mb")
+        await asyncio.sleep(0.2)
+        self.assertGreater(self.calls, 1)
+
+    @unittest_run_loop
+    async def test_handler_uses_snapshot(self):
+        for _ in range(3):
+            resp = await self.client.request("GET", "/api/sys/sensors")
+            self.assertEqual(resp.status, 200)
+            self.assertEqual(await resp.json(), {"calls": 1})
+        resp = await self.client.request("GET", "/api/sys/sensors?max_age=0")
+        self.assertEqual(await resp.json(), {"calls": 2})
+
+    @unittest_run_loop
+    async def test_handler_rejects_invalid_max_age(self):
+        for max_age in ["-1", "soon"]:
+            resp = await self.client.request(
+                "GET", "/api/sys/sensors?max_age=" + max_age
+            )
+            self.assertEqual(resp.status, 400)
+        self.assertEqual(self.calls, 0)
@@ -95,6 +95,34 @@ class AT93CX6SPI(VerboseLogger):
         result = self.__bitstring_to_bytes(binary)
         return result
 
+    def __spi_bb(self, write_data, write_bits, read_bits):
+        """
+        Run one chip select cycle with the bitbang driver and return the
+        bits read, which include the ones clocked out while writing.
+        """
+        cmd = [
+            self.SPI_CMD,
+            "-s",
+            str(self.gpio_cs),
+            "-c",
+            str(self.gpio_ck),
+            "-o",
+            str(self.gpio_do),
+            "-i",
+            str(self.gpio_di),
+            "-b",
+        ]
+        if read_bits > 0:
+            cmd += ["-r", str(read_bits)]
+        cmd += ["-w", str(write_bits)]
+
+        self._verbose_print("Command: {}".format(" ".join(cmd)))
+
+        out, err = subprocess.Popen(
+            cmd, stdout=subprocess.PIPE, stdin=subprocess.PIPE
+        ).communicate(input=write_data)
+        return out
+
     def __io(self, op, addr, data=None):
         """
         Perform an IO operation against the EEPROM
@@ -126,26 +154,7 @@ class AT93CX6SPI(VerboseLogger):
 
         self._verbose_print("Write data", write_data)
 
-        # Run the command with the bitbang driver
-        if read_bits > 0:
-            data_portion = "-r {} -w {}".format(read_bits, write_bits)
-        else:
-            data_portion = "-w {}".format(write_bits)
-
-        cmd = "{} -s {} -c {} -o {} -i {} -b {}".format(
-            self.SPI_CMD,
-            self.gpio_cs,
-            self.gpio_ck,
-            self.gpio_do,
-            self.gpio_di,
-            data_portion,
-        )
-
-        self._verbose_print("Command: {}".format(cmd))
-
-        out, err = subprocess.Popen(
-            cmd.split(), stdout=subprocess.PIPE, stdin=subprocess.PIPE
-        ).communicate(input=write_data)
+        out = self.__spi_bb(write_data, write_bits, read_bits)
 
         # Format the response
         read_data = self.__shift(out, self.addr_bits + 4)
@@ -161,6 +170,32 @@ class AT93CX6SPI(VerboseLogger):
     def read(self, addr):
         return self.__io(0x2, addr)
 
+    def read_sequential(self, addr, count):
+        """
+        Read count consecutive words starting at addr in one READ. The chip
+        keeps shifting out the following words as long as the clock runs,
+        and only the first word is preceded by the dummy bit.
+        """
+        if count == 1:
+            return [self.read(addr)]
+
+        write_bits = self.addr_bits + 3
+        read_bits = self.addr_bits + 4 + self.bus_width * count
+        instruction = (addr & self.addr_mask) | (0x6 << self.addr_bits)
+        write_data = self.__shift(struct.pack(">H", instruction), 16 - write_bits)
+
+        self._verbose_print("Write data", write_data)
+
+        out = self.__spi_bb(write_data, write_bits, read_bits)
+        if self.bus_width == 16:
+            unpack_instruction = ">{}H".format(count)
+        else:
+            unpack_instruction = ">{}B".format(count)
+        read_data = self.__shift(out, self.addr_bits + 4)
+        read_data = read_data[: struct.calcsize(unpack_instruction)]
+        self._verbose_print("Read data", read_data)
+        return list(struct.unpack(unpack_instruction, read_data))
+
     def ewen(self):
         self.__io(0x0, 0x3 << (self.addr_bits - 2))
 
@@ -183,8 +218,15 @@ class AT93CX6SPI(VerboseLogger):
 class AT93CX6(VerboseLogger):
     """
     The class which handles accessing memory on the AT93CX6 chip.
+
+    read(), write() and erase() take an optional progress callback, which is
+    called as progress(done, total) with the number of bytes processed so far.
     """
 
+    # Words read per READ instruction, so that progress can be reported
+    # while reading large chips.
+    READ_CHUNK_WORDS = 64
+
     def __init__(
         self,
         bus_width,
@@ -234,7 +276,7 @@ class AT93CX6(VerboseLogger):
     def get_memory_size(self):
         return self.memory_size
 
-    def erase(self, offset=None, limit=None):
+    def erase(self, offset=None, limit=None, progress=None):
         """
         Erase the chip.
         """
@@ -255,6 +297,8 @@ class AT93CX6(VerboseLogger):
             self.spi.ewen()
             self.spi.eral()
             self.spi.ewds()
+            if progress is not None:
+                progress(limit, limit)
 
             self._verbose_print("Erased entire chip")
         else:
@@ -267,13 +311,17 @@ class AT93CX6(VerboseLogger):
                 real_limit = limit
 
             self.spi.ewen()
-            for addr in range(real_offset, real_offset + real_limit):
-                self.spi.erase(addr)
-            self.spi.ewds()
+            try:
+                for addr in range(real_offset, real_offset + real_limit):
+                    self.spi.erase(addr)
+                    if progress is not None:
+                        progress((addr - real_offset + 1) * limit // real_limit, limit)
+            finally:
+                self.spi.ewds()
 
             self._verbose_print("Erased {} bytes from offset {}".format(limit, offset))
 
-    def read(self, offset=None, limit=None):
+    def read(self, offset=None, limit=None, progress=None):
         """
         Read the chip into a memory buffer.
         """
@@ -289,19 +337,25 @@ class AT93CX6(VerboseLogger):
                 "Read can't start or end on odd boundary in 16-bit " "mode!"
             )
 
-        output = b""
         if self.bus_width == 16:
             real_offset = int(offset / 2)
             real_limit = int(limit / 2)
             pack_instruction = "=H"
         else:
             real_offset = offset
-            real_offset
+            real_limit = limit
             pack_instruction = "=B"
-
-        for addr in range(real_offset, real_offset + real_limit):
-            value_at_position = self.__swap(self.spi.read(addr))
-            output = output + struct.pack(pack_instruction, value_at_position)
+        word_size = struct.calcsize(pack_instruction)
+
+        output = bytearray(limit)
+        pos = 0
+        for addr in range(real_offset, real_offset + real_limit, self.READ_CHUNK_WORDS):
+            count = min(self.READ_CHUNK_WORDS, real_offset + real_limit - addr)
+            for value in self.spi.read_sequential(addr, count):
+                struct.pack_into(pack_instruction, output, pos, self.__swap(value))
+                pos += word_size
+            if progress is not None:
+                progress(pos, limit)
 
         self._verbose_print(
             "Read {} bytes from offset {}".format(limit, offset), output
@@ -309,9 +363,11 @@ class AT93CX6(VerboseLogger):
 
         return output
 
-    def write(self, data, offset=None):
+    def write(self, data, offset=None, progress=None):
         """
-        Write a memory buffer to the chip.
+        Write a memory buffer to the chip. Words which already hold the
+        requested value are left alone, and words to be set to all ones are
+        only erased.
         """
         if offset is None:
             offset = 0
@@ -328,24 +384,31 @@ class AT93CX6(VerboseLogger):
         if self.bus_width == 16:
             offset_divisor = 2
             pack_instruction = "=H"
+            erased = 0xFFFF
         else:
             offset_divisor = 1
             pack_instruction = "=B"
+            erased = 0xFF
 
+        current = self.read(offset, len(data))
+        written = 0
         self.spi.ewen()
-        for addr in range(offset, offset + len(data), offset_divisor):
-            actual_addr = int(addr / offset_divisor)
-            value = self.__swap(
-                struct.unpack(
-                    pack_instruction,
-                    data[(addr - offset) : (addr - offset) + offset_divisor],
-                )[0]
-            )
-
-            self.spi.erase(actual_addr)
-            self.spi.write(actual_addr, value)
-        self.spi.ewds()
+        try:
+            for pos in range(0, len(data), offset_divisor):
+                word = data[pos : pos + offset_divisor]
+                if word != current[pos : pos + offset_divisor]:
+                    actual_addr = int((offset + pos) / offset_divisor)
+                    value = self.__swap(struct.unpack(pack_instruction, word)[0])
+                    self.spi.erase(actual_addr)
+                    if value != erased:
+                        self.spi.write(actual_addr, value)
+                    written += offset_divisor
+                if progress is not None:
+                    progress(pos + offset_divisor, len(data))
+        finally:
+            self.spi.ewds()
 
         self._verbose_print(
-            "Wrote {} bytes from offset {}".format(len(data), offset), data
+            "Wrote {} of {} bytes from offset {}".format(written, len(data), offset),
+            data,
         )
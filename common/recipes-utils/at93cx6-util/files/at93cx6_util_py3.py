@@ -144,6 +144,28 @@ def bus_width_parser(ap):
     )
 
 
+def progress_parser(ap):
+    ap.add_argument(
+        "--progress",
+        default=False,
+        action="store_true",
+        help="Report progress on stderr (default: %(default)s)",
+    )
+
+
+def get_progress(args):
+    if not args.progress:
+        return None
+
+    def progress(done, total):
+        sys.stderr.write("\r{}/{} bytes".format(done, total))
+        if done == total:
+            sys.stderr.write("\n")
+        sys.stderr.flush()
+
+    return progress
+
+
 def read_raw(args):
     raw = get_raw(args)
     val = raw.read(args.address)
@@ -202,7 +224,7 @@ def raw_subparser(subparsers):
 
 def read_chip(args):
     chip = get_chip(args)
-    data = chip.read(args.start, args.length)
+    data = chip.read(args.start, args.length, progress=get_progress(args))
 
     if args.file is None:
         sys.stdout.buffer.write(data)
@@ -216,7 +238,7 @@ def write_chip(args):
 
     # Either way, limit reads to the size of the chip
     if args.file is None:
-        data = sys.stdin.read(chip.get_memory_size())
+        data = sys.stdin.buffer.read(chip.get_memory_size())
     else:
         with open(args.file, "rb") as fp:
             data = fp.read(chip.get_memory_size())
@@ -224,16 +246,16 @@ def write_chip(args):
     if args.length is not None:
         # Make sure length is correct
         if len(data) < args.length:
-            data = data + "\x00" * (args.length - len(data))
+            data = data + b"\x00" * (args.length - len(data))
         if len(data) > args.length:
             data = data[: args.length]
 
-    chip.write(data, args.start)
+    chip.write(data, args.start, progress=get_progress(args))
 
 
 def erase_chip(args):
     chip = get_chip(args)
-    chip.erase(args.start, args.length)
+    chip.erase(args.start, args.length, progress=get_progress(args))
 
 
 def chip_subparser(subparsers):
@@ -258,6 +280,7 @@ def chip_subparser(subparsers):
         action="store_true",
         help="Byte swap values for 16-bit reads/writes " "(default: %(default)s)",
     )
+    progress_parser(read_parser)
     read_parser.set_defaults(func=read_chip)
 
     write_parser = chip_sub.add_parser("write", help="Write to the chip")
@@ -278,6 +301,7 @@ def chip_subparser(subparsers):
         action="store_true",
         help="Byte swap values for 16-bit reads/writes " "(default: %(default)s)",
     )
+    progress_parser(write_parser)
     write_parser.set_defaults(func=write_chip)
 
     erase_parser = chip_sub.add_parser("erase", help="Erase the chip")
@@ -289,6 +313,7 @@ def chip_subparser(subparsers):
         type=int,
         help="The number of bytes to erase " "(default: whole chip)",
     )
+    progress_parser(erase_parser)
     erase_parser.set_defaults(func=erase_chip)
 
 
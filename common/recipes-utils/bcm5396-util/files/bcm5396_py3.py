@@ -17,10 +17,159 @@
 # Boston, MA 02110-1301 USA
 #
 
+import os
 import subprocess
 import time
 
 
+class SysfsGpio:
+    """A GPIO exported through /sys/class/gpio, with its value file kept open"""
+
+    def __init__(self, gpio):
+        self.gpio = gpio
+        self.path = "/sys/class/gpio/gpio%d" % gpio
+        self.fd = os.open(self.path + "/value", os.O_RDWR)
+        self.direction = None
+
+    def close(self):
+        os.close(self.fd)
+
+    def set_direction(self, direction):
+        if self.direction == direction:
+            return
+        with open(self.path + "/direction", "w") as f:
+            f.write(direction)
+        self.direction = direction
+
+    def read(self):
+        return 1 if os.pread(self.fd, 1, 0) == b"1" else 0
+
+    def write(self, value):
+        os.pwrite(self.fd, b"1" if value else b"0", 0)
+
+
+class BitBang:
+    """
+    In-process version of bitbang_io() from the bitbang package, with its
+    defaults: the clock starts high, data is driven before the falling edge
+    and sampled before the rising edge, MSB first. The GPIO sysfs writes take
+    longer than the 500ns half clock mdio-bb and spi-bb use, so there is no
+    need to sleep between edges.
+    """
+
+    def __init__(self, clk, data_out, data_in):
+        self.clk = clk
+        self.data_out = data_out
+        self.data_in = data_in
+
+    def io(self, out_value, out_bits, in_bits):
+        clk = self.clk
+        clk.write(1)
+        in_value = 0
+        for pos in range(max(out_bits, in_bits)):
+            if pos < out_bits:
+                self.data_out.write((out_value >> (out_bits - 1 - pos)) & 0x1)
+            clk.write(0)
+            if pos < in_bits:
+                in_value = (in_value << 1) | self.data_in.read()
+            clk.write(1)
+        return in_value
+
+
+class MdioBitBang:
+    """Clause 22 MDIO frames, as mdio-bb sends them with '-p'"""
+
+    PREAMBLE = 0xFFFFFFFF
+    START_OF_FRAME = 0x1
+    OP_READ = 0x2
+    OP_WRITE = 0x1
+    TURNAROUND = 0x2
+
+    def __init__(self, mdc, mdio):
+        self.mdc = SysfsGpio(mdc)
+        try:
+            self.mdio = SysfsGpio(mdio)
+        except OSError:
+            self.mdc.close()
+            raise
+        self.mdc.set_direction("out")
+        self.bus = BitBang(self.mdc, self.mdio, self.mdio)
+
+    def __header(self, op, phy, reg):
+        # 32b preamble, 2b START, 2b OPER CODE, 5b PHY ADDR, 5b register addr
+        header = (self.PREAMBLE << 2) | self.START_OF_FRAME
+        header = (header << 2) | op
+        header = (header << 5) | (phy & 0x1F)
+        return (header << 5) | (reg & 0x1F)
+
+    def read(self, phy, reg):
+        self.mdio.set_direction("out")
+        self.bus.io(self.__header(self.OP_READ, phy, reg), 46, 0)
+        # the phy drives TA and the 16 data bits
+        self.mdio.set_direction("in")
+        return self.bus.io(0, 0, 18) & 0xFFFF
+
+    def write(self, phy, reg, val):
+        self.mdio.set_direction("out")
+        frame = (self.__header(self.OP_WRITE, phy, reg) << 2) | self.TURNAROUND
+        frame = (frame << 16) | (val & 0xFFFF)
+        self.bus.io(frame, 64, 0)
+        return val
+
+    def run(self, phy, ops):
+        """
+        Run a list of ("read", reg) and ("write", reg, val) operations back
+        to back and return the values read, in order.
+        """
+        result = []
+        for op in ops:
+            if op[0] == "write":
+                self.write(phy, op[1], op[2])
+            else:
+                result.append(self.read(phy, op[1]))
+        return result
+
+
+class SpiBitBang:
+    """SPI transfers with an active low chip select, as spi-bb -S low does"""
+
+    def __init__(self, cs, clk, mosi, miso):
+        self.gpios = []
+        try:
+            for gpio, direction in [
+                (cs, "out"),
+                (clk, "out"),
+                (mosi, "out"),
+                (miso, "in"),
+            ]:
+                self.gpios.append(SysfsGpio(gpio))
+                self.gpios[-1].set_direction(direction)
+        except OSError:
+            for gpio in self.gpios:
+                gpio.close()
+            raise
+        self.cs = self.gpios[0]
+        self.bus = BitBang(*self.gpios[1:])
+
+    def io(self, bytes_to_write, to_read=0):
+        """
+        Write bytes_to_write, then read to_read more bytes in the same chip
+        select cycle. Returns the bytes read, first byte first.
+        """
+        out_value = 0
+        for byte in bytes_to_write:
+            out_value = (out_value << 8) | (byte & 0xFF)
+        out_bits = len(bytes_to_write) * 8
+        in_bits = to_read * 8
+        self.cs.write(0)
+        try:
+            # like spi-bb, keep clocking after the write to read the reply
+            in_value = self.bus.io(out_value, out_bits, out_bits + in_bits)
+        finally:
+            self.cs.write(1)
+        return [(in_value >> (8 * i)) & 0xFF for i in range(to_read - 1, -1, -1)]
+
+
 class Bcm5396MDIO:
     """The class to access BCM5396 through MDIO intf"""
 
@@ -36,10 +185,29 @@ class Bcm5396MDIO:
     DATA2_REG = 26
     DATA3_REG = 27
 
-    def __init__(self, mdc, mdio):
+    def __init__(self, mdc, mdio, native=True):
         self.mdc = mdc
         self.mdio = mdio
         self.page = -1
+        # Bit-bang in process if the GPIOs are exported, fork mdio-bb for
+        # every access otherwise.
+        self.native = None
+        if native:
+            try:
+                self.native = MdioBitBang(mdc, mdio)
+            except OSError:
+                pass
+
+    def __run(self, ops):
+        if self.native is not None:
+            return self.native.run(self.PHYADDR, ops)
+        result = []
+        for op in ops:
+            if op[0] == "write":
+                self.__io("write", op[1], op[2])
+            else:
+                result.append(self.__io("read", op[1]))
+        return result
 
     def __io(self, op, reg, val=0):
         cmd = "%s -p -c %s -d %s %s %s %s" % (
@@ -68,71 +236,73 @@ class Bcm5396MDIO:
         return rc
 
     def __read_mdio(self, reg):
-        return self.__io("read", reg)
-
-    def __write_mdio(self, reg, val):
-        return self.__io("write", reg, val)
+        return self.__run([("read", reg)])[0]
 
     def __set_page(self, page):
         if self.page == page:
-            return
+            return []
+        self.page = page
         # Write MII register ACCESS_CTRL_REG:
         # set bit 0 as "1" to enable MDIO access
         # set "page number to bit 15:8
         val = 0x1 | ((page & 0xFF) << 8)
-        self.__write_mdio(self.ACCESS_CTRL_REG, val)
-        self.page = page
+        return [("write", self.ACCESS_CTRL_REG, val)]
 
-    def __wait_for_done(self):
+    def __wait_for_done(self, busy):
         # Read MII register IO_CTRL_REG:
         # Check op_code = "00"
-        while self.__read_mdio(self.IO_CTRL_REG) & 0x3:
+        while busy & 0x3:
             time.sleep(0.010)  # 10ms
+            busy = self.__read_mdio(self.IO_CTRL_REG)
 
     def read(self, page, reg, n_bytes):
-        self.__set_page(page)
+        ops = self.__set_page(page)
         # Write MII register IO_CTRL_REG:
         # set "Operation Code as "00"
         # set "Register Address" to bit 15:8
-        val = 0x00 | ((reg & 0xFF) << 8)
-        self.__write_mdio(self.IO_CTRL_REG, val)
+        ops.append(("write", self.IO_CTRL_REG, 0x00 | ((reg & 0xFF) << 8)))
         # Write MII register IO_CTRL_REG:
         # set "Operation Code as "10"
         # set "Register Address" to bit 15:8
-        val = 0x2 | ((reg & 0xFF) << 8)
-        self.__write_mdio(self.IO_CTRL_REG, val)
-        self.__wait_for_done()
-        # Read MII register DATA0_REG for bit 15:0
-        val = int(self.__read_mdio(self.DATA0_REG))
-        # Read MII register DATA1_REG for bit 31:16
-        val |= self.__read_mdio(self.DATA1_REG) << 16
-        # Read MII register DATA2_REG for bit 47:32
-        val |= self.__read_mdio(self.DATA2_REG) << 32
-        # Read MII register DATA3_REG for bit 63:48
-        val |= self.__read_mdio(self.DATA3_REG) << 48
+        ops.append(("write", self.IO_CTRL_REG, 0x2 | ((reg & 0xFF) << 8)))
+        ops.append(("read", self.IO_CTRL_REG))
+        (busy,) = self.__run(ops)
+        self.__wait_for_done(busy)
+        # Read MII registers DATA0_REG to DATA3_REG for bit 15:0 to 63:48
+        data = self.__run(
+            [
+                ("read", self.DATA0_REG),
+                ("read", self.DATA1_REG),
+                ("read", self.DATA2_REG),
+                ("read", self.DATA3_REG),
+            ]
+        )
+        val = 0
+        for i, word in enumerate(data):
+            val |= word << (16 * i)
         return val
 
     def write(self, page, reg, val, n_bytes):
-        self.__set_page(page)
+        ops = self.__set_page(page)
         # Write MII register DATA0_REG for bit 15:0
-        self.__write_mdio(self.DATA0_REG, val & 0xFFFF)
+        ops.append(("write", self.DATA0_REG, val & 0xFFFF))
         # Write MII register DATA1_REG for bit 31:16
-        self.__write_mdio(self.DATA1_REG, (val >> 16) & 0xFFFF)
+        ops.append(("write", self.DATA1_REG, (val >> 16) & 0xFFFF))
         # Write MII register DATA2_REG for bit 47:32
-        self.__write_mdio(self.DATA2_REG, (val >> 32) & 0xFFFF)
+        ops.append(("write", self.DATA2_REG, (val >> 32) & 0xFFFF))
         # Write MII register DATA3_REG for bit 63:48
-        self.__write_mdio(self.DATA3_REG, (val >> 48) & 0xFFFF)
+        ops.append(("write", self.DATA3_REG, (val >> 48) & 0xFFFF))
         # Write MII register IO_CTRL_REG:
         # set "Operation Code as "00"
         # set "Register Address" to bit 15:8
-        val = 0x00 | ((reg & 0xFF) << 8)
-        self.__write_mdio(self.IO_CTRL_REG, val)
+        ops.append(("write", self.IO_CTRL_REG, 0x00 | ((reg & 0xFF) << 8)))
         # Write MII register IO_CTRL_REG:
         # set "Operation Code as "01"
         # set "Register Address" to bit 15:8
-        val = 0x1 | ((reg & 0xFF) << 8)
-        self.__write_mdio(self.IO_CTRL_REG, val)
-        self.__wait_for_done()
+        ops.append(("write", self.IO_CTRL_REG, 0x1 | ((reg & 0xFF) << 8)))
+        ops.append(("read", self.IO_CTRL_REG))
+        (busy,) = self.__run(ops)
+        self.__wait_for_done(busy)
 
 
 class Bcm5396SPI:
@@ -149,12 +319,20 @@ class Bcm5396SPI:
     SPI_STS_REG_SPIF = 0x1 << 7
     PAGE_REG = 0xFF
 
-    def __init__(self, cs, clk, mosi, miso):
+    def __init__(self, cs, clk, mosi, miso, native=True):
         self.cs = cs
         self.clk = clk
         self.mosi = mosi
         self.miso = miso
         self.page = -1
+        # Bit-bang in process if the GPIOs are exported, fork spi-bb for
+        # every access otherwise.
+        self.native = None
+        if native:
+            try:
+                self.native = SpiBitBang(cs, clk, mosi, miso)
+            except OSError:
+                pass
 
     def __bytes2val(self, values):
         # LSB first, MSB last
@@ -179,6 +357,8 @@ class Bcm5396SPI:
         return result
 
     def __io(self, bytes_to_write, to_read=0):
+        if self.native is not None:
+            return self.__bytes2val(self.native.io(bytes_to_write, to_read))
         # TODO: check parameters
         cmd = "%s -s %s -S low -c %s -o %s -i %s " % (
             self.SPI_CMD,
@@ -0,0 +1,149 @@
+import unittest
+from unittest import mock
+
+import bcm5396_py3
+
+
+MDC = 6
+MDIO = 7
+CS = 10
+CLK = 11
+MOSI = 12
+MISO = 13
+
+
+def bits(value, count):
+    return [(value >> (count - 1 - i)) & 0x1 for i in range(count)]
+
+
+class FakeGpio:
+    """
+    GPIO that records what happens on the wire: a clock records, on every
+    falling edge, the direction and value of the data line it drives.
+    """
+
+    def __init__(self, gpio):
+        self.gpio = gpio
+        self.direction = None
+        self.value = 1
+        self.values = []
+        self.to_read = []
+        self.data = None
+        self.edges = []
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    def set_direction(self, direction):
+        self.direction = direction
+
+    def read(self):
+        return self.to_read.pop(0)
+
+    def write(self, value):
+        if self.data is not None and self.value and not value:
+            self.edges.append((self.data.direction, self.data.value))
+        self.value = value
+        self.values.append(value)
+
+
+class FakeGpios:
+    def __init__(self, test):
+        self.gpios = {}
+        patcher = mock.patch.object(bcm5396_py3, "SysfsGpio", self.gpio)
+        patcher.start()
+        test.addCleanup(patcher.stop)
+
+    def gpio(self, gpio):
+        self.gpios[gpio] = FakeGpio(gpio)
+        return self.gpios[gpio]
+
+    def __getitem__(self, gpio):
+        return self.gpios[gpio]
+
+
+class TestMdioBitBang(unittest.TestCase):
+    def setUp(self):
+        self.gpios = FakeGpios(self)
+        self.mdio = bcm5396_py3.MdioBitBang(MDC, MDIO)
+        self.gpios[MDC].data = self.gpios[MDIO]
+
+    def header(self, op, phy, reg):
+        return [1] * 32 + [0, 1] + bits(op, 2) + bits(phy, 5) + bits(reg, 5)
+
+    def test_read(self):
+        # TA, then the register value
+        self.gpios[MDIO].to_read = [0, 0] + bits(0xBEEF, 16)
+        self.assertEqual(self.mdio.read(0x1E, 16), 0xBEEF)
+        edges = self.gpios[MDC].edges
+        self.assertEqual(len(edges), 46 + 18)
+        self.assertEqual(
+            edges[:46], [("out", bit) for bit in self.header(0x2, 0x1E, 16)]
+        )
+        self.assertEqual([d for d, _ in edges[46:]], ["in"] * 18)
+        self.assertEqual(self.gpios[MDIO].to_read, [])
+
+    def test_write(self):
+        self.assertEqual(self.mdio.write(0x1E, 17, 0x1234), 0x1234)
+        edges = self.gpios[MDC].edges
+        self.assertEqual(
+            edges,
+            [
+                ("out", bit)
+                for bit in self.header(0x1, 0x1E, 17) + [1, 0] + bits(0x1234, 16)
+            ],
+        )
+        self.assertEqual(len(edges), 64)
+
+    def test_run(self):
+        self.gpios[MDIO].to_read = [0, 0] + bits(0x5, 16)
+        self.assertEqual(
+            self.mdio.run(0x1E, [("write", 16, 0x1), ("read", 18)]), [0x5]
+        )
+        self.assertEqual(len(self.gpios[MDC].edges), 64 + 46 + 18)
+
+    def test_open_failure_closes_mdc(self):
+        def gpio(number):
+            if number == MDIO:
+                raise OSError("not exported")
+            return self.gpios.gpio(number)
+
+        with mock.patch.object(bcm5396_py3, "SysfsGpio", gpio):
+            with self.assertRaises(OSError):
+                bcm5396_py3.MdioBitBang(MDC, MDIO)
+        self.assertTrue(self.gpios[MDC].closed)
+
+
+class TestSpiBitBang(unittest.TestCase):
+    def setUp(self):
+        self.gpios = FakeGpios(self)
+        self.spi = bcm5396_py3.SpiBitBang(CS, CLK, MOSI, MISO)
+        self.gpios[CLK].data = self.gpios[MOSI]
+
+    def test_directions(self):
+        self.assertEqual(
+            [self.gpios[g].direction for g in (CS, CLK, MOSI, MISO)],
+            ["out", "out", "out", "in"],
+        )
+
+    def test_io(self):
+        # Clocked in while writing, then the reply
+        self.gpios[MISO].to_read = [1] * 16 + bits(0xAB, 8) + bits(0xCD, 8)
+        self.assertEqual(self.spi.io([0x61, 0x20], 2), [0xAB, 0xCD])
+        edges = self.gpios[CLK].edges
+        self.assertEqual(len(edges), 32)
+        # MSB first, first byte first
+        self.assertEqual([v for _, v in edges[:16]], bits(0x61, 8) + bits(0x20, 8))
+        # Chip select is low for the whole transfer only
+        self.assertEqual(self.gpios[CS].values, [0, 1])
+        self.assertEqual(self.gpios[MISO].to_read, [])
+
+    def test_write_only(self):
+        # MISO is still sampled while writing, like spi-bb does
+        self.gpios[MISO].to_read = [0] * 24
+        self.assertEqual(self.spi.io([0x60, 0x01, 0x80]), [])
+        self.assertEqual(
+            [v for _, v in self.gpios[CLK].edges],
+            bits(0x60, 8) + bits(0x01, 8) + bits(0x80, 8),
+        )
@@ -17,6 +17,7 @@
 # Boston, MA 02110-1301 USA
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import contextlib
 import logging
 import os
 import sys
@@ -166,6 +167,7 @@ class SocGPIOTable(object):
         self.soc_gpio_table = gpio_table
         self.registers = set([])  # all HW registers used for GPIO control
         self.functions = {}
+        self.in_transaction = False
 
         self._parse_gpio_table()
         self._sync_from_hw()
@@ -188,8 +190,30 @@ class SocGPIOTable(object):
         for reg in self.registers:
             soc_get_register(reg).write()
 
+    @contextlib.contextmanager
+    def transaction(self):
+        """Defer the register writes of config_function() to the end of the
+        block, where every changed register is written once. If the block
+        raises, the pending changes are dropped instead.
+        """
+        assert not self.in_transaction
+        self.in_transaction = True
+        try:
+            yield self
+        except Exception:
+            for reg in self.registers:
+                reg = soc_get_register(reg)
+                if reg.write_pending:
+                    reg.discard()
+            raise
+        finally:
+            self.in_transaction = False
+        self.write_to_hw()
+
     def config_function(self, func_name, write_through=True):
         logging.debug('Configure function "%s"' % func_name)
+        if self.in_transaction:
+            write_through = False
         if func_name not in self.functions:
             # The function is not multi-function pin
             raise ConfigUnknownFunction('Unknown function "%s" ' % func_name)
@@ -289,7 +313,7 @@ def setup_board_tolerance_gpio(
         bit = offset % 32
         # config the devmem and write through to the hw
         reg = soc_get_tolerance_reg(phy_addr)
-        reg.set_bit(bit)
+        reg.set_bit(bit, write_through=False)
         regs.append(reg)
 
     for reg in regs:
@@ -308,20 +332,19 @@ def setup_board_tolerance_gpio(
 def setup_board_gpio(soc_gpio_table, board_gpio_table, validate=True):
     soc = SocGPIOTable(soc_gpio_table)
     gpio_configured = []
-    for gpio in board_gpio_table:
-        try:
-            soc.config_function(gpio.gpio, write_through=False)
-            gpio_configured.append(gpio.gpio)
-        except ConfigUnknownFunction as e:
-            # not multiple-function GPIO pin
-            pass
-        except NotSmartEnoughException as e:
-            logging.error(
-                'Failed to configure "%s" for "%s": %s'
-                % (gpio.gpio, gpio.shadow, str(e))
-            )
-
-    soc.write_to_hw()
+    with soc.transaction():
+        for gpio in board_gpio_table:
+            try:
+                soc.config_function(gpio.gpio)
+                gpio_configured.append(gpio.gpio)
+            except ConfigUnknownFunction as e:
+                # not multiple-function GPIO pin
+                pass
+            except NotSmartEnoughException as e:
+                logging.error(
+                    'Failed to configure "%s" for "%s": %s'
+                    % (gpio.gpio, gpio.shadow, str(e))
+                )
 
     if validate:
         all_functions = set(soc.get_active_functions(refresh=True))
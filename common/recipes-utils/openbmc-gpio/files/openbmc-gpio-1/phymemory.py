@@ -17,15 +17,54 @@
 
 
 import logging
+import mmap
+import os
 import subprocess
 
 
+# Page aligned address => memoryview of the mapped page, as 32-bit words.
+# Pages are mapped once and shared by all registers in them, so that e.g.
+# all SCU registers are accessed through a single mapping. None means the
+# page could not be mapped, and devmem is used instead.
+_mapped_pages = {}
+
+
+def _get_mapped_page(addr):
+    if addr % 4 != 0:
+        return None, 0
+    base = addr & ~(mmap.PAGESIZE - 1)
+    if base not in _mapped_pages:
+        try:
+            fd = os.open("/dev/mem", os.O_RDWR | os.O_SYNC)
+            try:
+                page = mmap.mmap(
+                    fd,
+                    mmap.PAGESIZE,
+                    mmap.MAP_SHARED,
+                    mmap.PROT_READ | mmap.PROT_WRITE,
+                    offset=base,
+                )
+            finally:
+                os.close(fd)
+            # Native 32-bit items, so that every access is a single load or
+            # store instead of a byte by byte copy
+            _mapped_pages[base] = memoryview(page).cast("I")
+        except (EnvironmentError, ValueError) as e:
+            logging.debug(
+                "Cannot map /dev/mem @0x%x, falling back to devmem: %s" % (base, e)
+            )
+            _mapped_pages[base] = None
+    return _mapped_pages[base], (addr - base) // 4
+
+
 class PhyMemory(object):
     def __init__(self, addr, name=""):
         self.addr = addr
         self.name = name
         self.write_pending = False
         self.value = 0
+        # the value last read from or written to HW, None if unknown
+        self.hw_value = None
 
     def __del__(self):
         if self.write_pending:
@@ -46,9 +85,14 @@ class PhyMemory(object):
                 "Value (0x%x) is not wrote back to address (0x%x) "
                 "before reading HW" % (self.value, self.addr)
             )
-        cmd = ["devmem", "0x%x" % self.addr]
-        out = subprocess.check_output(cmd)
-        self.value = int(out, 16)
+        page, index = _get_mapped_page(self.addr)
+        if page is not None:
+            self.value = page[index]
+        else:
+            cmd = ["devmem", "0x%x" % self.addr]
+            out = subprocess.check_output(cmd)
+            self.value = int(out, 16)
+        self.hw_value = self.value
         logging.debug(
             "Read from %s @0x%x, got value (0x%x)" % (str(self), self.addr, self.value)
         )
@@ -59,16 +103,31 @@ class PhyMemory(object):
         return self.value
 
     def write(self, force=False):
-        if not force and not self.write_pending:
-            return
-        cmd = ["devmem", "0x%x" % self.addr, "32", "0x%x" % self.value]
-        subprocess.check_call(cmd)
+        if not force:
+            if not self.write_pending:
+                return
+            if self.value == self.hw_value:
+                # the bits changed since the last write cancelled out
+                self.write_pending = False
+                return
+        page, index = _get_mapped_page(self.addr)
+        if page is not None:
+            page[index] = self.value
+        else:
+            cmd = ["devmem", "0x%x" % self.addr, "32", "0x%x" % self.value]
+            subprocess.check_call(cmd)
+        self.hw_value = self.value
         self.write_pending = False
         logging.debug(
             "Wrote to %s address @0x%x with value (0x%x)"
             % (str(self), self.addr, self.value)
         )
 
+    def discard(self):
+        """Drop pending changes and read the value from HW again."""
+        self.write_pending = False
+        self._read_hw()
+
     def set_bit(self, bit, write_through=True):
         assert 0 <= bit <= 31
         self.value |= 1 << bit
@@ -306,7 +306,15 @@ def improve_system(logger):
             raise ValueError("No device with label {}".format(args.mtd_labels))
 
         for mtd in full_flash_mtds:
-            system.flash(attempts, image_file, mtd, logger, args.mtd_labels, args.force)
+            system.flash(
+                attempts,
+                image_file,
+                mtd,
+                logger,
+                args.mtd_labels,
+                args.force,
+                args.delta,
+            )
         # One could in theory pre-emptively set mtdparts for images that
         # will need it, but the mtdparts generator hasn't been tested on dual
         # flash and potentially other systems. To avoid over-optimizing for
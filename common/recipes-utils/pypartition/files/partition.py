@@ -120,7 +120,8 @@ class ExternalChecksumPartition(Partition):
         self.partition_data_size -= self.UBootChecksumsPartitionSize
         self.read_size = 0
         self.md5sum = hashlib.md5()
-        self.checksums_data = bytes()
+        # Grown in place; repeated bytes concatenation copies every time.
+        self.checksums_data = bytearray()
 
     def update(self, data):
         # type: (bytes) -> None
@@ -409,17 +410,16 @@ class DeviceTreePartition(Partition):
     @staticmethod
     def align(images):
         # type: (VirtualCat) -> List[Any]
-        while images.open_file.tell() % 4 != 0:
-            images.verified_read(1)
+        padding = -images.open_file.tell() % 4
+        if padding:
+            images.verified_read(padding)
 
     @staticmethod
     def next_data(images, length, data_type):
         # type: (VirtualCat, int, str) -> List[Any]
         fmt = b">%d%s" % (length // struct.calcsize(data_type), data_type)
         assert length == struct.calcsize(fmt)
-        start = images.open_file.tell()
         data = struct.unpack(fmt, images.verified_read(length))
-        end = images.open_file.tell()
         DeviceTreePartition.align(images)
         return list(data)
 
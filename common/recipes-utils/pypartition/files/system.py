@@ -19,15 +19,18 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import argparse
+import fcntl
 import hashlib
 import json
 import os
 import re
 import socket
+import struct
 import subprocess
 import sys
 import textwrap
 import time
+from concurrent.futures import ThreadPoolExecutor
 from glob import glob
 
 from partition import (
@@ -37,7 +40,24 @@ from partition import (
     LegacyUBootPartition,
     Partition,
 )
-from virtualcat import ImageFile, MemoryTechnologyDevice, VirtualCat
+from virtualcat import (
+    ImageFile,
+    MappedImage,
+    MemoryTechnologyDevice,
+    VirtualCat,
+    open_images,
+)
+
+
+# Partition validation is mostly hashing, which releases the GIL.
+VALIDATION_THREADS = 4
+
+# From <mtd/mtd-abi.h>: _IOR('M', 1, struct mtd_info_user) and
+# _IOW('M', 2, struct erase_info_user).
+MEMGETINFO = 0x80204D01
+MEMERASE = 0x40084D02
+MTD_INFO_USER_FORMAT = b"@BIIIIIQ"
+ERASE_INFO_USER_FORMAT = b"@II"
 
 
 # keep the timestamp of last healthd restart so we can block and wait at least
@@ -200,6 +220,11 @@ def get_checksums_args(description):
             action="store_true",
             help="Flash even if we suspect the image will brick the BMC",
         )
+        parser.add_argument(
+            "--delta",
+            action="store_true",
+            help="Only erase and write the erase blocks that differ from the image",
+        )
     else:
         parser.add_argument("--serve", action="store_true")
         parser.add_argument("--port", type=int, default=2876)
@@ -732,72 +757,98 @@ def load_image_meta(full_image, logger):
         return meta_info
 
 
+def get_partition_according_meta(images, part_info, hardware_enforced, is_mtd, logger):
+    # type: (Union[MappedImage, VirtualCat], dict, bool, bool, logging.Logger) -> Optional[Partition]
+    if "raw" == part_info["type"]:
+        return ExternalChecksumPartition(
+            part_info["size"],
+            part_info["offset"],
+            part_info["name"],
+            images,
+            [part_info["md5"]],
+            logger,
+        )
+    elif "fit" == part_info["type"]:
+        return DeviceTreePartition(
+            [part_info["size"]], part_info["offset"], part_info["name"], images, logger
+        )
+    elif "data" == part_info["type"] or "meta" == part_info["type"]:
+        return Partition(
+            part_info["size"], part_info["offset"], part_info["name"], images, logger
+        )
+    elif "mtdonly" == part_info["type"]:
+        if is_mtd:
+            return Partition(
+                part_info["size"],
+                part_info["offset"],
+                part_info["name"],
+                images,
+                logger,
+            )
+        return None
+    elif "rom" == part_info["type"]:
+        if hardware_enforced:
+            return Partition(
+                part_info["size"],
+                part_info["offset"],
+                part_info["name"],
+                images,
+                logger,
+            )
+        return ExternalChecksumPartition(
+            part_info["size"],
+            part_info["offset"],
+            part_info["name"],
+            images,
+            [part_info["md5"]],
+            logger,
+        )
+    raise AssertionError("Unknown partition %s " % repr(part_info))
+
+
 def get_partitions_according_meta(full_image, image_meta, logger):
     # type: (ImageSourcesType, List[str], dict, logging.Logger) -> List[Partition]
     logger.info("get partitions according to following image_meta:\n %s" % image_meta)
 
-    partitions = []
-    with VirtualCat([full_image]) as vc:
-        for part_info in image_meta[FBOBMC_PART_INFO_KEY]:
-            partition = None
-            if "raw" == part_info["type"]:
-                partition = ExternalChecksumPartition(
-                    part_info["size"],
-                    part_info["offset"],
-                    part_info["name"],
-                    vc,
-                    [part_info["md5"]],
-                    logger,
-                )
-            elif "fit" == part_info["type"]:
-                partition = DeviceTreePartition(
-                    [part_info["size"]],
-                    part_info["offset"],
-                    part_info["name"],
-                    vc,
-                    logger,
-                )
-            elif "data" == part_info["type"] or "meta" == part_info["type"]:
-                partition = Partition(
-                    part_info["size"],
-                    part_info["offset"],
-                    part_info["name"],
-                    vc,
-                    logger,
+    part_infos = image_meta[FBOBMC_PART_INFO_KEY]
+    hardware_enforced = (
+        any(part_info["type"] == "rom" for part_info in part_infos)
+        and get_vboot_enforcement() == "hardware-enforce"
+    )
+    is_mtd = hasattr(full_image, "device_name")
+
+    try:
+        mapped_image = MappedImage(full_image)
+    except (EnvironmentError, ValueError):
+        # MTDs can't be mapped, stream through them in order instead.
+        mapped_image = None
+
+    if mapped_image is None:
+        with VirtualCat([full_image]) as vc:
+            partitions = [
+                get_partition_according_meta(
+                    vc, part_info, hardware_enforced, is_mtd, logger
                 )
-            elif "mtdonly" == part_info["type"]:
-                if hasattr(full_image, "device_name"):
-                    partition = Partition(
-                        part_info["size"],
-                        part_info["offset"],
-                        part_info["name"],
-                        vc,
-                        logger,
-                    )
-            elif "rom" == part_info["type"]:
-                if get_vboot_enforcement() == "hardware-enforce":
-                    partition = Partition(
-                        part_info["size"],
-                        part_info["offset"],
-                        part_info["name"],
-                        vc,
-                        logger,
-                    )
-                else:
-                    partition = ExternalChecksumPartition(
-                        part_info["size"],
-                        part_info["offset"],
-                        part_info["name"],
-                        vc,
-                        [part_info["md5"]],
-                        logger,
-                    )
-            else:
-                raise AssertionError("Unknown partition %s " % repr(part_info))
-
-            if partition is not None:
-                partitions.append(partition)
-    return partitions
+                for part_info in part_infos
+            ]
+    else:
+        # Partitions sit at offsets given by the meta, so each can be read
+        # through its own cursor on the shared mapping, concurrently.
+        def validate(part_info):
+            # type: (dict) -> Optional[Partition]
+            return get_partition_according_meta(
+                mapped_image.cursor(part_info["offset"]),
+                part_info,
+                hardware_enforced,
+                is_mtd,
+                logger,
+            )
+
+        with mapped_image:
+            with ThreadPoolExecutor(VALIDATION_THREADS) as executor:
+                partitions = list(executor.map(validate, part_infos))
+
+    return [partition for partition in partitions if partition is not None]
 
 
 def get_valid_partitions_according_meta(full_image, image_meta, logger):
@@ -840,7 +891,7 @@ def get_valid_partitions(images_or_mtds, checksums, logger):
     logger.info(
         "Validating partitions in {}.".format(", ".join(map(str, images_or_mtds)))
     )
-    with VirtualCat(images_or_mtds) as vc:
+    with open_images(images_or_mtds) as vc:
         partitions = get_partitions(vc, checksums, logger)
 
     # The U-Boot checksum may have been validated while processing the main
@@ -994,8 +1045,69 @@ def image_file_compatible(image_file, issue_file, logger):
     return True
 
 
-def flash(attempts, image_file, mtd, logger, flash_name, force=False):
-    # type: (int, ImageFile, MemoryTechnologyDevice, logging.Logger, Optional[str], bool) -> None
+def get_mtd_erase_size(device):
+    # type: (io.FileIO) -> int
+    mtd_info_user = bytearray(struct.calcsize(MTD_INFO_USER_FORMAT))
+    fcntl.ioctl(device.fileno(), MEMGETINFO, mtd_info_user)
+    (_, _, _, erase_size, _, _, _) = struct.unpack(MTD_INFO_USER_FORMAT, mtd_info_user)
+    return erase_size
+
+
+def erase_mtd_block(device, start, length):
+    # type: (io.FileIO, int, int) -> None
+    fcntl.ioctl(
+        device.fileno(), MEMERASE, struct.pack(ERASE_INFO_USER_FORMAT, start, length)
+    )
+
+
+def delta_flash(image_file, mtd, logger):
+    # type: (ImageFile, MemoryTechnologyDevice, logging.Logger) -> Tuple[int, int]
+    """
+    Compare the MTD against the image one erase block at a time and only
+    erase, write and verify the blocks that differ. Blocks within the MTD's
+    read-only offset are left alone. Returns the number of bytes written and
+    skipped.
+    """
+    written = 0
+    skipped = 0
+    with open(mtd.file_name, "r+b", 0) as device, open(
+        image_file.file_name, "rb"
+    ) as image:
+        erase_size = get_mtd_erase_size(device)
+        start = mtd.offset * 1024
+        if erase_size <= 0 or start % erase_size != 0:
+            message = "read-only offset 0x{:x} of {} is not erase block aligned"
+            raise IOError(message.format(start, mtd))
+        image.seek(start)
+        device.seek(start)
+        for block_start in range(start, image_file.size, erase_size):
+            new = image.read(erase_size)
+            current = device.read(erase_size)
+            if current[: len(new)] == new:
+                skipped += len(new)
+                continue
+            erase_mtd_block(device, block_start, erase_size)
+            # Erased flash reads back as all ones, don't write those.
+            if new.count(b"\xff") != len(new):
+                device.seek(block_start)
+                device.write(new)
+            device.seek(block_start)
+            if device.read(len(new)) != new:
+                raise IOError(
+                    "verification of {} failed at 0x{:x}".format(mtd, block_start)
+                )
+            device.seek(block_start + erase_size)
+            written += len(new)
+    logger.info(
+        "Wrote 0x{:x} bytes to {}, skipped 0x{:x} unchanged bytes.".format(
+            written, mtd, skipped
+        )
+    )
+    return (written, skipped)
+
+
+def flash(attempts, image_file, mtd, logger, flash_name, force=False, delta=False):
+    # type: (int, ImageFile, MemoryTechnologyDevice, logging.Logger, Optional[str], bool, bool) -> None
     if image_file.size > mtd.size:
         logger.error("{} is too big for {}.".format(image_file, mtd))
         sys.exit(1)
@@ -1012,6 +1124,15 @@ def flash(attempts, image_file, mtd, logger, flash_name, force=False):
             sys.exit(1)
 
     logger.info("Proceeding with flash")
+    if delta and attempts > 0:
+        for attempt in range(attempts):
+            try:
+                delta_flash(image_file, mtd, logger)
+                return
+            except EnvironmentError as e:
+                logger.warning("Delta flash attempt {} failed: {}.".format(attempt, e))
+        logger.warning("Falling back to flashcp.")
+
     # If MTD has a read-only offset, create a new image file with the
     # readonly offset from the device and the remaining from the image
     # file and use that for flashcp.
@@ -1024,7 +1145,6 @@ def flash(attempts, image_file, mtd, logger, flash_name, force=False):
                 in_f.seek(mtd.offset * 1024)
                 out_f.write(in_f.read())
 
-    # TODO only write bytes that have changed
     flash_command = ["flashcp", image_name, mtd.file_name]
     if attempts < 1:
         flash_command = ["dd", "if={}".format(image_file.file_name), "of=/dev/null"]
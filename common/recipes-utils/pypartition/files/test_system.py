@@ -25,6 +25,7 @@ import json
 import logging
 import os
 import subprocess
+import tempfile
 import textwrap
 import unittest
 
@@ -424,6 +425,66 @@ class TestSystem(unittest.TestCase):
                 else:
                     mocked_check_call.assert_has_calls(calls)
 
+    def make_delta_flash_files(self, device_data, image_data):
+        files = []
+        for data in (device_data, image_data):
+            with tempfile.NamedTemporaryFile(delete=False) as f:
+                f.write(data)
+            self.addCleanup(os.remove, f.name)
+            files.append(f.name)
+        self.mock_mtd.file_name, self.mock_image.file_name = files
+        self.mock_image.size = len(image_data)
+        self.mock_mtd.size = len(device_data)
+
+    def erase(self, device, start, length):
+        self.erased.append(start)
+        device.seek(start)
+        device.write(b"\xff" * length)
+
+    @patch.object(system, "get_mtd_erase_size", return_value=16)
+    def test_delta_flash(self, mocked_get_mtd_erase_size):
+        self.erased = []
+        device_data = b"a" * 16 + b"b" * 16 + b"c" * 16 + b"d" * 16
+        image_data = b"a" * 16 + b"B" * 16 + b"\xff" * 16 + b"d" * 8
+        self.make_delta_flash_files(device_data, image_data)
+        with patch.object(system, "erase_mtd_block", side_effect=self.erase):
+            written, skipped = system.delta_flash(
+                self.mock_image, self.mock_mtd, self.logger
+            )
+        self.assertEqual(self.erased, [16, 32])
+        self.assertEqual((written, skipped), (32, 24))
+        with open(self.mock_mtd.file_name, "rb") as f:
+            self.assertEqual(f.read(), image_data + b"d" * 8)
+
+    @patch.object(system, "get_mtd_erase_size", return_value=16)
+    def test_delta_flash_skips_read_only_offset(self, mocked_get_mtd_erase_size):
+        self.erased = []
+        self.make_delta_flash_files(b"a" * 2048, b"b" * 2048)
+        self.mock_mtd.offset = 1
+        with patch.object(system, "erase_mtd_block", side_effect=self.erase):
+            system.delta_flash(self.mock_image, self.mock_mtd, self.logger)
+        self.assertEqual(self.erased, list(range(1024, 2048, 16)))
+        with open(self.mock_mtd.file_name, "rb") as f:
+            self.assertEqual(f.read(), b"a" * 1024 + b"b" * 1024)
+
+    @patch.object(system, "other_flasher_running", return_value=False)
+    @patch.object(system, "image_file_compatible", return_value=True)
+    @patch.object(subprocess, "check_call")
+    def test_flash_delta_falls_back_to_flashcp(
+        self,
+        mocked_check_call,
+        mocked_image_file_compatible,
+        mocked_other_flasher_running,
+    ):
+        with patch.object(system, "delta_flash", side_effect=IOError()) as delta:
+            system.flash(
+                2, self.mock_image, self.mock_mtd, self.logger, None, delta=True
+            )
+        self.assertEqual(delta.call_count, 2)
+        mocked_check_call.assert_called_once_with(
+            ["flashcp", self.mock_image.file_name, self.mock_mtd.file_name]
+        )
+
     @patch.object(system, "other_flasher_running", return_value=True)
     @patch.object(subprocess, "call")
     def test_reboot_while_flashing_refused(
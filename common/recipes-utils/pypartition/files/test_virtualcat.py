@@ -20,6 +20,7 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 import logging
 import os
+import tempfile
 import unittest
 from io import DEFAULT_BUFFER_SIZE
 
@@ -340,3 +341,60 @@ class TestVirtualCat(unittest.TestCase):
                 call().close(),
             ],
         )
+
+
+class TestMappedImage(unittest.TestCase):
+    def setUp(self):
+        self.data = b"".join(bytes(bytearray([i] * 4)) for i in range(64))
+        image_file = tempfile.NamedTemporaryFile(delete=False)
+        self.addCleanup(os.remove, image_file.name)
+        with image_file:
+            image_file.write(self.data)
+        self.image = virtualcat.ImageFile(image_file.name)
+
+    def test_reads(self):
+        with virtualcat.MappedImage(self.image) as mi:
+            self.assertEqual(mi.peek(), 0)
+            self.assertEqual(mi.verified_read(6), self.data[:6])
+            self.assertEqual(mi.open_file.tell(), 6)
+            self.assertEqual(mi.peek(), 0x01010202)
+            mi.open_file.seek(-2, os.SEEK_CUR)
+            self.assertEqual(mi.verified_read(2), self.data[4:6])
+            with self.assertRaises(IOError):
+                mi.verified_read(len(self.data))
+
+    def test_read_with_callback(self):
+        callback = MagicMock()
+        with patch.object(virtualcat.MappedImage, "HASH_CHUNK_SIZE", 100):
+            with virtualcat.MappedImage(self.image) as mi:
+                mi.seek_within_current_file(6)
+                mi.read_with_callback(len(self.data) - 6, callback)
+                chunks = [args[0].tobytes() for args, _ in callback.call_args_list]
+                self.assertEqual(
+                    chunks, [self.data[6:106], self.data[106:206], self.data[206:]]
+                )
+                self.assertEqual(mi.images, [])
+
+    def test_seek_within_current_file(self):
+        with virtualcat.MappedImage(self.image) as mi:
+            self.assertEqual(mi.images, [self.image])
+            mi.seek_within_current_file(len(self.data) + 10)
+            self.assertEqual(mi.open_file.tell(), len(self.data))
+            with self.assertRaises(IOError):
+                mi.seek_within_current_file(1)
+
+    def test_cursors_are_independent(self):
+        with virtualcat.MappedImage(self.image) as mi:
+            first = mi.cursor(8)
+            second = mi.cursor(16)
+            self.assertEqual(first.verified_read(4), self.data[8:12])
+            self.assertEqual(second.verified_read(4), self.data[16:20])
+            self.assertEqual(first.open_file.tell(), 12)
+            self.assertEqual(mi.open_file.tell(), 0)
+
+    def test_open_images(self):
+        with virtualcat.open_images([self.image]) as images:
+            self.assertIsInstance(images, virtualcat.MappedImage)
+        with patch.object(virtualcat.mmap, "mmap", side_effect=OSError()):
+            with virtualcat.open_images([self.image]) as images:
+                self.assertIsInstance(images, virtualcat.VirtualCat)
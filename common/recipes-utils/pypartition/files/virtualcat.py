@@ -18,13 +18,14 @@
 # Intended to compatible with both Python 2.7 and Python 3.x.
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import mmap
 import os
 import struct
 from io import DEFAULT_BUFFER_SIZE
 
 
 try:
-    from typing import Callable, List, Union
+    from typing import Callable, List, Optional, Union
 except Exception:
     pass
 
@@ -152,3 +153,127 @@ class VirtualCat(object):
         position = min(self.open_file.tell() + amount, self.images[0].size)
         self.open_file.seek(position)
         self.next_image_if_needed()
+
+
+class MappedImage(object):
+    """
+    Read-only memory map of a single ImageFile, offering the subset of the
+    VirtualCat interface that the Partition classes use. read_with_callback()
+    hands out memoryview slices of the mapping in HASH_CHUNK_SIZE pieces, so
+    hashing a partition copies nothing and hashlib can drop the GIL while it
+    works. cursor() returns another MappedImage positioned at an offset and
+    sharing the same mapping, which lets partitions at known offsets be
+    validated independently (and concurrently). As with VirtualCat, reads
+    cannot go past the end of the image. open_file refers to the
+    MappedImage itself so that tell() and seek() keep working for callers that
+    reach into it.
+
+    MTD character devices for NOR flash generally cannot be mapped, in which
+    case the constructor raises EnvironmentError (or ValueError for empty
+    files) and callers should fall back to VirtualCat.
+    """
+
+    HASH_CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, image, mapping=None, position=0):
+        # type: (ImageFile, Optional[memoryview], int) -> None
+        self.image = image
+        self.owner = mapping is None
+        if self.owner:
+            with open(image.file_name, "rb") as image_file:
+                self.mapping = mmap.mmap(
+                    image_file.fileno(), image.size, access=mmap.ACCESS_READ
+                )
+            mapping = memoryview(self.mapping)
+        self.view = mapping
+        self.size = len(mapping)
+        self.position = position
+        self.open_file = self
+
+    def __enter__(self):
+        # type: () -> MappedImage
+        return self
+
+    def __exit__(self, exception_type, exception_value, exception_traceback):
+        # type: (type, int, int) -> None
+        self.close()
+
+    def close(self):
+        # type: () -> None
+        if self.owner:
+            self.view.release()
+            try:
+                self.mapping.close()
+            except BufferError:
+                # Slices still referenced (e.g. from a traceback) keep the
+                # mapping alive until they are collected.
+                pass
+
+    @property
+    def images(self):
+        # type: () -> ImageSourcesType
+        # Mirrors VirtualCat.images, which runs empty once everything is read.
+        return [self.image] if self.position < self.size else []
+
+    def cursor(self, offset):
+        # type: (int) -> MappedImage
+        return MappedImage(self.image, self.view, offset)
+
+    def tell(self):
+        # type: () -> int
+        return self.position
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        # type: (int, int) -> None
+        if whence == os.SEEK_CUR:
+            offset += self.position
+        elif whence == os.SEEK_END:
+            offset += self.size
+        self.position = offset
+
+    def read_view(self, requested_size):
+        # type: (int) -> memoryview
+        start = self.position
+        if start + requested_size > self.size:
+            raise IOError(
+                "read {} bytes but {} requested".format(
+                    max(self.size - start, 0), requested_size
+                )
+            )
+        self.position += requested_size
+        return self.view[start : self.position]
+
+    def verified_read(self, requested_size):
+        # type: (int) -> bytes
+        return self.read_view(requested_size).tobytes()
+
+    def peek(self):
+        # type: () -> int
+        word = self.read_view(4)
+        self.position -= len(word)
+        return struct.unpack_from(b">I", word)[0]
+
+    def read_with_callback(self, size, callback):
+        # type: (int, Callable[[memoryview], None]) -> None
+        data = self.read_view(size)
+        for start in range(0, size, self.HASH_CHUNK_SIZE):
+            callback(data[start : start + self.HASH_CHUNK_SIZE])
+
+    def seek_within_current_file(self, amount):
+        # type: (int) -> None
+        if self.position >= self.size:
+            raise IOError("cannot skip beyond end of last file")
+        self.position = min(self.position + amount, self.size)
+
+
+def open_images(images_or_mtds):
+    # type: (ImageSourcesType) -> Union[MappedImage, VirtualCat]
+    """
+    Map a single image file if possible, otherwise stream through VirtualCat.
+    """
+    if len(images_or_mtds) == 1:
+        try:
+            return MappedImage(images_or_mtds[0])
+        except (EnvironmentError, ValueError):
+            pass
+    return VirtualCat(images_or_mtds)
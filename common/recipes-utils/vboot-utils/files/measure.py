@@ -18,8 +18,10 @@
 # Boston, MA 02110-1301 USA
 #
 import argparse
+import functools
 import hashlib
 import json
+import mmap
 import os
 import subprocess
 import sys
@@ -62,17 +64,140 @@ def read_tpm2_pcr(algo, pcr_id):
     return tpm2_pcr
 
 
+# Images are hashed through an mmap of the file where possible, and with
+# reads of this size otherwise (e.g. mtd devices, which cannot be mapped).
+HASH_READ_SIZE = 1024 * 1024
+
+# (filename, offset, size, algo) -> digest
+_comp_hashes = {}
+
+
+def _map_image(fh):
+    try:
+        return mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+
+def _hash_spans_mapped(mapped, spans):
+    view = memoryview(mapped)
+    try:
+        for (offset, size), hashes in spans.items():
+            data = view[offset : offset + size]
+            for h in hashes:
+                h.update(data)
+            data.release()
+    finally:
+        view.release()
+
+
+def _hash_spans_read(fh, spans):
+    # Sweep the file once, overlapping spans share the reads
+    buf = memoryview(bytearray(HASH_READ_SIZE))
+    ordered = sorted(spans)
+    i = 0
+    while i < len(ordered):
+        start, end = ordered[i][0], ordered[i][0] + ordered[i][1]
+        j = i + 1
+        while j < len(ordered) and ordered[j][0] <= end:
+            end = max(end, ordered[j][0] + ordered[j][1])
+            j += 1
+        group = ordered[i:j]
+        fh.seek(start)
+        pos = start
+        while pos < end:
+            n = fh.readinto(buf[: min(HASH_READ_SIZE, end - pos)])
+            if not n:
+                break
+            for offset, size in group:
+                lo = max(offset, pos)
+                hi = min(offset + size, pos + n)
+                if lo < hi:
+                    for h in spans[(offset, size)]:
+                        h.update(buf[lo - pos : hi - pos])
+            pos += n
+        i = j
+
+
+def hash_comps(filename, comps):
+    """
+    Hash the (offset, size, algo) components of filename in a single pass
+    and return {(offset, size, algo): digest}. Digests are cached, so
+    measuring the same component again does not touch the file.
+    """
+    spans = {}
+    missing = []
+    for offset, size, algo in set(comps):
+        if (filename, offset, size, algo) in _comp_hashes:
+            continue
+        h = hashlib.new(algo)
+        spans.setdefault((offset, size), []).append(h)
+        missing.append(((offset, size, algo), h))
+    if spans:
+        with open(filename, "rb") as fh:
+            mapped = _map_image(fh)
+            if mapped is not None:
+                with mapped:
+                    _hash_spans_mapped(mapped, spans)
+            else:
+                _hash_spans_read(fh, spans)
+        for (offset, size, algo), h in missing:
+            _comp_hashes[(filename, offset, size, algo)] = h.digest()
+    return {
+        (offset, size, algo): _comp_hashes[(filename, offset, size, algo)]
+        for offset, size, algo in comps
+    }
+
+
 def hash_comp(filename, offset, size, algo="sha256"):
-    h = hashlib.new(algo)
-    with open(filename, "rb") as fh:
-        fh.seek(offset)
-        remain = size
-        while remain:
-            read_size = min(remain, h.block_size)
-            data = fh.read(read_size)
-            remain -= read_size
-            h.update(data)
-    return h.digest()
+    return hash_comps(filename, [(offset, size, algo)])[(offset, size, algo)]
+
+
+def clear_measure_caches():
+    """
+    Forget the component digests and FIT headers of the images measured
+    so far, e.g. because a flash was updated in between
+    """
+    _comp_hashes.clear()
+    get_uboot_hash_algo_and_size.cache_clear()
+    get_os_comps_hash_algo_offset_size.cache_clear()
+
+
+def prefetch_measures(plans):
+    """
+    Hash everything the measure_*() functions will need in one pass per
+    image. plans is a list of (image_meta, algos, parts, recal_parts):
+    parts are measured with each of algos, recal_parts ("u-boot", "os")
+    are the components whose FIT hashes will be recalculated. Anything
+    cached from previous measurements is dropped first.
+    """
+    clear_measure_caches()
+    comps = {}
+    for image_meta, algos, parts, recal_parts in plans:
+        image_comps = comps.setdefault(image_meta.image, [])
+        for part in parts:
+            if part == "key-store":
+                info = image_meta.get_part_info("u-boot-fit")
+                span = (info["offset"], 0x4000)
+            else:
+                info = image_meta.get_part_info(part)
+                span = (info["offset"], info["size"])
+            image_comps += [span + (algo,) for algo in algos]
+        if "u-boot" in recal_parts:
+            fit = image_meta.get_part_info("u-boot-fit")
+            _, uboot_algo, uboot_size = get_uboot_hash_algo_and_size(
+                image_meta.image, fit["offset"], 0x4000
+            )
+            image_comps.append((fit["offset"] + 0x4000, uboot_size, uboot_algo))
+        if "os" in recal_parts:
+            fit = image_meta.get_part_info("os-fit")
+            os_components = get_os_comps_hash_algo_offset_size(
+                image_meta.image, fit["offset"], fit["size"]
+            )
+            for _, comp_algo, comp_offset, comp_size in os_components:
+                image_comps.append((comp_offset, comp_size, comp_algo))
+    for image, image_comps in comps.items():
+        hash_comps(image, image_comps)
 
 
 def measure_spl(algo, image_meta, rawhash=False):
@@ -93,6 +218,7 @@ def measure_keystore(algo, image_meta, rawhash=False):
     return fit_measure if rawhash else pcr1.extend(fit_measure)
 
 
+@functools.lru_cache(maxsize=None)
 def get_uboot_hash_algo_and_size(filename, offset, size):
     with open(filename, "rb") as fh:
         fh.seek(offset)
@@ -105,6 +231,7 @@ def get_uboot_hash_algo_and_size(filename, offset, size):
         return (uboot_hash, uboot_algo, uboot_size)
 
 
+@functools.lru_cache(maxsize=None)
 def get_os_comps_hash_algo_offset_size(filename, offset, size):
     comps = []
 
@@ -312,6 +439,18 @@ def print_attest_list(fw_ver, raw_sha1_hashes, raw_sha256_hashes, comp):
 
 
 def gen_attest_allowlists(flash0_meta, flash1_meta):
+    algos = ["sha1", "sha256"]
+    prefetch_measures(
+        [
+            (flash0_meta, algos, ["spl", "rec-u-boot"], ["os"] if args.recal else []),
+            (
+                flash1_meta,
+                algos,
+                ["key-store"],
+                ["u-boot", "os"] if args.recal else [],
+            ),
+        ]
+    )
     raw_sha1_hashes = {
         "spl": measure_spl("sha1", flash0_meta, True),
         "key-store": measure_keystore("sha1", flash1_meta, True),
@@ -355,6 +494,19 @@ def main():
     if args.components:
         return gen_attest_allowlists(flash0_meta, flash1_meta)
 
+    algos = [args.algo]
+    prefetch_measures(
+        [
+            (flash0_meta, algos, ["spl", "rec-u-boot"], ["os"] if args.recal else []),
+            (
+                flash1_meta,
+                algos,
+                ["key-store", "u-boot-env"],
+                ["u-boot", "os"] if args.recal else [],
+            ),
+        ]
+    )
+
     mboot_measures = [
         {  # SPL
             "component": "spl",
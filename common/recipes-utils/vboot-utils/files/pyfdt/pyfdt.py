@@ -1147,3 +1147,164 @@ class FdtBlobParse(object):  # pylint: disable-msg=R0903
         fdt.add_rootnode(rootnode, prenops=prenops, postnops=postnops)
         fdt.add_reserve_entries(self.fdt_reserve_entries)
         return fdt
+
+
+class FdtBufferParse(FdtBlobParse):  # pylint: disable-msg=R0903
+    """Parse from a bytes-like input (bytes, memoryview, mmap)
+
+       Same result as FdtBlobParse, but without a read per string and tag:
+       the struct block is walked with unpack_from and the strings block
+       is indexed once.
+    """
+
+    __fdt_header = Struct(">IIIIIIIIII")
+    __fdt_header_names = (
+        "magic",
+        "totalsize",
+        "off_dt_struct",
+        "off_dt_strings",
+        "off_mem_rsvmap",
+        "version",
+        "last_comp_version",
+        "boot_cpuid_phys",
+        "size_dt_strings",
+        "size_dt_struct",
+    )
+    __fdt_reserve_entry = Struct(">QQ")
+    __fdt_cell = Struct(">I")
+    __fdt_prop = Struct(">II")
+    # Chunk size used to look for the end of node names in memoryviews,
+    # which have no find()
+    __name_chunk = 64
+
+    def __extract_fdt_header(self):
+        """Extract DTB header"""
+        values = self.__fdt_header.unpack_from(self.buf, self.pos_offset)
+        result = dict(zip(self.__fdt_header_names[:7], values[:7]))
+        # boot_cpuid_phys (v2), size_dt_strings (v3), size_dt_struct (v17)
+        for version, name, value in zip(
+            (2, 3, 17), self.__fdt_header_names[7:], values[7:]
+        ):
+            if result["version"] >= version:
+                result[name] = value
+        return result
+
+    def __extract_fdt_reserve_entries(self):
+        """Extract reserved memory entries"""
+        entries = []
+        pos = self.fdt_header["off_mem_rsvmap"]
+        while True:
+            (address, size) = self.__fdt_reserve_entry.unpack_from(self.buf, pos)
+            if address == 0 and size == 0:
+                return entries
+            entries.append({"address": address, "size": size})
+            pos += self.__fdt_reserve_entry.size
+
+    def __index_fdt_strings(self):
+        """Index the strings block: offset -> string"""
+        start = self.fdt_header["off_dt_strings"]
+        if "size_dt_strings" in self.fdt_header:
+            end = start + self.fdt_header["size_dt_strings"]
+        else:
+            end = self.pos_offset + self.fdt_header["totalsize"]
+        self.fdt_strings_block = bytes(self.buf[start:end])
+        strings = {}
+        pos = 0
+        for name in self.fdt_strings_block.split(b"\0"):
+            strings[pos] = name.decode("ascii")
+            pos += len(name) + 1
+        return strings
+
+    def __extract_fdt_string(self, prop_string_pos):
+        """Extract string from string pool"""
+        try:
+            return self.fdt_strings[prop_string_pos]
+        except KeyError:
+            # Points into the middle of a string (suffix merging)
+            block = self.fdt_strings_block
+            end = block.index(b"\0", prop_string_pos)
+            name = block[prop_string_pos:end].decode("ascii")
+            self.fdt_strings[prop_string_pos] = name
+            return name
+
+    def __find_nul(self, pos):
+        """Offset of the next NUL byte at or after pos"""
+        if not isinstance(self.buf, memoryview):
+            end = self.buf.find(b"\0", pos)
+            if end < 0:
+                raise Exception("Unterminated string at %d" % pos)
+            return end
+        start = pos
+        while start < len(self.buf):
+            chunk = bytes(self.buf[start : start + self.__name_chunk])
+            end = chunk.find(b"\0")
+            if end >= 0:
+                return start + end
+            start += len(chunk)
+        raise Exception("Unterminated string at %d" % pos)
+
+    def __extract_fdt_dt(self):
+        """Extract tags"""
+        cell = self.__fdt_cell
+        prop = self.__fdt_prop
+        buf = self.buf
+        old_props = self.fdt_header["version"] < 16
+        tags = []
+        pos = self.fdt_header["off_dt_struct"]
+        while pos + cell.size <= len(buf):
+            (tag,) = cell.unpack_from(buf, pos)
+            pos += cell.size
+            if tag == FDT_BEGIN_NODE:
+                end = self.__find_nul(pos)
+                name = bytes(buf[pos:end]).decode("ascii")
+                pos = (end + 1 + 3) & ~3
+                tags.append((tag, name or "/"))
+            elif tag in (FDT_END_NODE, FDT_NOP):
+                tags.append((tag, ""))
+            elif tag == FDT_END:
+                tags.append((tag, ""))
+                break
+            elif tag == FDT_PROP:
+                (prop_size, prop_string_pos) = prop.unpack_from(buf, pos)
+                prop_start = pos + prop.size
+                if old_props and prop_size >= 8:
+                    prop_start = (prop_start + 7) & ~7
+                if self.blob_limit and prop_size > self.blob_limit:
+                    # skip blobs bigger than blob_limit,
+                    # output the prop_start and prop_size instead
+                    value = (self.blob_base + prop_start, prop_size)
+                else:
+                    value = bytes(buf[prop_start : prop_start + prop_size])
+                pos = (prop_start + prop_size + 3) & ~3
+                tags.append((tag, (self.__extract_fdt_string(prop_string_pos), value)))
+            else:
+                print("Unknown Tag %d" % tag)
+        return tags
+
+    def __init__(self, buf, offset=0, blob_limit=None, blob_base=0):
+        """Init with a buffer holding the blob at offset
+           skip reading the blob in case blob size > blob_limit, the
+           (offset, size) reported instead is relative to the buffer,
+           plus blob_base for buffers read from the middle of a file
+        """
+        self.buf = buf
+        self.blob_limit = blob_limit
+        self.blob_base = blob_base
+        self.pos_offset = offset
+        self.fdt_header = self.__extract_fdt_header()
+        if self.fdt_header["magic"] != FDT_MAGIC:
+            raise Exception("Invalid Magic")
+        if self.fdt_header["version"] > FDT_MAX_VERSION:
+            raise Exception("Invalid Version %d" % self.fdt_header["version"])
+        if self.fdt_header["last_comp_version"] > FDT_MAX_VERSION - 1:
+            raise Exception(
+                "Invalid last compatible Version %d"
+                % self.fdt_header["last_comp_version"]
+            )
+        # offset the off_xxx value to begin of embedded FIT
+        self.fdt_header["off_dt_strings"] += self.pos_offset
+        self.fdt_header["off_mem_rsvmap"] += self.pos_offset
+        self.fdt_header["off_dt_struct"] += self.pos_offset
+        self.fdt_reserve_entries = self.__extract_fdt_reserve_entries()
+        self.fdt_strings = self.__index_fdt_strings()
+        self.fdt_dt_tags = self.__extract_fdt_dt()
@@ -0,0 +1,83 @@
+import hashlib
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import measure
+
+
+class FakeImageMeta:
+    def __init__(self, image, parts):
+        self.image = image
+        self.parts = parts
+
+    def get_part_info(self, part):
+        return self.parts[part]
+
+
+class TestHashComps(unittest.TestCase):
+    COMPS = [
+        (0, 4096, "sha256"),
+        (0, 4096, "sha1"),
+        (100, 5000, "sha256"),
+        (3000, 10, "sha256"),
+        (9000, 1000, "sha256"),
+        (20000, 0, "sha256"),
+    ]
+
+    def setUp(self):
+        measure.clear_measure_caches()
+        self.addCleanup(measure.clear_measure_caches)
+        self.data = os.urandom(32 * 1024)
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(self.data)
+        self.image = f.name
+        self.addCleanup(os.unlink, self.image)
+
+    def expected(self, comps):
+        return {
+            (offset, size, algo): hashlib.new(
+                algo, self.data[offset : offset + size]
+            ).digest()
+            for offset, size, algo in comps
+        }
+
+    def test_mapped(self):
+        self.assertEqual(
+            measure.hash_comps(self.image, self.COMPS), self.expected(self.COMPS)
+        )
+
+    def test_read_fallback(self):
+        # Small reads so that spans cross read boundaries
+        with mock.patch.object(measure, "_map_image", return_value=None):
+            with mock.patch.object(measure, "HASH_READ_SIZE", 1000):
+                read = measure.hash_comps(self.image, self.COMPS)
+        measure.clear_measure_caches()
+        self.assertEqual(read, measure.hash_comps(self.image, self.COMPS))
+        self.assertEqual(read, self.expected(self.COMPS))
+
+    def test_hash_comp(self):
+        self.assertEqual(
+            measure.hash_comp(self.image, 100, 200, "sha1"),
+            hashlib.sha1(self.data[100:300]).digest(),
+        )
+
+    def test_cache(self):
+        digest = measure.hash_comp(self.image, 0, 4096)
+        with open(self.image, "r+b") as f:
+            f.write(b"\xff" * 16)
+        self.assertEqual(measure.hash_comp(self.image, 0, 4096), digest)
+        measure.clear_measure_caches()
+        self.assertNotEqual(measure.hash_comp(self.image, 0, 4096), digest)
+
+    def test_prefetch_measures_clears_cache(self):
+        meta = FakeImageMeta(self.image, {"spl": {"offset": 0, "size": 4096}})
+        measure.prefetch_measures([(meta, ["sha256"], ["spl"], [])])
+        with open(self.image, "r+b") as f:
+            f.write(b"\xff" * 16)
+        measure.prefetch_measures([(meta, ["sha256"], ["spl"], [])])
+        self.assertEqual(
+            measure.measure_spl("sha256", meta, rawhash=True),
+            hashlib.sha256(b"\xff" * 16 + self.data[16:4096]).digest(),
+        )
@@ -0,0 +1,107 @@
+import io
+import os
+import tempfile
+import unittest
+
+from pyfdt import pyfdt
+from vboot_common import get_fdt, get_fdt_from_file
+
+BLOB_LIMIT = 0x2000
+PREFIX = b"\xa5" * 100
+
+
+def make_fit():
+    root = pyfdt.FdtNode("/")
+    root.append(pyfdt.FdtPropertyStrings("description", ["test fit"]))
+    images = pyfdt.FdtNode("images")
+    kernel = pyfdt.FdtNode("kernel@1")
+    # Larger than BLOB_LIMIT, only its (offset, size) is kept
+    kernel.append(pyfdt.FdtPropertyWords("data", list(range(0x1000))))
+    kernel.append(pyfdt.FdtPropertyWords("load", [0x80008000]))
+    hash_node = pyfdt.FdtNode("hash@1")
+    hash_node.append(pyfdt.FdtPropertyBytes("value", list(range(-16, 16))))
+    hash_node.append(pyfdt.FdtPropertyStrings("algo", ["sha256"]))
+    kernel.append(hash_node)
+    images.append(kernel)
+    fdt_node = pyfdt.FdtNode("fdt@1")
+    fdt_node.append(pyfdt.FdtPropertyWords("data", [1, 2, 3]))
+    fdt_node.append(pyfdt.FdtPropertyStrings("compatible", ["a", "b"]))
+    images.append(fdt_node)
+    root.append(images)
+    fdt = pyfdt.Fdt()
+    fdt.add_rootnode(root)
+    return fdt.to_dtb()
+
+
+class TestFdtBufferParse(unittest.TestCase):
+    def setUp(self):
+        self.dtb = make_fit()
+
+    def blob_parse(self, data, offset):
+        infile = io.BytesIO(data)
+        infile.seek(offset)
+        return pyfdt.FdtBlobParse(infile, blob_limit=BLOB_LIMIT).to_fdt()
+
+    def assertSameFdt(self, fdt, expected):
+        self.assertEqual(fdt.to_dts(), expected.to_dts())
+        self.assertEqual(
+            fdt.resolve_path("/images/kernel@1/data").blob_info,
+            expected.resolve_path("/images/kernel@1/data").blob_info,
+        )
+        self.assertEqual(
+            fdt.resolve_path("/images/kernel@1/hash@1/value").to_raw(),
+            expected.resolve_path("/images/kernel@1/hash@1/value").to_raw(),
+        )
+
+    def test_offset_zero(self):
+        expected = self.blob_parse(self.dtb, 0)
+        fdt = pyfdt.FdtBufferParse(self.dtb, blob_limit=BLOB_LIMIT).to_fdt()
+        self.assertSameFdt(fdt, expected)
+        self.assertEqual(
+            fdt.resolve_path("/images/kernel@1/data").blob_info[1], 0x1000 * 4
+        )
+
+    def test_offset(self):
+        data = PREFIX + self.dtb
+        expected = self.blob_parse(data, len(PREFIX))
+        fdt = pyfdt.FdtBufferParse(data, len(PREFIX), blob_limit=BLOB_LIMIT).to_fdt()
+        self.assertSameFdt(fdt, expected)
+        # blob_info offsets are relative to the start of the buffer
+        offset, _size = fdt.resolve_path("/images/kernel@1/data").blob_info
+        self.assertEqual(data[offset : offset + 8], b"\x00\x00\x00\x00\x00\x00\x00\x01")
+
+    def test_memoryview(self):
+        data = PREFIX + self.dtb
+        expected = self.blob_parse(data, len(PREFIX))
+        view = memoryview(bytearray(data))
+        fdt = pyfdt.FdtBufferParse(view, len(PREFIX), blob_limit=BLOB_LIMIT).to_fdt()
+        self.assertSameFdt(fdt, expected)
+
+    def test_no_blob_limit(self):
+        expected = pyfdt.FdtBlobParse(io.BytesIO(self.dtb)).to_fdt()
+        self.assertSameFdt(pyfdt.FdtBufferParse(self.dtb).to_fdt(), expected)
+        self.assertSameFdt(get_fdt(self.dtb), expected)
+
+    def test_get_fdt_from_file(self):
+        data = PREFIX + self.dtb
+        expected = self.blob_parse(data, len(PREFIX))
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(data)
+        self.addCleanup(os.unlink, f.name)
+        # Mapped
+        with open(f.name, "rb") as infile:
+            infile.seek(len(PREFIX))
+            self.assertSameFdt(get_fdt_from_file(infile), expected)
+        # Not mappable, the blocks are read into memory
+        infile = io.BytesIO(data + b"\xff" * 100)
+        infile.seek(len(PREFIX))
+        fdt = get_fdt_from_file(infile)
+        self.assertSameFdt(fdt, expected)
+        self.assertEqual(infile.tell(), len(data))
+        # blob_info offsets are still relative to the start of the file
+        offset, _size = fdt.resolve_path("/images/kernel@1/data").blob_info
+        self.assertEqual(data[offset : offset + 8], b"\x00\x00\x00\x00\x00\x00\x00\x01")
+
+    def test_get_fdt_from_file_bad_magic(self):
+        with self.assertRaises(Exception):
+            get_fdt_from_file(io.BytesIO(b"\0" * 64))
@@ -17,17 +17,11 @@
 # Boston, MA 02110-1301 USA
 import mmap
 import os
-import sys
+import struct
 
 from pyfdt import pyfdt
 
 
-if sys.version_info[0] == 3:
-    import io
-else:
-    import StringIO
-
-
 # Define the exit code
 EC_SUCCESS = 0
 EC_SPLROM_BAD = 1
@@ -36,6 +30,9 @@ EC_KERNEL_BAD = 3
 EC_ROOTFS_BAD = 4
 EC_EXCEPTION = 255
 
+# magic through size_dt_struct, see FdtBufferParse
+FDT_HEADER_SIZE = 40
+
 VBS_LOCATION = {
     # VBS SRAM mapping: (addr , size, vbs_offset, vbs_size)
     "SOC_MODEL_ASPEED_G5": (0x1E720000, 4 * 1024, 0x200, 56),
@@ -44,18 +41,54 @@ VBS_LOCATION = {
 
 
 def get_fdt(content):
-    # Represent the FIT as an IO resource.
-    if sys.version_info[0] == 3:
-        fit_io = io.BytesIO(content)
-    else:
-        fit_io = StringIO.StringIO(content)
-    dtb = pyfdt.FdtBlobParse(fit_io)
+    dtb = pyfdt.FdtBufferParse(content)
     fdt = dtb.to_fdt()
     return fdt
 
 
+def read_fdt_blocks(infile):
+    """
+    Read the FDT at the current position of infile, up to the end of its
+    struct and strings blocks, for files that cannot be mapped.
+    """
+    header = infile.read(FDT_HEADER_SIZE)
+    if len(header) < FDT_HEADER_SIZE:
+        raise Exception("Truncated FDT header")
+    (
+        magic,
+        totalsize,
+        off_dt_struct,
+        off_dt_strings,
+        _off_mem_rsvmap,
+        version,
+        _last_comp_version,
+        _boot_cpuid_phys,
+        size_dt_strings,
+        size_dt_struct,
+    ) = struct.unpack(">IIIIIIIIII", header)
+    if magic != pyfdt.FDT_MAGIC:
+        raise Exception("Invalid Magic")
+    if version >= 17:
+        end = max(off_dt_struct + size_dt_struct, off_dt_strings + size_dt_strings)
+    else:
+        end = totalsize
+    buf = bytearray(header)
+    buf += infile.read(end - len(header))
+    return buf
+
+
 def get_fdt_from_file(infile):
-    dtb = pyfdt.FdtBlobParse(infile, blob_limit=0x2000)
+    offset = infile.tell()
+    try:
+        mapped = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+    except (AttributeError, OSError, ValueError):
+        # Not mappable (e.g. a pipe or an mtd character device), read the
+        # blocks the parser needs into memory instead.
+        buf = read_fdt_blocks(infile)
+        dtb = pyfdt.FdtBufferParse(buf, blob_limit=0x2000, blob_base=offset)
+    else:
+        with mapped:
+            dtb = pyfdt.FdtBufferParse(mapped, offset, blob_limit=0x2000)
     fdt = dtb.to_fdt()
     return fdt
 
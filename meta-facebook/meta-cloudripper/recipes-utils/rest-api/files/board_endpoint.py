@@ -29,6 +29,7 @@ import rest_system_led_info
 import rest_vddcore
 from aiohttp import web
 from common_utils import dumps_bytestr
+from sensor_snapshot import get_sensor_snapshot
 
 
 class boardApp_Handler:
@@ -126,19 +127,23 @@ class boardApp_Handler:
 
     # Handler for sys/sensors/scm resource endpoint
     async def rest_sensors_scm_hdl(self, request):
-        return web.json_response(rest_sensors.get_scm_sensors(), dumps=dumps_bytestr)
+        result = await get_sensor_snapshot(request, rest_sensors.get_scm_sensors)
+        return web.json_response(result, dumps=dumps_bytestr)
 
     # Handler for sys/sensors/smb resource endpoint
     async def rest_sensors_smb_hdl(self, request):
-        return web.json_response(rest_sensors.get_smb_sensors(), dumps=dumps_bytestr)
+        result = await get_sensor_snapshot(request, rest_sensors.get_smb_sensors)
+        return web.json_response(result, dumps=dumps_bytestr)
 
     # Handler for sys/sensors/psu1 resource endpoint
     async def rest_sensors_psu1_hdl(self, request):
-        return web.json_response(rest_sensors.get_psu1_sensors(), dumps=dumps_bytestr)
+        result = await get_sensor_snapshot(request, rest_sensors.get_psu1_sensors)
+        return web.json_response(result, dumps=dumps_bytestr)
 
     # Handler for sys/sensors/psu2 resource endpoint
     async def rest_sensors_psu2_hdl(self, request):
-        return web.json_response(rest_sensors.get_psu2_sensors(), dumps=dumps_bytestr)
+        result = await get_sensor_snapshot(request, rest_sensors.get_psu2_sensors)
+        return web.json_response(result, dumps=dumps_bytestr)
 
     # Handler for sys/vddcore resource endpoint
     async def rest_vddcore_get_volt(self, request):
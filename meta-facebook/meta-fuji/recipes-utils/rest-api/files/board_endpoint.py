@@ -30,6 +30,7 @@ import rest_smbinfo
 import rest_system_led_info
 from aiohttp import web
 from common_utils import dumps_bytestr
+from sensor_snapshot import get_sensor_snapshot
 
 
 class boardApp_Handler:
@@ -217,59 +218,73 @@ class boardApp_Handler:
 
     # Handler for sys/sensors/scm resource endpoint
     async def rest_sensors_scm_hdl(self, request):
-        return web.json_response(rest_sensors.get_scm_sensors(), dumps=dumps_bytestr)
+        result = await get_sensor_snapshot(request, rest_sensors.get_scm_sensors)
+        return web.json_response(result, dumps=dumps_bytestr)
 
     # Handler for sys/sensors/smb resource endpoint
     async def rest_sensors_smb_hdl(self, request):
-        return web.json_response(rest_sensors.get_smb_sensors(), dumps=dumps_bytestr)
+        result = await get_sensor_snapshot(request, rest_sensors.get_smb_sensors)
+        return web.json_response(result, dumps=dumps_bytestr)
 
     # Handler for sys/sensors/psu1 resource endpoint
     async def rest_sensors_psu1_hdl(self, request):
-        return web.json_response(rest_sensors.get_psu1_sensors(), dumps=dumps_bytestr)
+        result = await get_sensor_snapshot(request, rest_sensors.get_psu1_sensors)
+        return web.json_response(result, dumps=dumps_bytestr)
 
     # Handler for sys/sensors/psu2 resource endpoint
     async def rest_sensors_psu2_hdl(self, request):
-        return web.json_response(rest_sensors.get_psu2_sensors(), dumps=dumps_bytestr)
+        result = await get_sensor_snapshot(request, rest_sensors.get_psu2_sensors)
+        return web.json_response(result, dumps=dumps_bytestr)
 
     # Handler for sys/sensors/psu3 resource endpoint
     async def rest_sensors_psu3_hdl(self, request):
-        return web.json_response(rest_sensors.get_psu3_sensors(), dumps=dumps_bytestr)
+        result = await get_sensor_snapshot(request, rest_sensors.get_psu3_sensors)
+        return web.json_response(result, dumps=dumps_bytestr)
 
     # Handler for sys/sensors/psu4 resource endpoint
     async def rest_sensors_psu4_hdl(self, request):
-        return web.json_response(rest_sensors.get_psu4_sensors(), dumps=dumps_bytestr)
+        result = await get_sensor_snapshot(request, rest_sensors.get_psu4_sensors)
+        return web.json_response(result, dumps=dumps_bytestr)
 
     # Handler for sys/sensors/pim1 resource endpoint
     async def rest_sensors_pim1_hdl(self, request):
-        return web.json_response(rest_sensors.get_pim1_sensors(), dumps=dumps_bytestr)
+        result = await get_sensor_snapshot(request, rest_sensors.get_pim1_sensors)
+        return web.json_response(result, dumps=dumps_bytestr)
 
     # Handler for sys/sensors/pim2 resource endpoint
     async def rest_sensors_pim2_hdl(self, request):
-        return web.json_response(rest_sensors.get_pim2_sensors(), dumps=dumps_bytestr)
+        result = await get_sensor_snapshot(request, rest_sensors.get_pim2_sensors)
+        return web.json_response(result, dumps=dumps_bytestr)
 
     # Handler for sys/sensors/pim3 resource endpoint
     async def rest_sensors_pim3_hdl(self, request):
-        return web.json_response(rest_sensors.get_pim3_sensors(), dumps=dumps_bytestr)
+        result = await get_sensor_snapshot(request, rest_sensors.get_pim3_sensors)
+        return web.json_response(result, dumps=dumps_bytestr)
 
     # Handler for sys/sensors/pim4 resource endpoint
     async def rest_sensors_pim4_hdl(self, request):
-        return web.json_response(rest_sensors.get_pim4_sensors(), dumps=dumps_bytestr)
+        result = await get_sensor_snapshot(request, rest_sensors.get_pim4_sensors)
+        return web.json_response(result, dumps=dumps_bytestr)
 
     # Handler for sys/sensors/pim5 resource endpoint
     async def rest_sensors_pim5_hdl(self, request):
-        return web.json_response(rest_sensors.get_pim5_sensors(), dumps=dumps_bytestr)
+        result = await get_sensor_snapshot(request, rest_sensors.get_pim5_sensors)
+        return web.json_response(result, dumps=dumps_bytestr)
 
     # Handler for sys/sensors/pim6 resource endpoint
     async def rest_sensors_pim6_hdl(self, request):
-        return web.json_response(rest_sensors.get_pim6_sensors(), dumps=dumps_bytestr)
+        result = await get_sensor_snapshot(request, rest_sensors.get_pim6_sensors)
+        return web.json_response(result, dumps=dumps_bytestr)
 
     # Handler for sys/sensors/pim7 resource endpoint
     async def rest_sensors_pim7_hdl(self, request):
-        return web.json_response(rest_sensors.get_pim7_sensors(), dumps=dumps_bytestr)
+        result = await get_sensor_snapshot(request, rest_sensors.get_pim7_sensors)
+        return web.json_response(result, dumps=dumps_bytestr)
 
     # Handler for sys/sensors/pim8 resource endpoint
     async def rest_sensors_pim8_hdl(self, request):
-        return web.json_response(rest_sensors.get_pim8_sensors(), dumps=dumps_bytestr)
+        result = await get_sensor_snapshot(request, rest_sensors.get_pim8_sensors)
+        return web.json_response(result, dumps=dumps_bytestr)
 
     # Handler for sys/pim_serial resource endpoint
     async def rest_pimserial_hdl(self, request):